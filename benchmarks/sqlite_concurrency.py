@@ -0,0 +1,115 @@
+"""
+Measures how the tracker's commits behave while the UI runs long reads on the same SQLite database.
+
+A writer thread commits one activity every few milliseconds, like the tracker on window switches, while
+reader threads repeatedly aggregate the whole table, like the Stats "All" range. Runs once with the
+SQLite defaults (rollback journal) and once with the pragmas from settings.
+
+Usage (from the repository root):
+    python -m benchmarks.sqlite_concurrency --rows 200000 --duration 10
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from time_insight.data.models import Base
+from time_insight.data.database import apply_sqlite_pragmas, get_sqlite_pragmas
+from time_insight.tracker.stats import LatencyHistogram
+
+READ_QUERY = text(
+    "SELECT application_id, SUM(julianday(session_end) - julianday(session_start)) "
+    "FROM application_activity GROUP BY application_id"
+)
+WRITE_QUERY = text(
+    "INSERT INTO application_activity (application_id, window_name, session_start, session_end, duration) "
+    "VALUES (:application_id, '', :session_start, :session_end, 1)"
+)
+
+def populate(engine, rows, applications):
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO application (id, name, path) VALUES (:id, :name, '')"),
+            [{"id": i, "name": f"app{i}.exe"} for i in range(1, applications + 1)]
+        )
+        connection.execute(WRITE_QUERY, [{
+            "application_id": random.randint(1, applications),
+            "session_start": start + timedelta(seconds=i),
+            "session_end": start + timedelta(seconds=i + 1)
+        } for i in range(rows)])
+
+def writer(engine, stop, write_interval, applications, latencies, result):
+    now = datetime(2025, 1, 1)
+    while not stop.is_set():
+        now += timedelta(seconds=1)
+        started = time.perf_counter()
+        try:
+            with engine.begin() as connection:
+                connection.execute(WRITE_QUERY, {"application_id": random.randint(1, applications), "session_start": now, "session_end": now})
+            result["commits"] += 1
+        except OperationalError:
+            result["errors"] += 1   #"database is locked", the tracker would lose this commit
+        latencies.add(time.perf_counter() - started)
+        time.sleep(write_interval)
+
+def reader(engine, stop, latencies, result):
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            with engine.connect() as connection:
+                connection.execute(READ_QUERY).fetchall()
+            result["reads"] += 1
+        except OperationalError:
+            result["errors"] += 1
+        latencies.add(time.perf_counter() - started)
+
+def run(profile, pragmas, rows, applications, duration, readers, write_interval):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        if pragmas:
+            apply_sqlite_pragmas(engine, pragmas)
+        Base.metadata.create_all(bind=engine)
+        populate(engine, rows, applications)
+
+        stop = threading.Event()
+        write_latencies, read_latencies = LatencyHistogram(window=100000), LatencyHistogram(window=100000)
+        write_result, read_result = {"commits": 0, "errors": 0}, {"reads": 0, "errors": 0}
+        threads = [threading.Thread(target=writer, args=(engine, stop, write_interval, applications, write_latencies, write_result))]
+        threads += [threading.Thread(target=reader, args=(engine, stop, read_latencies, read_result)) for _ in range(readers)]
+
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    print(f"profile:          {profile}")
+    print(f"commits/sec:      {write_result['commits'] / duration:,.1f}")
+    print(f"write errors:     {write_result['errors']}")
+    print(f"reads/sec:        {read_result['reads'] / duration:,.1f}")
+    print(f"read errors:      {read_result['errors']}")
+    print(json.dumps({"write": write_latencies.snapshot(), "read": read_latencies.snapshot()}, indent=4))
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite concurrent read/write benchmark.")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--applications", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per profile")
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--write-interval", type=float, default=0.01, help="seconds between writer commits")
+    args = parser.parse_args()
+
+    for profile, pragmas in (("default", None), ("tuned", get_sqlite_pragmas())):
+        run(profile, pragmas, args.rows, args.applications, args.duration, args.readers, args.write_interval)
+
+if __name__ == "__main__":
+    main()
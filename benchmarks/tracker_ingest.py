@@ -0,0 +1,71 @@
+"""
+Measures tracker ingest throughput: active window samples per second recorded into SQLite.
+
+Replays a synthetic window stream through record_active_window into a temporary database,
+so it runs on any platform, no desktop session is needed.
+
+Usage (from the repository root):
+    python -m benchmarks.tracker_ingest --samples 100000 --switch-probability 0.2
+"""
+import os
+import json
+import time
+import argparse
+import logging
+import tempfile
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session
+
+from time_insight.data.models import Base, ApplicationActivity
+from time_insight.tracker import tracker
+from time_insight.tracker.activity_writer import ActivityWriter
+from time_insight.tracker.heartbeat import Heartbeat
+from time_insight.tracker.replay_source import ReplayWindowSource, synthetic_samples
+from time_insight.tracker.stats import stats
+
+def run(samples, switch_probability, applications, flush_interval):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+
+        writer = ActivityWriter(engine, os.path.join(tmp_dir, 'journal.jsonl'), flush_interval)
+        source = ReplayWindowSource(synthetic_samples(samples, applications=applications, switch_probability=switch_probability))
+
+        #the live heartbeat file would make the next real tracker start close its session at a fake alive time
+        live_heartbeat = tracker.heartbeat
+        tracker.heartbeat = Heartbeat(os.path.join(tmp_dir, 'heartbeat.bin'))
+        try:
+            stats.reset()
+            start = time.perf_counter()
+            tracker.record_active_window(engine, source=source, writer=writer)
+            writer.flush()
+            elapsed = time.perf_counter() - start
+        finally:
+            tracker.heartbeat.close()
+            tracker.heartbeat = live_heartbeat
+
+        with Session(engine) as session:
+            activities = session.query(func.count(ApplicationActivity.id)).scalar()
+        engine.dispose()
+
+    print(f"samples:          {samples}")
+    print(f"activities:       {activities}")
+    print(f"elapsed:          {elapsed:.3f} s")
+    print(f"samples/sec:      {samples / elapsed:,.0f}")
+    print(f"activities/sec:   {activities / elapsed:,.0f}")
+    print(json.dumps(stats.snapshot()["phases"], indent=4))
+
+def main():
+    parser = argparse.ArgumentParser(description="Tracker ingest throughput benchmark.")
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--switch-probability", type=float, default=0.2)
+    parser.add_argument("--applications", type=int, default=20)
+    parser.add_argument("--flush-interval", type=int, default=0, help="seconds between write-behind flushes")
+    args = parser.parse_args()
+
+    logging.getLogger('debugLogger.tracker').setLevel(logging.WARNING)  #per activity logging would dominate the measurement
+
+    run(args.samples, args.switch_probability, args.applications, args.flush_interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import time
+import pytest
+from sqlalchemy import create_engine
+from time_insight.data.models import Base, Timestamp
+from time_insight.data.interning import window_titles, additional_infos
+
+@pytest.fixture
+def make_engine(tmp_path):
+    """
+    Creates SQLite databases with the current schema in tmp_path, disposed after the test.
+
+    Called as make_engine(file name), "test.db" if not given.
+    """
+    engines = []
+
+    def make(name="test.db"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        Base.metadata.create_all(bind=engine)
+        engines.append(engine)
+        return engine
+
+    window_titles.clear()   #interned ids belong to the database of the previous test
+    additional_infos.clear()
+    yield make
+    for engine in engines:
+        engine.dispose()
+    window_titles.clear()
+    additional_infos.clear()
+
+@pytest.fixture
+def engine(make_engine):
+    return make_engine()
+
+@pytest.fixture(params=["text", "epoch"])
+def storage(request, monkeypatch):
+    monkeypatch.setattr(Timestamp, "storage", request.param)
+    return request.param
+
+@pytest.fixture
+def local_time_zone(monkeypatch):
+    """
+    Runs the test in UTC+1 (UTC+2 in summer), so local days and hours differ from UTC ones.
+    """
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy.orm import Session
+from time_insight.data import get_data
+from time_insight.data.models import Application, ApplicationActivity
+from time_insight.data.rollups import rebuild_daily_app_usage
+
+class QDate:
+    """
+    Stand-in for PyQt5.QtCore.QDate, the get_data functions only read its parts.
+    """
+    def __init__(self, year, month, day):
+        self.parts = (year, month, day)
+
+    def year(self):
+        return self.parts[0]
+
+    def month(self):
+        return self.parts[1]
+
+    def day(self):
+        return self.parts[2]
+
+DAY = QDate(2025, 1, 6)     #local date, UTC+1 in the test time zone
+
+@pytest.fixture
+def engine(local_time_zone, engine, monkeypatch):
+    monkeypatch.setattr(get_data, "reader_engine", engine)
+    with Session(engine) as session:
+        session.add(Application(id=1, name="editor", desc="", path="/usr/bin/editor"))
+        session.commit()
+    return engine
+
+def add_activities(engine, *intervals):
+    """
+    :param intervals: Tuples (start, end) as naive UTC, end None for the running activity.
+    """
+    with Session(engine) as session:
+        session.add_all([
+            ApplicationActivity(application_id=1, window_name="", session_start=start, session_end=end)
+            for start, end in intervals
+        ])
+        session.commit()
+    with engine.begin() as connection:
+        rebuild_daily_app_usage(connection)
+
+def test_day_range_is_local_day_in_utc(local_time_zone):
+    assert get_data.day_range(DAY, DAY) == (datetime(2025, 1, 5, 23), datetime(2025, 1, 6, 23))
+
+def test_single_day_and_rollup_totals_agree(engine):
+    add_activities(engine,
+        (datetime(2025, 1, 5, 22, 30), datetime(2025, 1, 5, 23, 30)),    #23:30-00:30 local, 30 minutes on the day
+        (datetime(2025, 1, 6, 8), datetime(2025, 1, 6, 9)),
+        (datetime(2025, 1, 6, 22, 45), datetime(2025, 1, 6, 23, 15)))    #23:45-00:15 local, 15 minutes on the day
+
+    frame = get_data.get_programs_frame.__wrapped__(DAY, DAY)
+    usage = get_data.get_programs_usage_frame.__wrapped__(DAY, DAY)
+
+    assert frame["Duration"].sum() == 6300
+    assert usage["Duration"].tolist() == [6300]
+
+def test_running_activity_is_found_behind_later_rows(engine):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    add_activities(engine, (now - timedelta(minutes=10), None), (now - timedelta(minutes=5), now - timedelta(minutes=4)))
+    today, yesterday = datetime.now(), datetime.now() - timedelta(days=1)     #also right after local midnight
+
+    usage = get_data.get_programs_usage_frame.__wrapped__(
+        QDate(yesterday.year, yesterday.month, yesterday.day), QDate(today.year, today.month, today.day))
+
+    assert usage["Activity Count"].tolist() == [2]
+    assert usage["Duration"].iloc[0] >= 600 + 60 - 1
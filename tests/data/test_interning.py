@@ -0,0 +1,64 @@
+from datetime import datetime
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from time_insight.data.models import ApplicationActivity, WindowTitle
+from time_insight.data.interning import (
+    TextInterner, text_hash, intern_activity_texts, join_activity_texts, activity_window_name, activity_additional_info
+)
+
+START = datetime(2025, 1, 6, 9)
+
+def title_count(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(WindowTitle)).scalar()
+
+def test_text_hash_is_signed_64_bit():
+    assert text_hash("Editor") == text_hash("Editor")
+    assert text_hash("Editor") != text_hash("editor")
+    assert -2 ** 63 <= text_hash("Editor") < 2 ** 63
+
+def test_resolve_stores_each_text_once(engine):
+    interner = TextInterner(WindowTitle)
+    with Session(engine) as session:
+        first = interner.resolve(session, "Editor")
+        assert interner.resolve(session, "Editor") == first
+        assert interner.resolve(session, "Browser") != first
+        assert interner.resolve(session, None) is None
+        session.commit()
+
+    assert title_count(engine) == 2
+
+def test_resolve_finds_stored_text_after_clear_and_eviction(engine):
+    interner = TextInterner(WindowTitle, maxsize=1)
+    with Session(engine) as session:
+        first = interner.resolve(session, "Editor")
+        interner.resolve(session, "Browser")      #evicts "Editor"
+        assert list(interner.ids) == ["Browser"]
+        assert interner.resolve(session, "Editor") == first
+        interner.clear()
+        assert interner.resolve(session, "Editor") == first
+        session.commit()
+
+    assert title_count(engine) == 2
+
+def test_intern_activity_texts_moves_old_rows(engine):
+    with Session(engine) as session:
+        session.add_all([
+            ApplicationActivity(application_id=1, window_name="Editor", additional_info="PID: 1", session_start=START),
+            ApplicationActivity(application_id=1, window_name="Editor", additional_info=None, session_start=START),
+            ApplicationActivity(application_id=1, window_name="", additional_info=None, session_start=START)
+        ])
+        session.commit()
+
+    with engine.begin() as connection:
+        intern_activity_texts(connection)
+        intern_activity_texts(connection)   #nothing left to move
+
+    with engine.connect() as connection:
+        rows = connection.execute(join_activity_texts(select(
+            activity_window_name, activity_additional_info, ApplicationActivity.window_name, ApplicationActivity.window_title_id
+        )).order_by(ApplicationActivity.id)).all()
+    assert [row[:3] for row in rows] == [("Editor", "PID: 1", ""), ("Editor", None, ""), ("", None, "")]
+    assert rows[0].window_title_id == rows[1].window_title_id is not None
+    assert rows[2].window_title_id is None
+    assert title_count(engine) == 1
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from time_insight.data.models import UserSession
+from time_insight.data.intervals import overlap_filter, clipped_interval
+
+RANGE_START = datetime(2025, 1, 6)
+RANGE_END = datetime(2025, 1, 7)
+
+@pytest.fixture
+def engine(storage, engine):
+    return engine   #every test runs with both timestamp storages
+
+def add(engine, *intervals):
+    """
+    :param intervals: Tuples (start, end) relative to RANGE_START in hours, end None for a row still running.
+    """
+    with Session(engine) as session:
+        session.add_all([
+            UserSession(
+                user_session_type_id=1,
+                session_start=RANGE_START + timedelta(hours=start),
+                session_end=RANGE_START + timedelta(hours=end) if end is not None else None
+            ) for start, end in intervals
+        ])
+        session.commit()
+
+def overlapping(engine, now=None, range_start=RANGE_START, range_end=RANGE_END):
+    """
+    :return: Clipped intervals relative to RANGE_START in hours, ordered by start.
+    """
+    clipped_start, clipped_end = clipped_interval(UserSession, range_start, range_end, now)
+    query = select(clipped_start, clipped_end).where(overlap_filter(UserSession, range_start, range_end)) \
+        .order_by(UserSession.session_start)
+    with Session(engine) as session:
+        return [
+            ((start - RANGE_START) / timedelta(hours=1), (end - RANGE_START) / timedelta(hours=1))
+            for start, end in session.execute(query)
+        ]
+
+def test_rows_inside_range(engine):
+    add(engine, (1, 2), (2, 3.5))
+
+    assert overlapping(engine) == [(1, 2), (2, 3.5)]
+
+def test_row_crossing_range_start_is_clipped(engine):
+    add(engine, (-10, -4), (-4, 1), (1, 2))
+
+    assert overlapping(engine) == [(0, 1), (1, 2)]
+
+def test_row_crossing_range_end_is_clipped(engine):
+    add(engine, (20, 30))
+
+    assert overlapping(engine) == [(20, 24)]
+
+def test_row_spanning_whole_range(engine):
+    add(engine, (-5, 30))
+
+    assert overlapping(engine) == [(0, 24)]
+
+def test_row_ending_at_range_start_is_excluded(engine):
+    add(engine, (-3, 0))
+
+    assert overlapping(engine) == []
+
+def test_row_starting_at_range_start_is_included_once(engine):
+    add(engine, (-3, 0), (0, 1))
+
+    assert overlapping(engine) == [(0, 1)]
+
+def test_row_starting_at_range_end_is_excluded(engine):
+    add(engine, (24, 25))
+
+    assert overlapping(engine) == []
+
+def test_rows_before_the_last_one_before_range_are_excluded(engine):
+    add(engine, (-10, -8), (-8, -6), (-6, -1))
+
+    assert overlapping(engine) == []
+
+def test_overlapping_rows_crossing_range_start_are_all_included(engine):
+    add(engine, (-2, 2), (-1, -0.5), (-0.75, 0.5))    #merged history of two databases
+
+    assert overlapping(engine) == [(0, 2), (0, 0.5)]
+
+def test_running_row_before_later_rows_is_included(engine):
+    add(engine, (-6, None), (-3, -2))
+
+    assert overlapping(engine, now=RANGE_START + timedelta(hours=1)) == [(0, 1)]
+
+def test_running_row_is_clipped_to_now(engine):
+    add(engine, (5, None))
+
+    assert overlapping(engine, now=RANGE_START + timedelta(hours=8)) == [(5, 8)]
+
+def test_running_row_started_before_range_is_clipped_to_range(engine):
+    add(engine, (-2, None))
+
+    assert overlapping(engine, now=RANGE_START + timedelta(hours=30)) == [(0, 24)]
+
+def test_running_row_uses_current_time_by_default(engine):
+    add(engine, (-2, None))    #range is in the past
+
+    assert overlapping(engine) == [(0, 24)]
+
+def test_empty_table(engine):
+    assert overlapping(engine) == []
@@ -0,0 +1,91 @@
+from datetime import date
+from sqlalchemy import create_engine, inspect, select, text
+from time_insight.data.models import Base, Application, ApplicationActivity, DailyAppUsage, HourlyActiveUsage, SchemaVersion
+from time_insight.data.interning import join_activity_texts, activity_window_name, activity_additional_info
+from time_insight.data.migrations import MIGRATIONS, run_migrations, get_schema_version
+
+#schema of the first release, before any migration
+BASELINE_SCHEMA = [
+    "CREATE TABLE application (id INTEGER NOT NULL PRIMARY KEY, name TEXT NOT NULL, \"desc\" TEXT, path TEXT, enrollment_date DATETIME)",
+    "CREATE TABLE user_session_type (id INTEGER NOT NULL PRIMARY KEY, name TEXT NOT NULL)",
+    "CREATE TABLE application_activity (id INTEGER NOT NULL PRIMARY KEY, application_id INTEGER REFERENCES application(id), "
+    "window_name TEXT NOT NULL, additional_info TEXT, session_start DATETIME, session_end DATETIME, duration INTEGER)",
+    "CREATE INDEX ix_application_activity_application_id ON application_activity (application_id)",
+    "CREATE TABLE user_session (id INTEGER NOT NULL PRIMARY KEY, user_session_type_id INTEGER REFERENCES user_session_type(id), "
+    "session_start DATETIME, session_end DATETIME, duration INTEGER)"
+]
+
+BASELINE_ROWS = [
+    "INSERT INTO user_session_type (id, name) VALUES (1, 'Active'), (2, 'Sleep')",
+    #the same executable enrolled twice, before application.name was unique
+    "INSERT INTO application (id, name, \"desc\", path) VALUES (1, 'editor', '', '/usr/bin/editor'), "
+    "(2, 'browser', '', '/usr/bin/browser'), (3, 'editor', '', '/usr/bin/editor')",
+    "INSERT INTO application_activity (application_id, window_name, additional_info, session_start, session_end, duration) VALUES "
+    "(1, 'notes.txt', 'Active, PID: 10', '2025-01-06 08:00:00.000000', '2025-01-06 09:00:00.000000', 3600), "
+    "(2, 'News', 'Active, PID: 11', '2025-01-06 09:00:00.000000', '2025-01-06 09:30:00.000000', 1800), "
+    "(3, 'notes.txt', 'Active, PID: 12', '2025-01-06 10:00:00.000000', '2025-01-06 10:15:00.000000', 900), "
+    "(3, 'todo.txt', NULL, '2025-01-06 10:15:00.000000', NULL, NULL)",
+    "INSERT INTO user_session (user_session_type_id, session_start, session_end, duration) VALUES "
+    "(1, '2025-01-06 08:00:00.000000', '2025-01-06 10:15:00.000000', 8100)"
+]
+
+def baseline_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA + BASELINE_ROWS:
+            connection.execute(text(statement))
+    Base.metadata.create_all(bind=engine)   #init_db creates the new tables before migrating
+    return engine
+
+def activity_texts(connection):
+    return connection.execute(join_activity_texts(select(
+        ApplicationActivity.application_id, activity_window_name, activity_additional_info,
+        ApplicationActivity.window_name, ApplicationActivity.additional_info
+    )).order_by(ApplicationActivity.id)).all()
+
+def test_migrations_upgrade_baseline_database(local_time_zone, tmp_path):
+    engine = baseline_engine(tmp_path)
+
+    run_migrations(engine)
+
+    with engine.connect() as connection:
+        assert get_schema_version(connection) == MIGRATIONS[-1][0]
+        assert connection.execute(select(Application.id, Application.name).order_by(Application.id)).all() == [
+            (1, "editor"), (2, "browser")
+        ]
+        #activities of the removed duplicate moved to the kept application, texts moved to the dictionary tables
+        assert activity_texts(connection) == [
+            (1, "notes.txt", "Active, PID: 10", "", None),
+            (2, "News", "Active, PID: 11", "", None),
+            (1, "notes.txt", "Active, PID: 12", "", None),
+            (1, "todo.txt", None, "", None)
+        ]
+        assert connection.execute(text("SELECT count(*) FROM window_title")).scalar() == 3
+        assert connection.execute(select(DailyAppUsage.local_date, DailyAppUsage.application_id, DailyAppUsage.seconds,
+                                         DailyAppUsage.activity_count).order_by(DailyAppUsage.application_id)).all() == [
+            (date(2025, 1, 6), 1, 4500, 2), (date(2025, 1, 6), 2, 1800, 1)
+        ]
+        assert sum(connection.execute(select(HourlyActiveUsage.seconds)).scalars()) == 8100
+
+    indexes = {index["name"]: index for index in inspect(engine).get_indexes("application")}
+    assert indexes["ix_application_name"]["unique"]
+    assert "ix_application_activity_session_start_session_end" in {
+        index["name"] for index in inspect(engine).get_indexes("application_activity")
+    }
+
+def test_migrations_run_once(local_time_zone, tmp_path):
+    engine = baseline_engine(tmp_path)
+    run_migrations(engine)
+
+    run_migrations(engine)
+
+    with engine.connect() as connection:
+        assert connection.execute(select(SchemaVersion.version).order_by(SchemaVersion.version)).scalars().all() == [
+            version for version, _, _ in MIGRATIONS
+        ]
+
+def test_migrations_on_new_database(engine):
+    run_migrations(engine)
+
+    with engine.connect() as connection:
+        assert get_schema_version(connection) == MIGRATIONS[-1][0]
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy.orm import Session
+from time_insight.data import parquet_io
+from time_insight.data.data_version import DataVersion
+from time_insight.data.models import Application, ApplicationActivity, UserSession, UserSessionType
+from time_insight.tracker.tracker import update_last_activity, update_last_session
+
+pytest.importorskip("pyarrow")
+
+EXPORTED = datetime(2026, 10, 16, 9, 0)     #history of the exporting machine, naive utc as stored
+LIVE = datetime(2026, 10, 18, 8, 0)         #start of the running tracker session of the importing machine
+
+def seeded_engine(make_engine, name):
+    engine = make_engine(name)
+    with Session(engine) as session:
+        session.add_all([UserSessionType(id=1, name="Active"), UserSessionType(id=2, name="Sleep")])
+        session.add(Application(id=1, name="editor.exe", path="C:/editor.exe"))
+        session.commit()
+    return engine
+
+@pytest.fixture
+def engines(make_engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(parquet_io, "data_version", DataVersion(str(tmp_path / "data_version.bin")))
+    return seeded_engine(make_engine, "source.db"), seeded_engine(make_engine, "target.db")
+
+def transfer(source, target, path, monkeypatch):
+    monkeypatch.setattr(parquet_io, "reader_engine", source)
+    assert parquet_io.export_parquet(path)
+    monkeypatch.setattr(parquet_io, "bulk_engine", target)
+    assert parquet_io.import_parquet(path)
+
+def test_import_keeps_running_session_of_tracker(engines, tmp_path, monkeypatch):
+    source, target = engines
+    with Session(source) as session:
+        session.add_all([
+            UserSession(user_session_type_id=1, session_start=EXPORTED, session_end=EXPORTED + timedelta(hours=1), duration=3600),
+            UserSession(user_session_type_id=1, session_start=EXPORTED + timedelta(hours=2)),  #tracker was running
+            ApplicationActivity(application_id=1, window_name="Old", session_start=EXPORTED + timedelta(hours=2))
+        ])
+        session.commit()
+    with Session(target) as session:
+        session.add_all([
+            UserSession(user_session_type_id=1, session_start=LIVE),
+            ApplicationActivity(application_id=1, window_name="Live", session_start=LIVE)
+        ])
+        session.commit()
+
+    transfer(source, target, str(tmp_path / "export"), monkeypatch)
+
+    end = LIVE.replace(tzinfo=timezone.utc) + timedelta(minutes=30)
+    with Session(target) as session:
+        update_last_activity(session, end)
+        update_last_session(session, end)
+
+    with Session(target) as session:
+        sessions = [(row.session_start, row.duration) for row in session.query(UserSession).order_by(UserSession.session_start)]
+        activities = [(row.session_start, row.duration) for row in session.query(ApplicationActivity)]
+    assert sessions == [(EXPORTED, 3600), (LIVE, 1800)]
+    assert activities == [(LIVE, 1800)]
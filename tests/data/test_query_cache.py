@@ -0,0 +1,154 @@
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from time_insight.data import query_cache as query_cache_module
+from time_insight.data.data_version import DataVersion
+from time_insight.data.query_cache import QueryCache, cached_query, query_cache, PRESENT_TTL
+
+PAST = datetime(2020, 1, 2)                         #end of a range which ended long ago
+PRESENT = datetime.now() + timedelta(days=1)        #end of a range overlapping now
+
+@pytest.fixture
+def version(tmp_path, monkeypatch):
+    version = DataVersion(str(tmp_path / "data_version.bin"))   #not the file shared with the running app
+    monkeypatch.setattr(query_cache_module, "data_version", version)
+    query_cache.clear()
+    yield version
+    query_cache.clear()
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(query_cache_module, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+def test_present_range_is_dropped_on_write(version, clock):
+    cache = QueryCache()
+    cache.put("key", [1, 2], PRESENT, version.read())
+    assert cache.get("key") == [1, 2]
+
+    version.bump()
+
+    assert cache.get("key") is None
+
+def test_present_range_expires_after_ttl(version, clock):
+    cache = QueryCache()
+    cache.put("key", [1], PRESENT, version.read())
+
+    clock.now += PRESENT_TTL
+    assert cache.get("key") == [1]
+    clock.now += 1
+    assert cache.get("key") is None
+
+def test_past_range_survives_writes_and_ttl(version, clock):
+    cache = QueryCache()
+    cache.put("key", [1], PAST, version.read())
+
+    version.bump()
+    clock.now += PRESENT_TTL * 10
+
+    assert cache.get("key") == [1]
+
+def test_past_range_is_dropped_when_history_changes(version, clock):
+    cache = QueryCache()
+    cache.put("key", [1], PAST, version.read())
+
+    version.bump(history=True)
+
+    assert cache.get("key") is None
+
+def test_range_ending_within_margin_counts_as_present(version, clock):
+    cache = QueryCache()
+    cache.put("key", [1], datetime.now() - timedelta(minutes=1), version.read())   #writes of it can still be queued
+
+    version.bump()
+
+    assert cache.get("key") is None
+
+def test_version_read_before_the_query_wins(version, clock):
+    cache = QueryCache()
+    before = version.read()
+    version.bump()     #write committed while the query ran
+    cache.put("key", [1], PRESENT, before)
+
+    assert cache.get("key") is None
+
+def test_evicts_least_recently_used(version, clock):
+    cache = QueryCache(maxsize=2)
+    cache.put("a", [1], PAST, version.read())
+    cache.put("b", [2], PAST, version.read())
+    cache.get("a")
+    cache.put("c", [3], PAST, version.read())
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1]
+    assert cache.get("c") == [3]
+
+def test_limits_total_rows(version, clock):
+    cache = QueryCache(max_rows=5)
+    cache.put("a", [1, 2, 3], PAST, version.read())
+    cache.put("b", [1, 2, 3], PAST, version.read())
+
+    assert cache.get("a") is None
+    assert cache.get("b") == [1, 2, 3]
+    assert cache.rows == 3
+
+def test_does_not_store_result_over_row_limit(version, clock):
+    cache = QueryCache(max_rows=2)
+    cache.put("a", [1, 2, 3], PAST, version.read())
+
+    assert cache.get("a") is None
+    assert cache.rows == 0
+
+class FakeQDate:
+    def __init__(self, day):
+        self.day_value = day
+    def year(self):
+        return self.day_value.year
+    def month(self):
+        return self.day_value.month
+    def day(self):
+        return self.day_value.day
+
+def test_cached_query_runs_query_once_and_returns_copies(version):
+    calls = []
+
+    @cached_query("test")
+    def get_rows(start_date, end_date, names=None):
+        calls.append((start_date, end_date, names))
+        return [{"Name": "a.exe"}]
+
+    first = get_rows(FakeQDate(date(2020, 1, 1)), FakeQDate(date(2020, 1, 1)), names=["a.exe"])
+    first.append({"Name": "added by caller"})
+    first[0]["Name"] = "changed by caller"
+    second = get_rows(FakeQDate(date(2020, 1, 1)), FakeQDate(date(2020, 1, 1)), names=["a.exe"])
+
+    assert second == [{"Name": "a.exe"}]
+    assert len(calls) == 1
+
+def test_cached_query_keys_by_range_and_arguments(version):
+    calls = []
+
+    @cached_query("test")
+    def get_rows(start_date, end_date, names=None):
+        calls.append(names)
+        return [1]
+
+    get_rows(date(2020, 1, 1), date(2020, 1, 1))
+    get_rows(date(2020, 1, 1), date(2020, 1, 2))
+    get_rows(date(2020, 1, 1), date(2020, 1, 1), names=["a.exe"])
+
+    assert len(calls) == 3
+
+def test_cached_query_does_not_cache_empty_results(version):
+    calls = []
+
+    @cached_query("test")
+    def get_rows(start_date, end_date):
+        calls.append(1)
+        return []
+
+    get_rows(date(2020, 1, 1), date(2020, 1, 1))
+    get_rows(date(2020, 1, 1), date(2020, 1, 1))
+
+    assert len(calls) == 2
@@ -0,0 +1,100 @@
+from datetime import date, datetime
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from time_insight.data.models import ApplicationActivity, DailyAppUsage, UserSession, HourlyActiveUsage
+from time_insight.data.rollups import add_activity_usage, rebuild_daily_app_usage, add_session_usage, rebuild_hourly_active_usage
+
+#naive utc, the test time zone is UTC+1
+ACTIVITIES = [
+    (1, datetime(2025, 1, 6, 8), datetime(2025, 1, 6, 9)),
+    (1, datetime(2025, 1, 6, 22, 30), datetime(2025, 1, 7, 0, 30)),     #23:30-01:30 local, crosses midnight
+    (2, datetime(2025, 1, 6, 10), datetime(2025, 1, 6, 10, 15)),
+]
+
+def daily_usage(engine):
+    with engine.connect() as connection:
+        return sorted(connection.execute(
+            select(DailyAppUsage.local_date, DailyAppUsage.application_id, DailyAppUsage.seconds, DailyAppUsage.activity_count)
+        ).all())
+
+def add_activities(engine, activities, incremental):
+    with Session(engine) as session:
+        for application_id, start, end in activities:
+            session.add(ApplicationActivity(application_id=application_id, window_name="", session_start=start, session_end=end))
+            if incremental:
+                add_activity_usage(session, application_id, start, end)
+        session.commit()
+
+def test_incremental_update_splits_local_days(local_time_zone, engine):
+    add_activities(engine, ACTIVITIES, incremental=True)
+
+    assert daily_usage(engine) == [
+        (date(2025, 1, 6), 1, 3600 + 1800, 2),
+        (date(2025, 1, 6), 2, 900, 1),
+        (date(2025, 1, 7), 1, 5400, 0)     #counted on the day it started only
+    ]
+
+def test_rebuild_matches_incremental_update(local_time_zone, engine, make_engine):
+    add_activities(engine, ACTIVITIES, incremental=True)
+    rebuilt = make_engine("rebuilt.db")
+    add_activities(rebuilt, ACTIVITIES, incremental=False)
+
+    with rebuilt.begin() as connection:
+        rebuild_daily_app_usage(connection)
+
+    assert daily_usage(rebuilt) == daily_usage(engine)
+
+def test_rebuild_skips_running_activities_and_replaces_rows(local_time_zone, engine):
+    add_activities(engine, ACTIVITIES[:1], incremental=True)
+    add_activities(engine, [(2, datetime(2025, 1, 6, 12), None)], incremental=False)
+    with Session(engine) as session:
+        add_activity_usage(session, 1, datetime(2025, 1, 6, 8), datetime(2025, 1, 6, 9))    #counted twice by mistake
+        session.commit()
+
+    with engine.begin() as connection:
+        rebuild_daily_app_usage(connection)
+
+    assert daily_usage(engine) == [(date(2025, 1, 6), 1, 3600, 1)]
+
+def hourly_usage(engine):
+    with engine.connect() as connection:
+        return sorted(connection.execute(
+            select(HourlyActiveUsage.local_date, HourlyActiveUsage.hour, HourlyActiveUsage.seconds)
+        ).all())
+
+def test_session_usage_splits_local_hours(local_time_zone, engine):
+    with Session(engine) as session:
+        add_session_usage(session, datetime(2025, 1, 6, 22, 40), datetime(2025, 1, 7, 0, 10))     #23:40-01:10 local
+        add_session_usage(session, datetime(2025, 1, 6, 22, 50), datetime(2025, 1, 6, 22, 55))
+        session.commit()
+
+    assert hourly_usage(engine) == [
+        (date(2025, 1, 6), 23, 1200 + 300),
+        (date(2025, 1, 7), 0, 3600),
+        (date(2025, 1, 7), 1, 600)
+    ]
+
+def test_session_usage_on_dst_change_counts_real_seconds(local_time_zone, engine):
+    with Session(engine) as session:
+        add_session_usage(session, datetime(2025, 3, 30, 0, 30), datetime(2025, 3, 30, 1, 30))    #01:30-03:30 local, 02:00 is skipped
+        add_session_usage(session, datetime(2025, 10, 26, 0, 30), datetime(2025, 10, 26, 2, 30))  #02:30-03:30 local, 02:00 twice
+        session.commit()
+
+    assert hourly_usage(engine) == [
+        (date(2025, 3, 30), 1, 1800), (date(2025, 3, 30), 3, 1800),
+        (date(2025, 10, 26), 2, 5400), (date(2025, 10, 26), 3, 1800)
+    ]
+
+def test_hourly_rebuild_counts_closed_active_sessions_only(local_time_zone, engine):
+    with Session(engine) as session:
+        session.add_all([
+            UserSession(user_session_type_id=1, session_start=datetime(2025, 1, 6, 8), session_end=datetime(2025, 1, 6, 8, 30)),
+            UserSession(user_session_type_id=2, session_start=datetime(2025, 1, 6, 8, 30), session_end=datetime(2025, 1, 6, 10)),
+            UserSession(user_session_type_id=1, session_start=datetime(2025, 1, 6, 10))
+        ])
+        session.commit()
+
+    with engine.begin() as connection:
+        rebuild_hourly_active_usage(connection)
+
+    assert hourly_usage(engine) == [(date(2025, 1, 6), 9, 1800)]
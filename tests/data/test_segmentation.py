@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from time_insight.data.models import UserSession
+from time_insight.data.intervals import overlap_filter, clipped_interval
+from time_insight.data.segmentation import floor_time, split_interval, segment
+
+DAY = datetime(2025, 1, 6)
+
+def at(hours):
+    return DAY + timedelta(hours=hours)
+
+def test_floor_time_aligns_to_midnight():
+    assert floor_time(at(10.75), timedelta(minutes=30)) == at(10.5)
+    assert floor_time(at(10.75), timedelta(days=1)) == DAY
+
+def test_split_interval_at_granularities():
+    assert split_interval(at(9.25), at(10.5), "30min") == [(at(9.25), at(9.5)), (at(9.5), at(10)), (at(10), at(10.5))]
+    assert split_interval(at(9.25), at(10.5), "hour") == [(at(9.25), at(10)), (at(10), at(10.5))]
+    assert split_interval(at(22), at(26), "day") == [(at(22), at(24)), (at(24), at(26))]
+
+def test_split_empty_interval():
+    assert split_interval(at(9), at(9), "hour") == []
+
+def test_segment_keeps_row_fields_and_sets_durations():
+    rows = [{"Name": "editor", "Start Time": at(9.5), "End Time": at(11)}]
+
+    assert segment(rows, "hour") == [
+        {"Name": "editor", "Start Time": at(9.5), "End Time": at(10), "Duration": 1800},
+        {"Name": "editor", "Start Time": at(10), "End Time": at(11), "Duration": 3600}
+    ]
+
+def test_segment_clips_to_range_and_ends_running_rows_at_now():
+    rows = [
+        {"Start Time": at(-2), "End Time": at(1)},
+        {"Start Time": at(23), "End Time": None}
+    ]
+
+    segments = segment(rows, "day", range_start=DAY, range_end=at(24), now=at(30))
+
+    assert [(row["Start Time"], row["End Time"]) for row in segments] == [(at(0), at(1)), (at(23), at(24))]
+
+def test_segment_skips_running_rows_without_now():
+    assert segment([{"Start Time": at(1), "End Time": None}], "hour") == []
+
+def test_segment_of_clipped_query_results(engine, storage):
+    with Session(engine) as session:
+        session.add_all([
+            UserSession(user_session_type_id=1, session_start=at(-1), session_end=at(0.75)),
+            UserSession(user_session_type_id=1, session_start=at(23.5), session_end=None)
+        ])
+        session.commit()
+
+    clipped_start, clipped_end = clipped_interval(UserSession, DAY, at(24), now=at(25))
+    query = select(clipped_start.label("Start Time"), clipped_end.label("End Time")) \
+        .where(overlap_filter(UserSession, DAY, at(24))).order_by(UserSession.session_start)
+    with Session(engine) as session:
+        rows = [dict(row._mapping) for row in session.execute(query)]
+
+    assert [(row["Start Time"], row["Duration"]) for row in segment(rows, "30min")] == [
+        (at(0), 1800), (at(0.5), 900), (at(23.5), 1800)
+    ]
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from time_insight.data.models import Timestamp, UserSession
+from time_insight.data.migrations import convert_timestamp_storage
+
+MOMENT = datetime(2025, 3, 30, 1, 30, 15, 250000)   #naive utc
+
+def bind(value):
+    return Timestamp().process_bind_param(value, None)
+
+def result(value):
+    return Timestamp().process_result_value(value, None)
+
+def test_bind_formats(monkeypatch):
+    monkeypatch.setattr(Timestamp, "storage", "text")
+    assert bind(MOMENT) == "2025-03-30 01:30:15.250000"
+    monkeypatch.setattr(Timestamp, "storage", "epoch")
+    assert bind(MOMENT) == int((MOMENT - datetime(1970, 1, 1)).total_seconds() * 1000)
+    assert bind(datetime(1970, 1, 1)) == 0
+
+def test_aware_values_are_stored_as_utc(storage):
+    aware = MOMENT.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=2)))
+
+    assert bind(aware) == bind(MOMENT)
+
+def test_none(storage):
+    assert bind(None) is None
+    assert result(None) is None
+
+def test_round_trip_returns_naive_utc(storage):
+    assert result(bind(MOMENT)) == MOMENT
+    assert result(bind(MOMENT.replace(tzinfo=timezone.utc))) == MOMENT
+
+def test_both_formats_are_read_whatever_the_storage(storage):
+    assert result("2025-03-30 01:30:15.250000") == MOMENT
+    assert result("2025-03-30T03:30:15.250000+02:00") == MOMENT    #aware text converted to utc
+    assert result(1743298215250) == MOMENT
+
+def test_epoch_storage_keeps_milliseconds(monkeypatch):
+    monkeypatch.setattr(Timestamp, "storage", "epoch")
+
+    assert result(bind(MOMENT.replace(microsecond=250999))) == MOMENT
+
+def test_range_filter_and_order_in_sql(storage, engine):
+    with Session(engine) as session:
+        session.add_all([UserSession(user_session_type_id=1, session_start=MOMENT + timedelta(hours=hours)) for hours in (5, -5, 0)])
+        session.commit()
+
+        starts = [row.session_start for row in session.query(UserSession.session_start).filter(
+            UserSession.session_start >= MOMENT
+        ).order_by(UserSession.session_start)]
+
+    assert starts == [MOMENT, MOMENT + timedelta(hours=5)]
+
+def stored_types(engine):
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT DISTINCT typeof(session_start) || '/' || typeof(session_end) FROM user_session")).scalars().all()
+
+def test_convert_storage_round_trip(monkeypatch, engine):
+    monkeypatch.setattr(Timestamp, "storage", "text")
+    with Session(engine) as session:
+        session.add_all([
+            UserSession(user_session_type_id=1, session_start=MOMENT, session_end=MOMENT + timedelta(minutes=30)),
+            UserSession(user_session_type_id=1, session_start=MOMENT + timedelta(days=1), session_end=None)
+        ])
+        session.commit()
+
+    convert_timestamp_storage(engine, "epoch")
+    assert sorted(stored_types(engine)) == ["integer/integer", "integer/null"]
+
+    monkeypatch.setattr(Timestamp, "storage", "epoch")
+    with Session(engine) as session:
+        rows = session.query(UserSession.session_start, UserSession.session_end).order_by(UserSession.session_start).all()
+    assert rows == [(MOMENT, MOMENT + timedelta(minutes=30)), (MOMENT + timedelta(days=1), None)]
+
+    convert_timestamp_storage(engine, "text")
+    assert sorted(stored_types(engine)) == ["text/null", "text/text"]
+
+    monkeypatch.setattr(Timestamp, "storage", "text")
+    with Session(engine) as session:
+        assert session.query(UserSession.session_start, UserSession.session_end).order_by(UserSession.session_start).all() == rows
+
+def test_convert_storage_does_nothing_when_already_converted(monkeypatch, engine):
+    monkeypatch.setattr(Timestamp, "storage", "epoch")
+    with Session(engine) as session:
+        session.add(UserSession(user_session_type_id=1, session_start=MOMENT))
+        session.commit()
+
+    convert_timestamp_storage(engine, "epoch")
+
+    assert stored_types(engine) == ["integer/null"]
@@ -0,0 +1,95 @@
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy.orm import Session
+from time_insight.data.models import ApplicationActivity
+from time_insight.tracker.activity_writer import ActivityWriter, ActivityRecord
+
+START = datetime(2025, 1, 6, 9, 0, tzinfo=timezone.utc)
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "journal.jsonl")
+
+def stored_activities(engine):
+    with Session(engine) as session:
+        return [
+            (activity.application_id, activity.window_text, activity.session_start, activity.session_end, activity.duration)
+            for activity in session.query(ApplicationActivity).order_by(ApplicationActivity.id)
+        ]
+
+def naive(value):
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def test_flush_stores_buffered_activities_and_clears_journal(engine, journal_path):
+    writer = ActivityWriter(engine, journal_path, flush_interval=0)
+    record = ActivityRecord(1, "Editor", None, START)
+    writer.open(record)
+    writer.close(record, START + timedelta(seconds=30))
+    assert stored_activities(engine) == []
+
+    writer.flush()
+
+    assert stored_activities(engine) == [(1, "Editor", naive(START), naive(START + timedelta(seconds=30)), 30)]
+    assert record.row_id is not None
+    assert os.path.getsize(journal_path) == 0
+
+def test_replay_stores_activities_of_killed_process(engine, journal_path):
+    writer = ActivityWriter(engine, journal_path, flush_interval=0)
+    first = ActivityRecord(1, "Editor", "file.py", START)
+    writer.open(first)
+    writer.close(first, START + timedelta(seconds=10))
+    second = ActivityRecord(2, "Browser", None, START + timedelta(seconds=10))
+    writer.open(second)
+    #killed before a flush, a new process replays the journal
+
+    ActivityWriter(engine, journal_path, flush_interval=0).replay()
+
+    assert stored_activities(engine) == [
+        (1, "Editor", naive(START), naive(START + timedelta(seconds=10)), 10),
+        (2, "Browser", naive(START + timedelta(seconds=10)), None, None)
+    ]
+    assert os.path.getsize(journal_path) == 0
+
+def test_replay_does_not_store_flushed_activities_twice(engine, journal_path, tmp_path):
+    writer = ActivityWriter(engine, journal_path, flush_interval=0)
+    record = ActivityRecord(1, "Editor", None, START)
+    writer.open(record)
+    writer.close(record, START + timedelta(seconds=20))
+    shutil.copy(journal_path, tmp_path / "before_flush.jsonl")
+    writer.flush()
+    #killed after the commit but before the journal was cleared
+    shutil.copy(tmp_path / "before_flush.jsonl", journal_path)
+
+    ActivityWriter(engine, journal_path, flush_interval=0).replay()
+
+    assert stored_activities(engine) == [(1, "Editor", naive(START), naive(START + timedelta(seconds=20)), 20)]
+
+def test_replay_closes_activity_stored_before(engine, journal_path):
+    writer = ActivityWriter(engine, journal_path, flush_interval=0)
+    record = ActivityRecord(1, "Editor", None, START)
+    writer.open(record)
+    writer.flush()
+    writer.close(record, START + timedelta(minutes=5))
+    #killed before the close was flushed, only the close entry with the row id is in the journal
+
+    ActivityWriter(engine, journal_path, flush_interval=0).replay()
+
+    assert stored_activities(engine) == [(1, "Editor", naive(START), naive(START + timedelta(minutes=5)), 300)]
+
+def test_replay_ignores_line_cut_by_kill(engine, journal_path):
+    writer = ActivityWriter(engine, journal_path, flush_interval=0)
+    writer.open(ActivityRecord(1, "Editor", None, START))
+    writer.journal.write('{"op": "open", "key": "cut')
+    writer.journal.close()
+
+    ActivityWriter(engine, journal_path, flush_interval=0).replay()
+
+    assert stored_activities(engine) == [(1, "Editor", naive(START), None, None)]
+
+def test_replay_without_journal_does_nothing(engine, journal_path):
+    ActivityWriter(engine, journal_path, flush_interval=0).replay()
+
+    assert stored_activities(engine) == []
+    assert not os.path.exists(journal_path)
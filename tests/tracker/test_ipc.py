@@ -0,0 +1,38 @@
+import json
+import socket
+import pytest
+from time_insight.tracker import ipc
+from time_insight.tracker.ipc import TrackerServer, TrackerClient
+from time_insight.tracker.service import handle_stats
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(ipc, "TRACKER_KEY_PATH", str(tmp_path / "tracker_ipc.key"))
+    monkeypatch.setattr(ipc, "get_address", lambda: ("127.0.0.1", 0))     #free port
+    server = TrackerServer({"status": lambda command: {"running": True}, "stats": handle_stats})
+    monkeypatch.setattr(ipc, "get_address", lambda: server.listener.address)
+    server.start()
+    yield server
+    server.listener.close()
+
+def test_command_is_answered(server):
+    assert TrackerClient().status() == {"ok": True, "running": True}
+
+def test_unknown_command(server):
+    assert TrackerClient().send({"cmd": "restart"})["ok"] is False
+
+def test_stalled_client_does_not_block_other_clients(server):
+    with socket.create_connection(server.listener.address) as stalled:     #connects and never answers the challenge
+        stalled.settimeout(5)
+        assert TrackerClient().status() == {"ok": True, "running": True}
+
+def test_client_with_wrong_key_is_refused(server, monkeypatch):
+    monkeypatch.setattr(ipc, "get_authkey", lambda: b"wrong key")
+
+    assert TrackerClient().status() is None
+
+def test_stats_dump_to_given_path(server, tmp_path):
+    path = tmp_path / "stats.json"
+
+    assert "stats" in TrackerClient().stats(dump=True, path=str(path))
+    assert json.loads(path.read_text())["phases"] is not None
@@ -0,0 +1,37 @@
+import pytest
+from time_insight.tracker.polling import AdaptivePolling
+
+def unchanged_intervals(polling, ticks):
+    return [polling.next_interval(False) for _ in range(ticks)]
+
+def test_keeps_min_interval_while_stable_ticks_not_reached():
+    polling = AdaptivePolling(1, 8, stable_ticks=3, backoff=2)
+
+    assert unchanged_intervals(polling, 3) == [1, 1, 1]
+
+def test_backs_off_up_to_max_interval():
+    polling = AdaptivePolling(1, 8, stable_ticks=3, backoff=2)
+    unchanged_intervals(polling, 3)
+
+    assert unchanged_intervals(polling, 5) == [2, 4, 8, 8, 8]
+
+def test_window_change_resets_to_min_interval():
+    polling = AdaptivePolling(1, 8, stable_ticks=0, backoff=2)
+    unchanged_intervals(polling, 4)
+
+    assert polling.next_interval(True) == 1
+    assert polling.unchanged_ticks == 0
+    assert polling.next_interval(False) == 2    #grows again from min_interval
+
+def test_reset():
+    polling = AdaptivePolling(0.5, 4, stable_ticks=0, backoff=1.5)
+    unchanged_intervals(polling, 10)
+    polling.reset()
+
+    assert polling.current_interval == 0.5
+    assert polling.next_interval(False) == pytest.approx(0.75)
+
+def test_max_interval_below_min_interval_polls_at_min_interval():
+    polling = AdaptivePolling(2, 1, stable_ticks=0, backoff=2)
+
+    assert unchanged_intervals(polling, 3) == [2, 2, 2]
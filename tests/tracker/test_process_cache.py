@@ -0,0 +1,45 @@
+from time_insight.tracker.process_cache import ProcessCache
+
+def test_returns_cached_path_of_same_process():
+    cache = ProcessCache()
+    cache.put(100, 1000.0, "C:/editor.exe")
+
+    assert cache.get(100, 1000.0) == "C:/editor.exe"
+    assert cache.get(100) == "C:/editor.exe"    #start time not known, pid is trusted
+
+def test_unknown_pid_is_a_miss():
+    assert ProcessCache().get(100, 1000.0) is None
+
+def test_reused_pid_is_a_miss_and_drops_the_entry():
+    cache = ProcessCache()
+    cache.put(100, 1000.0, "C:/editor.exe")
+
+    assert cache.get(100, 2000.0) is None   #another process got the pid
+    assert cache.get(100) is None
+    assert 100 not in cache.entries
+
+def test_put_replaces_entry_of_reused_pid():
+    cache = ProcessCache()
+    cache.put(100, 1000.0, "C:/editor.exe")
+    cache.put(100, 2000.0, "C:/browser.exe")
+
+    assert cache.get(100, 2000.0) == "C:/browser.exe"
+    assert cache.get(100, 1000.0) is None
+
+def test_evicts_least_recently_used():
+    cache = ProcessCache(maxsize=2)
+    cache.put(1, 1.0, "a.exe")
+    cache.put(2, 2.0, "b.exe")
+    cache.get(1, 1.0)   #2 is now the least recently used
+    cache.put(3, 3.0, "c.exe")
+
+    assert cache.get(2, 2.0) is None
+    assert cache.get(1, 1.0) == "a.exe"
+    assert cache.get(3, 3.0) == "c.exe"
+
+def test_clear():
+    cache = ProcessCache()
+    cache.put(1, 1.0, "a.exe")
+    cache.clear()
+
+    assert cache.get(1, 1.0) is None
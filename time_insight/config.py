@@ -17,4 +17,16 @@ DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'data', 'time_insight.db')}"
 
 #DATABASE_URL = "sqlite:///../data/time_insight.db"
 
-DB_PATH = os.path.join(DATA_DIR, 'time_insight.db')
\ No newline at end of file
+DB_PATH = os.path.join(DATA_DIR, 'time_insight.db')
+
+JOURNAL_PATH = os.path.join(DATA_DIR, 'activity_journal.jsonl')    #write-behind journal of the tracker
+TRACKER_KEY_PATH = os.path.join(DATA_DIR, 'tracker_ipc.key')    #authkey shared by the tracker process and the GUI
+
+STATS_PATH = os.path.join(DATA_DIR, 'tracker_stats.json')     #latency statistics dumped on request
+
+HEARTBEAT_PATH = os.path.join(DATA_DIR, 'tracker_heartbeat.bin')   #last alive time of the tracker
+
+DATA_VERSION_PATH = os.path.join(DATA_DIR, 'data_version.bin')     #write counters shared by the tracker and the GUI
+
+LOG_PATH = os.path.join(DATA_DIR, 'python.log')    #rotating log file, see logging/logging.conf
+TRACKER_LOG_PATH = os.path.join(DATA_DIR, 'tracker.log')     #log file of the tracker process
@@ -0,0 +1,54 @@
+import os
+import mmap
+import struct
+from time_insight.config import DATA_VERSION_PATH
+
+from time_insight.logging.logger import data_logger as logger
+
+DATA_VERSION_FORMAT = "<QQ"     #version bumped by every write, history bumped by writes changing the past
+DATA_VERSION_SIZE = struct.calcsize(DATA_VERSION_FORMAT)
+
+class DataVersion:
+    """
+    Monotonic write counters in a tiny memory-mapped file, shared by the tracker and the GUI process.
+
+    The tracker bumps version on every commit. Rewrites of older data (closing a session left by a crash,
+    imports, rollup rebuilds) also bump history, so cached results of past ranges are dropped as well.
+    """
+    def __init__(self, path=DATA_VERSION_PATH):
+        self.path = path
+        self.map = None
+
+    def open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) != DATA_VERSION_SIZE:
+            with open(self.path, 'wb') as f:
+                f.write(b"\0" * DATA_VERSION_SIZE)
+        with open(self.path, 'r+b') as f:
+            self.map = mmap.mmap(f.fileno(), DATA_VERSION_SIZE)
+
+    def bump(self, history=False):
+        """
+        Increments the version, and the history version if history is True.
+
+        :param history: Data older than the recent minutes has changed.
+        """
+        try:
+            if self.map is None:
+                self.open()
+            version, history_version = struct.unpack_from(DATA_VERSION_FORMAT, self.map, 0)
+            struct.pack_into(DATA_VERSION_FORMAT, self.map, 0, version + 1, history_version + 1 if history else history_version)
+        except Exception as e:
+            logger.error(f"Error in data_version.py - bump: {e}")
+
+    def read(self):
+        """
+        :return: Tuple (version, history version), (0, 0) if nothing has been written yet.
+        """
+        try:
+            if self.map is None:
+                self.open()
+            return struct.unpack_from(DATA_VERSION_FORMAT, self.map, 0)
+        except (OSError, ValueError, struct.error):
+            return 0, 0
+
+data_version = DataVersion()
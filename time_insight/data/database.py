@@ -1,15 +1,147 @@
 import os
-from sqlalchemy import create_engine
+import pathlib
+import sqlite3
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import IntegrityError
 from time_insight.data.models import Base, UserSessionType
-from time_insight.config import DATABASE_URL, BASE_DIR
+from time_insight.data.migrations import run_migrations, convert_timestamp_storage
+from time_insight.data.data_version import data_version
+from time_insight.data.interning import window_titles, additional_infos
+from time_insight.config import DATABASE_URL, BASE_DIR, DB_PATH
+from time_insight.settings import get_setting, DEFAULT_SETTINGS
 
-from time_insight.logging.logger import logger
+from time_insight.logging.logger import data_logger as logger
 
-engine = create_engine(DATABASE_URL)
+#allowed values of the connection pragmas, numeric ones are checked with int()
+PRAGMA_CHOICES = {
+    "journal_mode": ("delete", "truncate", "persist", "memory", "wal"),
+    "synchronous": ("off", "normal", "full", "extra"),
+    "temp_store": ("default", "file", "memory")
+}
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_sqlite_pragmas():
+    """
+    Reads the connection pragmas from settings.
+
+    WAL lets the UI read while the tracker commits, synchronous=NORMAL is durable in WAL mode except for the last
+    commits before a power loss, and the busy timeout makes a writer wait for a lock instead of failing.
+
+    :return: Dict pragma name -> value.
+    """
+    pragmas = {}
+    for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size", "temp_store"):
+        key = f"sqlite_{name}"
+        pragmas[name] = str(get_setting(key, DEFAULT_SETTINGS[key])).lower()
+    return pragmas
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """
+    Sets pragmas on every new connection of the engine.
+
+    :param engine: SQLAlchemy engine of a SQLite database.
+    :param pragmas: Dict pragma name -> value, invalid values are logged and skipped.
+    """
+    statements = []
+    for name, value in pragmas.items():
+        value = str(value).lower()
+        if name in PRAGMA_CHOICES:
+            valid = value in PRAGMA_CHOICES[name]
+        else:
+            valid = value.lstrip("-").isdigit()
+        if not valid:
+            logger.warning(f"Invalid value {value!r} of SQLite pragma {name}, using the SQLite default.")
+            continue
+        statements.append(f"PRAGMA {name} = {value}")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        except Exception as e:
+            logger.error(f"Error in database.py - set_pragmas: {e}")
+        finally:
+            cursor.close()
+
+#all writes (tracker, scheduled tasks, migrations) go through a single connection, SQLite allows one writer anyway
+writer_engine = create_engine(DATABASE_URL, pool_size=1, max_overflow=0)
+apply_sqlite_pragmas(writer_engine, get_sqlite_pragmas())
+
+#imports, restores and rollup rebuilds started from the GUI have their own connection, so in thread mode a long one
+#does not hold the tracker's only writer connection, SQLite lets them take turns on the write lock (busy_timeout)
+bulk_engine = create_engine(DATABASE_URL, pool_size=1, max_overflow=0)
+apply_sqlite_pragmas(bulk_engine, get_sqlite_pragmas())
+
+#UI and reports read through read-only connections, they can not take the write lock by accident
+reader_pragmas = {name: value for name, value in get_sqlite_pragmas().items() if name != "journal_mode"}   #set by the writer, persistent
+reader_pragmas["query_only"] = "1"
+reader_engine = create_engine(f"sqlite:///{pathlib.Path(DB_PATH).as_uri()}?mode=ro&uri=true", pool_size=4, max_overflow=4)
+apply_sqlite_pragmas(reader_engine, reader_pragmas)
+
+def bump_data_version(connection):
+    data_version.bump()     #invalidates cached query results of ranges overlapping now
+
+event.listen(writer_engine, "commit", bump_data_version)
+event.listen(bulk_engine, "commit", bump_data_version)
+
+engine = writer_engine     #former shared engine, kept for scripts importing it
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=writer_engine)
+
+#in WAL mode committed pages can still be in the -wal file, so the database file must not be copied as a plain file
+
+def backup_database(dest):
+    """
+    Writes a consistent copy of the database, including commits still in the WAL, to a single file.
+
+    :param dest: Destination file, replaced if it exists.
+    """
+    temp_path = f"{dest}.part"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    source = reader_engine.raw_connection()
+    try:
+        target = sqlite3.connect(temp_path)
+        try:
+            source.driver_connection.backup(target)
+            target.execute("PRAGMA journal_mode = DELETE")     #copy without -wal and -shm files
+        finally:
+            target.close()
+        os.replace(temp_path, dest)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        source.close()
+
+def restore_database(src):
+    """
+    Replaces the content of the database with another database file.
+
+    The copy goes through a writing connection (SQLite backup API), so it takes the write lock and other
+    connections, also of the tracker process, see the new content instead of a half copied file.
+    The restored database is migrated to the current schema. The tracker has to be paused around the restore,
+    it keeps ids of the replaced database in memory (see restore_database_paused in ui/Settings/settings_screen.py).
+
+    :param src: Database file written by backup_database or copied from another installation.
+    """
+    source = sqlite3.connect(f"{pathlib.Path(src).as_uri()}?mode=ro", uri=True)
+    try:
+        target = bulk_engine.raw_connection()
+        try:
+            source.backup(target.driver_connection)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+    window_titles.clear()   #ids of the restored dictionary tables differ
+    additional_infos.clear()
+    run_migrations(bulk_engine)
+    convert_timestamp_storage(bulk_engine)
+    data_version.bump(history=True)
 
 def init_db():
     #log_to_console(DATABASE_URL)
@@ -19,7 +151,16 @@ def init_db():
     if not os.path.exists(db_path):
         logger.info("Database file not found. Creating a new database.")
 
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=writer_engine)
+
+    try:
+        run_migrations(writer_engine)  #bring existing databases to the current schema
+        convert_timestamp_storage(writer_engine)   #timestamp_storage setting has changed
+        data_version.bump(history=True)
+    except Exception as e:
+        #the app must not run on a partly migrated schema, the failed migration is retried on the next start
+        logger.error(f"Error in database.py - init_db: {e}")
+        raise
 
     logger.info("Database initialization started.")
 
@@ -39,4 +180,4 @@ def init_db():
         logger.error(f"Error during database initialization: {e}")
     finally:
         session.close()
-        logger.info("Database initialization completed successfully.")
\ No newline at end of file
+        logger.info("Database initialization completed successfully.")
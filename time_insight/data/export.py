@@ -0,0 +1,87 @@
+import os
+import csv
+from sqlalchemy import select, func
+from time_insight.data.database import reader_engine
+from time_insight.data.models import ApplicationActivity, Application, UserSession, UserSessionType
+from time_insight.data.interning import join_activity_texts, activity_window_name, activity_additional_info
+
+from time_insight.logging.logger import data_logger as logger
+
+CHUNK_SIZE = 10000  #rows fetched and written at a time, memory use does not grow with the table
+
+def programs_export_query():
+    return join_activity_texts(select(
+        ApplicationActivity.id.label("Activity ID"),
+        ApplicationActivity.application_id.label("Application ID"),
+        activity_window_name.label("Window Name"),
+        activity_additional_info.label("Additional Info"),
+        ApplicationActivity.session_start.label("Start Time"),
+        ApplicationActivity.session_end.label("End Time"),
+        ApplicationActivity.duration.label("Duration"),
+        Application.name.label("Program Name"),
+        Application.desc.label("Program Description"),
+        Application.enrollment_date.label("Enrollment Date"),
+        Application.path.label("Program Path")
+    ).join(
+        Application, Application.id == ApplicationActivity.application_id
+    )).order_by(ApplicationActivity.id)
+
+def sessions_export_query():
+    return select(
+        UserSession.id.label("Session id"),
+        UserSessionType.name.label("Session type name"),
+        UserSession.session_start.label("Start Time"),
+        UserSession.session_end.label("End Time"),
+        UserSession.duration.label("Duration")
+    ).join(
+        UserSessionType, UserSession.user_session_type_id == UserSessionType.id
+    ).order_by(UserSession.id)
+
+def export_csv(query, path, chunk_size=CHUNK_SIZE, progress=None, cancelled=None):
+    """
+    Writes the result of a query to a CSV file chunk by chunk.
+
+    Rows are streamed from the database cursor (yield_per) and written as they come, into a temporary file
+    which replaces path only when the export completes, so a cancelled or failed export leaves no partial file.
+
+    :param query: SQLAlchemy select statement with labeled columns, the labels are the header.
+    :param path: Destination file.
+    :param chunk_size: Number of rows fetched at a time.
+    :param progress: Called with (rows written, total rows) after every chunk, if given.
+    :param cancelled: Called after every chunk, the export stops if it returns True, if given.
+    :return: True if the file has been written, False if cancelled.
+    """
+    temp_path = f"{path}.part"
+    completed = False
+    try:
+        with reader_engine.connect() as connection:
+            total = connection.execute(select(func.count()).select_from(query.order_by(None).subquery())).scalar()
+            result = connection.execution_options(yield_per=chunk_size).execute(query)
+
+            with open(temp_path, 'w', newline='', encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(result.keys())
+
+                written = 0
+                for rows in result.partitions():
+                    writer.writerows(rows)
+                    written += len(rows)
+                    if progress:
+                        progress(written, total)
+                    if cancelled and cancelled():
+                        result.close()
+                        break
+                else:
+                    completed = True
+
+        if completed:
+            os.replace(temp_path, path)
+            logger.info(f"Exported {written} rows to {path}.")
+        else:
+            os.remove(temp_path)
+            logger.info(f"Export to {path} cancelled.")
+        return completed
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
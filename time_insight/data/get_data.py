@@ -1,147 +1,389 @@
+import numpy as np
+import pandas as pd             #type: ignore
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from time_insight.data.database import engine
-from time_insight.data.models import Application, ApplicationActivity, UserSession, UserSessionType
-from datetime import datetime
+from time_insight.data.database import reader_engine
+from time_insight.data.models import Application, ApplicationActivity, UserSession, UserSessionType, DailyAppUsage, HourlyActiveUsage
+from time_insight.data.segmentation import segment
+from time_insight.data.rollups import local_day_segments, local_hour_segments
+from time_insight.data.query_cache import cached_query
+from time_insight.data.intervals import overlap_filter, clipped_interval
+from time_insight.data.interning import join_activity_texts, activity_window_name, activity_additional_info
+from datetime import date, datetime, timedelta, timezone
 
-from time_insight.logging.logger import logger
+from time_insight.logging.logger import data_logger as logger
+
+#column types of the frames, columns not listed keep the type pandas infers (ids, durations)
+DATETIME = "datetime"
+CATEGORY = "category"
+
+def result_to_frame(result, column_types):
+    """
+    Builds a DataFrame from a query result column by column, without a dict per row.
+
+    Datetime columns become datetime64 (None -> NaT), repeated texts (names, titles, paths) categoricals.
+
+    :param result: SQLAlchemy Result of a query with labeled columns.
+    :param column_types: Dict column label -> DATETIME or CATEGORY.
+    :return: pd.DataFrame with the columns in query order.
+    """
+    keys = list(result.keys())
+    rows = result.all()
+    columns = list(zip(*rows)) if rows else [()] * len(keys)
+
+    data = {}
+    for key, values in zip(keys, columns):
+        column_type = column_types.get(key)
+        if column_type == DATETIME:
+            data[key] = np.array(values, dtype="datetime64[us]")
+        elif column_type == CATEGORY:
+            data[key] = pd.Categorical(values)
+        else:
+            data[key] = pd.Series(values, dtype=None if rows else float)
+    return pd.DataFrame(data, columns=keys)
+
+def query_frame(query, column_types):
+    """
+    Runs a query on the reader engine and returns it as a DataFrame, see result_to_frame.
+
+    :param query: SQLAlchemy select statement with labeled columns.
+    :param column_types: Dict column label -> DATETIME or CATEGORY.
+    """
+    with Session(reader_engine) as session:
+        return result_to_frame(session.execute(query), column_types)
+
+def day_range(start_date, end_date):
+    """
+    Dates are local, like the days of the rollups, the bounds are naive UTC like the stored times.
+
+    :return: Tuple (start of the first day, start of the day after the last one).
+    """
+    range_start = local_midnight(date(start_date.year(), start_date.month(), start_date.day()))
+    range_end = local_midnight(date(end_date.year(), end_date.month(), end_date.day()) + timedelta(days=1))
+    return range_start, range_end
+
+def local_midnight(day):
+    """
+    :return: Start of the local day as naive UTC datetime.
+    """
+    return datetime(day.year, day.month, day.day).astimezone(timezone.utc).replace(tzinfo=None)
+
+def clipped_duration(frame):
+    """
+    Sets "Duration" of a frame with clipped "Start Time" and "End Time" to the seconds inside the range.
+    """
+    if not frame.empty:
+        frame["Duration"] = (frame["End Time"] - frame["Start Time"]).dt.total_seconds().round(3)
+    return frame
+
+PROGRAM_COLUMNS = {
+    "Name": CATEGORY,
+    "Description": CATEGORY,
+    "Enrollment Date": DATETIME,
+    "Path": CATEGORY,
+    "Window Name": CATEGORY,
+    "Additional Info": CATEGORY,
+    "Start Time": DATETIME,
+    "End Time": DATETIME
+}
+
+@cached_query("programs")
+def get_programs_frame(start_date, end_date):
+    """
+    Get all programs and activities data within specified time range as columns.
+
+    Activities crossing the range edges, and the one still running, are clipped to the range.
+    For totals per program over long ranges use get_programs_usage_frame.
+
+    :param: start_date: datetime, start date of the range
+    :param: end_date: datetime, end date of the range
+    :return: pd.DataFrame, empty on error
+    """
+    try:
+        range_start, range_end = day_range(start_date, end_date)
+        clipped_start, clipped_end = clipped_interval(ApplicationActivity, range_start, range_end)
+
+        query = join_activity_texts(select(
+            Application.id.label("Application ID"),
+            Application.name.label("Name"),
+            Application.desc.label("Description"),
+            Application.enrollment_date.label("Enrollment Date"),
+            Application.path.label("Path"),
+            ApplicationActivity.id.label("Activity ID"),
+            activity_window_name.label("Window Name"),
+            activity_additional_info.label("Additional Info"),
+            clipped_start.label("Start Time"),
+            clipped_end.label("End Time"),
+            ApplicationActivity.duration.label("Duration"),
+        ).join(ApplicationActivity, Application.id == ApplicationActivity.application_id)) \
+            .where(overlap_filter(ApplicationActivity, range_start, range_end))
+        return clipped_duration(query_frame(query, PROGRAM_COLUMNS))
+    except Exception as e:
+        logger.error(f"Error in get_data.py - get_programs_frame: {e}")
+        return pd.DataFrame()
 
 def get_programs_data(start_date, end_date, count):
     """
-    Get all programs and activities data within specified time range.
+    Get all programs and activities data within specified time range, see get_programs_frame.
     
     :param: start_date: datetime, start date of the range
     :param: end_date: datetime, end date of the range
     :param: count: int, not implemented
+    :return: list of dicts
+    """
+    return get_programs_frame(start_date, end_date).to_dict("records")
+
+@cached_query("programs_usage")
+def get_programs_usage_frame(start_date, end_date):
+    """
+    Get time spent in every program within specified range of local dates.
+
+    Closed activities are read from the daily_app_usage rollup, activities still running are added up to now,
+    like in get_hourly_active_usage.
+
+    :param: start_date: datetime, start date of the range
+    :param: end_date: datetime, end date of the range (inclusive)
+    :return: pd.DataFrame, one row per program, empty on error
     """
     try:
-        start_of_day = datetime(start_date.year(), start_date.month(), start_date.day(), 0, 0, 0)
-        end_of_day = datetime(end_date.year(), end_date.month(), end_date.day(), 23, 59, 59)
+        first_day = date(start_date.year(), start_date.month(), start_date.day())
+        last_day = date(end_date.year(), end_date.month(), end_date.day())
+
+        with Session(reader_engine) as session:
+            last_activity = session.query(ApplicationActivity.application_id, ApplicationActivity.session_start, ApplicationActivity.session_end) \
+                .filter(ApplicationActivity.session_end.is_(None)) \
+                .order_by(ApplicationActivity.session_start.desc(), ApplicationActivity.id.desc()).first()
 
-        with Session(engine) as session:
-            programs = session.query(
+        #seconds and activity count of the running activity inside the range, program id -> [seconds, count]
+        running = {}
+        if last_activity and last_activity.session_end is None and last_activity.application_id is not None:
+            segments = local_day_segments(last_activity.session_start, datetime.now(timezone.utc))
+            seconds = sum(seconds for local_date, seconds in segments if first_day <= local_date <= last_day)
+            if seconds > 0:
+                started_inside = first_day <= segments[0][0] <= last_day   #counted on the day it started, like in the rollup
+                running[last_activity.application_id] = [seconds, 1 if started_inside else 0]
+
+        query = select(
+            Application.id.label("Application ID"),
+            Application.name.label("Name"),
+            Application.desc.label("Description"),
+            Application.enrollment_date.label("Enrollment Date"),
+            Application.path.label("Path"),
+            func.sum(DailyAppUsage.seconds).label("Duration"),
+            func.sum(DailyAppUsage.activity_count).label("Activity Count")
+        ).join(DailyAppUsage, Application.id == DailyAppUsage.application_id) \
+            .where(
+                DailyAppUsage.local_date >= first_day,
+                DailyAppUsage.local_date <= last_day
+            ).group_by(Application.id)
+        frame = query_frame(query, PROGRAM_COLUMNS)
+        if not running:
+            return frame
+
+        missing = [application_id for application_id in running if application_id not in set(frame["Application ID"])]
+        if missing:
+            #programs used only by the running activity have no rollup row in the range yet
+            query = select(
                 Application.id.label("Application ID"),
                 Application.name.label("Name"),
                 Application.desc.label("Description"),
                 Application.enrollment_date.label("Enrollment Date"),
-                Application.path.label("Path"),
-                ApplicationActivity.id.label("Activity ID"),
-                ApplicationActivity.window_name.label("Window Name"),
-                ApplicationActivity.additional_info.label("Additional Info"),
-                ApplicationActivity.session_start.label("Start Time"),
-                ApplicationActivity.session_end.label("End Time"),
-                ApplicationActivity.duration.label("Duration"),
-            ).join(ApplicationActivity, Application.id == ApplicationActivity.application_id) \
-                .filter(
-                    ApplicationActivity.session_start >= start_of_day,
-                    ApplicationActivity.session_end <= end_of_day
-                ).all()
-
-            programs_data = []
-            for program in programs:
-                programs_data.append({
-                    "Application ID": program[0],
-                    "Name": program[1],
-                    "Description": program[2],
-                    "Enrollment Date": program[3],
-                    "Path": program[4],
-                    "Activity ID": program[5],
-                    "Window Name": program[6],
-                    "Additional Info": program[7],
-                    "Start Time": program[8],
-                    "End Time": program[9],
-                    "Duration": program[10],
-                })
-
-            return programs_data
+                Application.path.label("Path")
+            ).where(Application.id.in_(missing))
+            programs = query_frame(query, PROGRAM_COLUMNS)
+            programs["Duration"] = 0.0
+            programs["Activity Count"] = 0
+            frame = pd.concat([frame, programs], ignore_index=True) if not frame.empty else programs
+            for column, column_type in PROGRAM_COLUMNS.items():
+                if column_type == CATEGORY and column in frame:
+                    frame[column] = frame[column].astype("category")   #concat of different categories gives object
+
+        frame["Duration"] = frame["Duration"].astype(float) + frame["Application ID"].map(lambda i: running.get(i, (0, 0))[0])
+        frame["Activity Count"] = frame["Activity Count"] + frame["Application ID"].map(lambda i: running.get(i, (0, 0))[1])
+        return frame
     except Exception as e:
-        logger.error(f"Error in get_data.py - get_programs_data: {e}")
+        logger.error(f"Error in get_data.py - get_programs_usage_frame: {e}")
+        return pd.DataFrame()
+
+def get_programs_usage(start_date, end_date):
+    """
+    Get time spent in every program within specified range of local dates, see get_programs_usage_frame.
+
+    :return: list of dicts, one per program
+    """
+    return get_programs_usage_frame(start_date, end_date).to_dict("records")
+
+ACTIVITY_COLUMNS = {
+    "Window Name": CATEGORY,
+    "Additional Info": CATEGORY,
+    "Start Time": DATETIME,
+    "End Time": DATETIME,
+    "Program Name": CATEGORY,
+    "Program Description": CATEGORY,
+    "Enrollment Date": DATETIME,
+    "Program Path": CATEGORY
+}
+
+@cached_query("activity")
+def get_activity_frame(start_date, end_date):
+    """
+    Get all activities data within specified time range as columns.
+
+    Activities crossing the range edges, and the one still running, are clipped to the range.
+
+    :param: start_date: datetime, start date of the range
+    :param: end_date: datetime, end date of the range
+    :return: pd.DataFrame, empty on error
+    """
+    try:
+        range_start, range_end = day_range(start_date, end_date)
+        clipped_start, clipped_end = clipped_interval(ApplicationActivity, range_start, range_end)
+
+        query = join_activity_texts(select(
+            ApplicationActivity.id.label("Activity ID"),
+            ApplicationActivity.application_id.label("Application ID"),
+            activity_window_name.label("Window Name"),
+            activity_additional_info.label("Additional Info"),
+            clipped_start.label("Start Time"),
+            clipped_end.label("End Time"),
+            ApplicationActivity.duration.label("Duration"),
+            Application.name.label("Program Name"),
+            Application.desc.label("Program Description"),
+            Application.enrollment_date.label("Enrollment Date"),
+            Application.path.label("Program Path")
+        ).join(
+            Application, Application.id == ApplicationActivity.application_id
+        )).where(overlap_filter(ApplicationActivity, range_start, range_end))
+        return clipped_duration(query_frame(query, ACTIVITY_COLUMNS))
+    except Exception as e:
+        logger.error(f"Error in get_data.py - get_activity_frame: {e}")
+        return pd.DataFrame()
 
 def get_activity_data(start_date, end_date, count):
-        """
-        Get all activities data within specified time range.
-        
-        :param: start_date: datetime, start date of the range
-        :param: end_date: datetime, end date of the range
-        :param: count: int, not implemented
-        """
-        try:
-            start_of_day = datetime(start_date.year(), start_date.month(), start_date.day(), 0, 0, 0)
-            end_of_day = datetime(end_date.year(), end_date.month(), end_date.day(), 23, 59, 59)
-
-            with Session(engine) as session:
-                activities = session.query(
-                    ApplicationActivity.id.label("Activity ID"),
-                    ApplicationActivity.application_id.label("Application ID"),
-                    ApplicationActivity.window_name.label("Window Name"),
-                    ApplicationActivity.additional_info.label("Additional Info"),
-                    ApplicationActivity.session_start.label("Start Time"),
-                    ApplicationActivity.session_end.label("End Time"),
-                    ApplicationActivity.duration.label("Duration"),
-                    Application.name.label("Program Name"),
-                    Application.desc.label("Program Description"),
-                    Application.enrollment_date.label("Enrollment Date"),
-                    Application.path.label("Program Path")
-                ).join(
-                    Application, Application.id == ApplicationActivity.application_id
-                ).filter(
-                    ApplicationActivity.session_start >= start_of_day,
-                    ApplicationActivity.session_end <= end_of_day
-                ).all()
-
-                activity_data = []
-                for activity in activities:
-                    activity_data.append({
-                        "Activity ID": activity[0],
-                        "Application ID": activity[1],
-                        "Window Name": activity[2],
-                        "Additional Info": activity[3],
-                        "Start Time": activity[4],
-                        "End Time": activity[5],
-                        "Duration": activity[6],
-                        "Program Name": activity[7],
-                        "Program Description": activity[8],
-                        "Enrollment Date": activity[9],
-                        "Program Path": activity[10]
-                    })
-
-                return activity_data
-        except Exception as e:
-            logger.error(f"Error in get_data.py - get_activity_data: {e}")
-            return []
+    """
+    Get all activities data within specified time range, see get_activity_frame.
+
+    :param: start_date: datetime, start date of the range
+    :param: end_date: datetime, end date of the range
+    :param: count: int, not implemented
+    :return: list of dicts
+    """
+    return get_activity_frame(start_date, end_date).to_dict("records")
+
+SESSION_COLUMNS = {
+    "Session type name": CATEGORY,
+    "Start Time": DATETIME,
+    "End Time": DATETIME
+}
+
+@cached_query("computer_usage")
+def get_computer_usage_frame(start_date, end_date):
+    """
+    Get all user sessions data within specified time range as columns.
+
+    Sessions crossing the range edges, and the one still running, are clipped to the range.
+
+    :param: start_date: datetime, start date of the range
+    :param: end_date: datetime, end date of the range
+    :return: pd.DataFrame, empty on error
+    """
+    try:
+        range_start, range_end = day_range(start_date, end_date)
+        clipped_start, clipped_end = clipped_interval(UserSession, range_start, range_end)
+
+        query = select(
+            UserSession.id.label("Session id"),
+            UserSessionType.name.label("Session type name"),
+            clipped_start.label("Start Time"),
+            clipped_end.label("End Time"),
+            UserSession.duration.label("Duration")
+        ).join(
+            UserSessionType, UserSession.user_session_type_id == UserSessionType.id
+        ).where(overlap_filter(UserSession, range_start, range_end))
+        frame = clipped_duration(query_frame(query, SESSION_COLUMNS))
+        if frame.empty:
+            logger.info("No user sessions found.")
+        return frame
+    except Exception as e:
+        logger.error(f"Error in get_data.py - get_computer_usage_frame: {e}")
+        return pd.DataFrame()
 
 def get_computer_usage_data(start_date, end_date):
     """
-    Get all user sessions data within specified time range.
-    
+    Get all user sessions data within specified time range, see get_computer_usage_frame.
+
+    :param: start_date: datetime, start date of the range
+    :param: end_date: datetime, end date of the range
+    :return: list of dicts
+    """
+    return get_computer_usage_frame(start_date, end_date).to_dict("records")
+
+@cached_query("active_usage")
+def get_active_usage_data(start_date, end_date, granularity="day"):
+    """
+    Get time spent in active user sessions within specified time range, cut into buckets.
+
+    Sessions are clipped to the range in the query and cut at bucket boundaries after it, so long sessions are
+    counted in every bucket they overlap. The session still running is counted up to now. Buckets are aligned
+    in UTC, like the returned times. For local hours over long ranges use get_hourly_active_usage.
+
     :param: start_date: datetime, start date of the range
     :param: end_date: datetime, end date of the range
+    :param: granularity: str, bucket size ("30min", "hour", "day")
+    :return: list of dicts with "Start Time", "End Time" and "Duration" (seconds) of every segment
     """
     try:
-        start_of_day = datetime(start_date.year(), start_date.month(), start_date.day(), 0, 0, 0)
-        end_of_day = datetime(end_date.year(), end_date.month(), end_date.day(), 23, 59, 59)
-
-        with Session(engine) as session:
-            user_sessions = session.query(UserSession, UserSessionType.name).join(
-                UserSessionType, UserSession.user_session_type_id == UserSessionType.id
-            ).filter(
-                UserSession.session_start >= start_of_day,
-                UserSession.session_end <= end_of_day
+        range_start, range_end = day_range(start_date, end_date)
+        clipped_start, clipped_end = clipped_interval(UserSession, range_start, range_end)
+
+        query = select(
+            clipped_start.label("Start Time"),
+            clipped_end.label("End Time")
+        ).join(
+            UserSessionType, UserSession.user_session_type_id == UserSessionType.id
+        ).where(
+            UserSessionType.name == "Active",
+            overlap_filter(UserSession, range_start, range_end)
+        )
+        with Session(reader_engine) as session:
+            rows = [{"Start Time": start, "End Time": end} for start, end in session.execute(query)]
+
+        return segment(rows, granularity)
+    except Exception as e:
+        logger.error(f"Error in get_data.py - get_active_usage_data: {e}")
+        return []
+
+@cached_query("hourly_active_usage")
+def get_hourly_active_usage(start_date, end_date):
+    """
+    Get time spent in active user sessions per local hour within specified range of local dates.
+
+    Closed sessions are read from the hourly_active_usage rollup, the session still running is added up to now.
+
+    :param: start_date: datetime, start date of the range
+    :param: end_date: datetime, end date of the range (inclusive)
+    :return: list of dicts with "Date", "Hour" and "Duration" (seconds), sorted by time
+    """
+    try:
+        first_day = date(start_date.year(), start_date.month(), start_date.day())
+        last_day = date(end_date.year(), end_date.month(), end_date.day())
+
+        with Session(reader_engine) as session:
+            rows = session.query(HourlyActiveUsage.local_date, HourlyActiveUsage.hour, HourlyActiveUsage.seconds).filter(
+                HourlyActiveUsage.local_date >= first_day,
+                HourlyActiveUsage.local_date <= last_day
             ).all()
+            last_session = session.query(UserSession.user_session_type_id, UserSession.session_start, UserSession.session_end) \
+                .filter(UserSession.session_end.is_(None)) \
+                .order_by(UserSession.session_start.desc(), UserSession.id.desc()).first()
+
+        usage = {(local_date, hour): seconds for local_date, hour, seconds in rows}
+        if last_session and last_session.user_session_type_id == 1 and last_session.session_end is None:
+            for local_date, hour, seconds in local_hour_segments(last_session.session_start, datetime.now(timezone.utc)):
+                if first_day <= local_date <= last_day:
+                    usage[(local_date, hour)] = usage.get((local_date, hour), 0) + seconds
 
-            if user_sessions:
-                user_sessions_data = []
-                for session, session_type_name in user_sessions:
-                    session_data = {
-                        "Session id": session.id,
-                        "Session type name": session_type_name,
-                        "Start Time": session.session_start,
-                        "End Time": session.session_end,
-                        "Duration": session.duration
-                    }
-                    user_sessions_data.append(session_data)
-            else:
-                logger.info("No user sessions found.")
-
-        return user_sessions_data
+        return [{"Date": local_date, "Hour": hour, "Duration": seconds} for (local_date, hour), seconds in sorted(usage.items())]
     except Exception as e:
-        logger.error(f"Error in get_data.py - get_computer_usage_data: {e}")
\ No newline at end of file
+        logger.error(f"Error in get_data.py - get_hourly_active_usage: {e}")
+        return []
@@ -0,0 +1,141 @@
+import hashlib
+from collections import OrderedDict
+from sqlalchemy import func, text, select, inspect
+from time_insight.data.models import ApplicationActivity, WindowTitle, AdditionalInfo
+
+from time_insight.logging.logger import data_logger as logger
+
+def text_hash(value):
+    """
+    Hash of an interned text, fits into a SQLite INTEGER.
+
+    :param value: The text.
+    :return: Signed 64-bit integer.
+    """
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+class TextInterner:
+    """
+    Maps repeated texts (window titles, additional info) to ids of their dictionary table rows.
+
+    Keeps an LRU of the most recently used texts, so storing an activity with a known title does not query the database.
+    """
+    def __init__(self, model, maxsize=4096):
+        """
+        :param model: Dictionary table model with hash and text columns (WindowTitle, AdditionalInfo).
+        :param maxsize: Maximum number of cached texts.
+        """
+        self.model = model
+        self.maxsize = maxsize
+        self.ids = OrderedDict()    #text -> id
+
+    def resolve(self, session, value):
+        """
+        Returns the id of the text, inserting it into the dictionary table if needed.
+
+        New rows are only flushed, they are committed together with the caller's transaction.
+        Call clear() if that transaction is rolled back.
+
+        :param session: SQLAlchemy session object used for database interactions.
+        :param value: The text, None is not interned.
+        :return: Row id, or None for None.
+        """
+        if value is None:
+            return None
+
+        text_id = self.ids.get(value)
+        if text_id is not None:
+            self.ids.move_to_end(value)
+            return text_id
+
+        value_hash = text_hash(value)
+        text_id = session.query(self.model.id).filter(self.model.hash == value_hash, self.model.text == value).scalar()
+        if text_id is None:
+            entry = self.model(hash=value_hash, text=value)
+            session.add(entry)
+            session.flush()     #assigns id
+            text_id = entry.id
+
+        self.ids[value] = text_id
+        if len(self.ids) > self.maxsize:
+            self.ids.popitem(last=False)
+        return text_id
+
+    def clear(self):
+        self.ids.clear()
+
+window_titles = TextInterner(WindowTitle)
+additional_infos = TextInterner(AdditionalInfo)
+
+def join_activity_texts(query):
+    """
+    Joins the dictionary tables of the activity texts to a query on ApplicationActivity.
+
+    Use activity_window_name and activity_additional_info to select the texts.
+
+    :param query: SQLAlchemy query selecting from ApplicationActivity.
+    :return: The query with outer joins added.
+    """
+    return query.outerjoin(WindowTitle, WindowTitle.id == ApplicationActivity.window_title_id) \
+        .outerjoin(AdditionalInfo, AdditionalInfo.id == ApplicationActivity.additional_info_id)
+
+#texts of activities stored before and after interning
+activity_window_name = func.coalesce(WindowTitle.text, ApplicationActivity.window_name)
+activity_additional_info = func.coalesce(AdditionalInfo.text, ApplicationActivity.additional_info)
+
+def intern_activity_texts(connection):
+    """
+    Adds the interning columns to an existing database and moves the texts of old activities to the dictionary tables.
+
+    :param connection: SQLAlchemy connection inside a transaction.
+    """
+    columns = {column["name"] for column in inspect(connection).get_columns("application_activity")}
+    if "window_title_id" not in columns:
+        connection.execute(text("ALTER TABLE application_activity ADD COLUMN window_title_id INTEGER REFERENCES window_title(id)"))
+    if "additional_info_id" not in columns:
+        connection.execute(text("ALTER TABLE application_activity ADD COLUMN additional_info_id INTEGER REFERENCES additional_info(id)"))
+    for index in ApplicationActivity.__table__.indexes:
+        if "window_title_id" in index.columns:
+            index.create(bind=connection, checkfirst=True)
+
+    intern_column(connection, "window_name", "window_title_id", WindowTitle.__table__, "''")
+    intern_column(connection, "additional_info", "additional_info_id", AdditionalInfo.__table__, "NULL")
+
+def intern_column(connection, column, id_column, table, cleared):
+    """
+    Moves texts of one application_activity column to its dictionary table.
+
+    :param connection: SQLAlchemy connection inside a transaction.
+    :param column: Name of the text column.
+    :param id_column: Name of the column referencing the dictionary table.
+    :param table: Dictionary Table object.
+    :param cleared: SQL value the text column is set to once interned.
+    """
+    values = connection.execute(text(
+        f"SELECT DISTINCT {column} FROM application_activity WHERE {id_column} IS NULL AND {column} IS NOT NULL AND {column} != ''"
+    )).scalars().all()
+    if not values:
+        return
+
+    existing = {(row.hash, row.text): row.id for row in connection.execute(select(table.c.id, table.c.hash, table.c.text))}
+    missing = []
+    for value in values:
+        if (text_hash(value), value) not in existing:
+            missing.append({"hash": text_hash(value), "text": value})
+    if missing:
+        connection.execute(table.insert(), missing)
+        existing = {(row.hash, row.text): row.id for row in connection.execute(select(table.c.id, table.c.hash, table.c.text))}
+
+    #update all rows in one statement through a temporary text -> id map
+    connection.execute(text("CREATE TEMP TABLE intern_map (text TEXT PRIMARY KEY, id INTEGER NOT NULL)"))
+    connection.execute(
+        text("INSERT INTO intern_map (text, id) VALUES (:text, :id)"),
+        [{"text": value, "id": existing[(text_hash(value), value)]} for value in values]
+    )
+    result = connection.execute(text(
+        f"UPDATE application_activity SET {id_column} = (SELECT id FROM intern_map WHERE intern_map.text = application_activity.{column}), "
+        f"{column} = {cleared} WHERE {id_column} IS NULL AND {column} IN (SELECT text FROM intern_map)"
+    ))
+    connection.execute(text("DROP TABLE intern_map"))
+
+    logger.info(f"Interned {len(values)} distinct {column} texts of {result.rowcount} activities.")
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+from sqlalchemy import func, or_, literal
+from time_insight.data.models import Timestamp
+
+#Range queries on tables with session_start/session_end intervals (application_activity, user_session).
+#Intervals may overlap (imported history, clock changes), so no row starting before a range can be left out
+#by its start alone. The (session_start, session_end) index serves the condition as a range scan on the start,
+#the end is checked from the index entry without reading the row.
+
+def overlap_filter(model, range_start, range_end):
+    """
+    SQL condition selecting rows whose interval overlaps [range_start, range_end).
+
+    Rows which have not ended yet (session_end NULL) overlap every range after their start.
+
+    :param model: Model with session_start and session_end columns.
+    :param range_start: Start of the range (naive UTC).
+    :param range_end: End of the range, exclusive (naive UTC).
+    """
+    start, end = model.session_start, model.session_end
+    return (start < range_end) & or_(end > range_start, end.is_(None))
+
+def clipped_interval(model, range_start, range_end, now=None):
+    """
+    SQL expressions of the row interval cut to [range_start, range_end).
+
+    :param model: Model with session_start and session_end columns.
+    :param range_start: Start of the range (naive UTC).
+    :param range_end: End of the range, exclusive (naive UTC).
+    :param now: End used for rows which have not ended yet, current time if not given (naive UTC).
+    :return: Tuple (start expression, end expression), both of the Timestamp type.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)   #stored times are naive utc
+
+    start = func.max(model.session_start, literal(range_start, Timestamp), type_=Timestamp)
+    end = func.min(func.coalesce(model.session_end, literal(now, Timestamp)), literal(range_end, Timestamp), type_=Timestamp)
+    return start, end
@@ -0,0 +1,111 @@
+from sqlalchemy import func, text, select, update, delete
+from time_insight.data.models import Application, ApplicationActivity, UserSession, SchemaVersion, Timestamp
+from time_insight.data.interning import intern_activity_texts
+from time_insight.data.rollups import rebuild_daily_app_usage, rebuild_hourly_active_usage
+
+from time_insight.logging.logger import data_logger as logger
+
+#create_all only creates missing tables, every change of an existing table needs a migration here.
+#Migrations run in order, each in its own transaction, and must be safe to run on a database created
+#by create_all which already has the change.
+
+def merge_duplicate_applications(connection):
+    """
+    Merges applications with the same name into the one with the lowest id, activities are moved to it.
+
+    :return: Number of removed application rows.
+    """
+    duplicates = connection.execute(
+        select(Application.name, func.min(Application.id)).group_by(Application.name).having(func.count() > 1)
+    ).all()
+    removed = 0
+    for name, keep_id in duplicates:
+        duplicate_ids = select(Application.id).where(Application.name == name, Application.id != keep_id)
+        connection.execute(update(ApplicationActivity).where(ApplicationActivity.application_id.in_(duplicate_ids))
+                           .values(application_id=keep_id))
+        removed += connection.execute(delete(Application).where(Application.name == name, Application.id != keep_id)).rowcount
+    if removed:
+        logger.info(f"Merged {removed} duplicate applications.")
+    return removed
+
+def create_application_indexes(connection):
+    merge_duplicate_applications(connection)     #unique index can not be created while duplicate names exist
+    for index in Application.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+def create_time_range_indexes(connection):
+    for table in (ApplicationActivity.__table__, UserSession.__table__):
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+MIGRATIONS = [
+    (1, "Merge duplicate applications, unique index on application.name", create_application_indexes),
+    (2, "Intern window titles and additional info", intern_activity_texts),
+    (3, "Indexes on activity and session time ranges", create_time_range_indexes),
+    (4, "Daily application usage rollup", rebuild_daily_app_usage),
+    (5, "Hourly active usage rollup", rebuild_hourly_active_usage),
+]
+
+def get_schema_version(connection):
+    return connection.execute(func.max(SchemaVersion.version).select()).scalar() or 0
+
+def run_migrations(engine):
+    """
+    Applies migrations newer than the schema version of the database.
+
+    :param engine: The SQLAlchemy engine used to interact with the database.
+    """
+    with engine.connect() as connection:
+        current_version = get_schema_version(connection)
+
+    for version, description, migration in MIGRATIONS:
+        if version <= current_version:
+            continue
+
+        logger.info(f"Applying migration {version}: {description}.")
+        with engine.begin() as connection:
+            migration(connection)
+            connection.execute(SchemaVersion.__table__.insert().values(version=version, description=description))
+
+    if MIGRATIONS and MIGRATIONS[-1][0] > current_version:
+        logger.info(f"Database schema upgraded from version {current_version} to {MIGRATIONS[-1][0]}.")
+
+#tables and columns stored by the Timestamp type
+TIMESTAMP_COLUMNS = {
+    "application_activity": ("session_start", "session_end"),
+    "user_session": ("session_start", "session_end")
+}
+
+def convert_timestamp_storage(engine, storage=None):
+    """
+    Converts stored timestamps to the storage format of the Timestamp type ("epoch" or "text").
+
+    Does nothing if the rows already use it. Integers sort before text in SQLite, so the check
+    reads one end of the session_start index instead of scanning the table.
+
+    :param engine: The SQLAlchemy engine used to interact with the database.
+    :param storage: Target format, Timestamp.storage if not given.
+    """
+    storage = storage or Timestamp.storage
+    if storage == "epoch":
+        #text -> milliseconds since 1970-01-01 UTC
+        other_type, order = "text", "DESC"
+        convert = "CAST(ROUND((julianday({column}) - 2440587.5) * 86400000) AS INTEGER)"
+    else:
+        #milliseconds -> text in the format of the sqlalchemy DateTime type
+        other_type, order = "integer", "ASC"
+        convert = "strftime('%Y-%m-%d %H:%M:%S', {column} / 1000, 'unixepoch') || '.' || printf('%06d', ({column} % 1000) * 1000)"
+
+    with engine.begin() as connection:
+        for table, columns in TIMESTAMP_COLUMNS.items():
+            edge = connection.execute(text(
+                f"SELECT typeof(session_start) FROM {table} WHERE session_start IS NOT NULL ORDER BY session_start {order} LIMIT 1"
+            )).scalar()
+            if edge != other_type:
+                continue
+
+            for column in columns:
+                result = connection.execute(text(
+                    f"UPDATE {table} SET {column} = {convert.format(column=column)} WHERE typeof({column}) = '{other_type}'"
+                ))
+                logger.info(f"Converted {result.rowcount} {table}.{column} timestamps to {storage} storage.")
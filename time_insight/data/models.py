@@ -1,15 +1,53 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Float, ForeignKey, Index
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+from time_insight.settings import get_setting, DEFAULT_SETTINGS
 
 Base = declarative_base()
 
+EPOCH = datetime(1970, 1, 1)
+TEXT_FORMAT = "%Y-%m-%d %H:%M:%S.%f"    #format of the sqlalchemy sqlite DateTime type
+
+class Timestamp(TypeDecorator):
+    """
+    UTC datetime stored as integer epoch milliseconds or as text, by the "timestamp_storage" setting.
+
+    Callers always get naive UTC datetimes, aware datetimes are converted to UTC when stored.
+    With "epoch" storage range filters, sorting and arithmetic in SQL work on integers.
+    Rows stored in the other format are converted by init_db, see data/migrations.py.
+    """
+    impl = Integer      #SQLite keeps the text of rows in text format as it is
+    cache_ok = True
+
+    storage = get_setting("timestamp_storage", DEFAULT_SETTINGS["timestamp_storage"])
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        if self.storage == "epoch":
+            return (value - EPOCH) // timedelta(milliseconds=1)
+        return value.strftime(TEXT_FORMAT)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, (int, float)):
+            return EPOCH + timedelta(milliseconds=value)
+        value = datetime.fromisoformat(value)
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.replace(tzinfo=None)
+
 class Application(Base):
     __tablename__ = 'application'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    name = Column(Text, nullable=False)
+    name = Column(Text, nullable=False, unique=True, index=True)
     desc = Column(Text)
     path = Column(Text)
     enrollment_date = Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
@@ -18,24 +56,56 @@ class Application(Base):
 
 class ApplicationActivity(Base):
     __tablename__ = 'application_activity'
+    __table_args__ = (
+        Index('ix_application_activity_session_start_session_end', 'session_start', 'session_end'),    #range queries
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     application_id = Column(Integer, ForeignKey('application.id'), index=True)
-    window_name = Column(Text, nullable=False)
-    additional_info = Column(Text)
-    session_start = Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
-    session_end = Column(DateTime(timezone=True))
+    window_name = Column(Text, nullable=False)     #'' on interned rows, see window_title_id
+    additional_info = Column(Text)                  #NULL on interned rows, see additional_info_id
+    window_title_id = Column(Integer, ForeignKey('window_title.id'), index=True)
+    additional_info_id = Column(Integer, ForeignKey('additional_info.id'))
+    session_start = Column(Timestamp, default=datetime.now(timezone.utc))
+    session_end = Column(Timestamp)
     duration = Column(Integer)
 
     application = relationship('Application', back_populates='activities')
+    window_title = relationship('WindowTitle', lazy='joined')
+    additional_info_entry = relationship('AdditionalInfo', lazy='joined')
+
+    @property
+    def window_text(self):
+        return self.window_title.text if self.window_title else self.window_name
+
+    @property
+    def additional_info_text(self):
+        return self.additional_info_entry.text if self.additional_info_entry else self.additional_info
+
+class WindowTitle(Base):
+    __tablename__ = 'window_title'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    hash = Column(Integer, nullable=False, index=True)     #signed 64-bit blake2b of the text, see data/interning.py
+    text = Column(Text, nullable=False)
+
+class AdditionalInfo(Base):
+    __tablename__ = 'additional_info'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    hash = Column(Integer, nullable=False, index=True)
+    text = Column(Text, nullable=False)
 
 class UserSession(Base):
     __tablename__ = 'user_session'
+    __table_args__ = (
+        Index('ix_user_session_session_start_session_end', 'session_start', 'session_end'),    #range queries
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_session_type_id = Column(Integer, ForeignKey('user_session_type.id'))
-    session_start = Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
-    session_end = Column(DateTime(timezone=True))
+    session_start = Column(Timestamp, default=datetime.now(timezone.utc))
+    session_end = Column(Timestamp)
     duration = Column(Integer)
 
     user_session_type = relationship('UserSessionType', back_populates='user_sessions')
@@ -47,3 +117,25 @@ class UserSessionType(Base):
     name = Column(Text, nullable=False)
 
     user_sessions = relationship('UserSession', back_populates='user_session_type')
+
+class DailyAppUsage(Base):
+    __tablename__ = 'daily_app_usage'   #rollup of closed activities, see data/rollups.py
+
+    local_date = Column(Date, primary_key=True)
+    application_id = Column(Integer, ForeignKey('application.id'), primary_key=True)
+    seconds = Column(Float, nullable=False, default=0)
+    activity_count = Column(Integer, nullable=False, default=0)
+
+class HourlyActiveUsage(Base):
+    __tablename__ = 'hourly_active_usage'   #rollup of closed active sessions, see data/rollups.py
+
+    local_date = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True)    #local hour 0-23
+    seconds = Column(Float, nullable=False, default=0)
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'
+
+    version = Column(Integer, primary_key=True)     #number of an applied migration, see data/migrations.py
+    description = Column(Text)
+    applied_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
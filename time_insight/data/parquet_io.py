@@ -0,0 +1,293 @@
+import os
+import shutil
+import importlib.util
+from itertools import groupby
+from datetime import timezone
+from sqlalchemy import select, func
+from time_insight.data.database import reader_engine, bulk_engine
+from time_insight.data.models import ApplicationActivity, Application, UserSession, UserSessionType
+from time_insight.data.interning import join_activity_texts, activity_window_name, activity_additional_info, intern_activity_texts
+from time_insight.data.interning import window_titles, additional_infos
+from time_insight.data.rollups import rebuild_daily_app_usage, rebuild_hourly_active_usage
+from time_insight.data.migrations import get_schema_version
+from time_insight.data.data_version import data_version
+
+from time_insight.logging.logger import data_logger as logger
+
+#Export of the full history as Parquet files, pyarrow is an optional dependency imported only here.
+#
+#<export dir>/application.parquet
+#<export dir>/user_session_type.parquet
+#<export dir>/application_activity/month=YYYY-MM/part-0.parquet    (by session_start, times in UTC)
+#<export dir>/user_session/month=YYYY-MM/part-0.parquet
+#
+#Activities are exported with their texts, not the ids of the interning tables, names and titles are
+#dictionary encoded in the files instead.
+
+CHUNK_SIZE = 50000      #rows read from the database or a file at a time
+COMPRESSION = "zstd"
+
+def parquet_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+def import_pyarrow():
+    if not parquet_available():
+        raise RuntimeError("Parquet export and import need the pyarrow package (pip install pyarrow).")
+    import pyarrow
+    import pyarrow.parquet
+    return pyarrow, pyarrow.parquet
+
+def table_specs(pa):
+    """
+    :return: List of tuples (table name, select statement, arrow schema, name of the column partitioned by month or None).
+    """
+    text_type = pa.dictionary(pa.int32(), pa.string())
+    time_type = pa.timestamp("us", tz="UTC")
+    return [
+        ("user_session_type", select(
+            UserSessionType.id, UserSessionType.name
+        ).order_by(UserSessionType.id), pa.schema([
+            ("id", pa.int64()), ("name", pa.string())
+        ]), None),
+        ("application", select(
+            Application.id, Application.name, Application.desc, Application.path, Application.enrollment_date
+        ).order_by(Application.id), pa.schema([
+            ("id", pa.int64()), ("name", text_type), ("desc", text_type), ("path", text_type), ("enrollment_date", time_type)
+        ]), None),
+        ("application_activity", join_activity_texts(select(
+            ApplicationActivity.id,
+            ApplicationActivity.application_id,
+            activity_window_name.label("window_name"),
+            activity_additional_info.label("additional_info"),
+            ApplicationActivity.session_start,
+            ApplicationActivity.session_end,
+            ApplicationActivity.duration
+        )).order_by(ApplicationActivity.session_start, ApplicationActivity.id), pa.schema([
+            ("id", pa.int64()), ("application_id", pa.int64()), ("window_name", text_type), ("additional_info", text_type),
+            ("session_start", time_type), ("session_end", time_type), ("duration", pa.float64())
+        ]), "session_start"),
+        ("user_session", select(
+            UserSession.id, UserSession.user_session_type_id, UserSession.session_start, UserSession.session_end, UserSession.duration
+        ).order_by(UserSession.session_start, UserSession.id), pa.schema([
+            ("id", pa.int64()), ("user_session_type_id", pa.int64()),
+            ("session_start", time_type), ("session_end", time_type), ("duration", pa.float64())
+        ]), "session_start")
+    ]
+
+def to_utc(value):
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)   #stored times are naive utc
+
+def month_of(value):
+    return value.strftime("%Y-%m") if value else "none"
+
+def rows_to_batch(pa, schema, rows):
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_timestamp(field.type):
+            values = [to_utc(value) for value in values]
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def export_parquet(path, progress=None, cancelled=None):
+    """
+    Writes all activities, sessions and applications to a directory of Parquet files, see the layout above.
+
+    Rows are streamed from the database in chunks, the directory is written under a temporary name and
+    renamed when complete.
+
+    :param path: Destination directory, must not exist.
+    :param progress: Called with (rows written, total rows) after every chunk, if given.
+    :param cancelled: Called after every chunk, the export stops if it returns True, if given.
+    :return: True if the export has been written, False if cancelled.
+    """
+    pa, pq = import_pyarrow()
+    if os.path.exists(path):
+        raise FileExistsError(f"Export destination already exists: {path}")
+
+    temp_path = f"{path}.part"
+    written = 0
+    try:
+        with reader_engine.connect() as connection:
+            specs = table_specs(pa)
+            metadata = {b"time_insight_schema_version": str(get_schema_version(connection)).encode()}
+            total = sum(connection.execute(select(func.count()).select_from(query.order_by(None).subquery())).scalar()
+                        for _, query, _, _ in specs)
+
+            for table, query, schema, partition_column in specs:
+                schema = schema.with_metadata(metadata)
+                result = connection.execution_options(yield_per=CHUNK_SIZE).execute(query)
+                partition_index = list(result.keys()).index(partition_column) if partition_column else None
+
+                writer, writer_month = None, None
+                try:
+                    if partition_column is None:
+                        os.makedirs(temp_path, exist_ok=True)
+                        writer = pq.ParquetWriter(os.path.join(temp_path, f"{table}.parquet"), schema, compression=COMPRESSION)
+
+                    for rows in result.partitions():
+                        if partition_column is None:
+                            writer.write_batch(rows_to_batch(pa, schema, rows))
+                        else:
+                            #rows are ordered by the partition column, every month is one run of rows
+                            for month, month_rows in groupby(rows, key=lambda row: month_of(row[partition_index])):
+                                if month != writer_month:
+                                    if writer:
+                                        writer.close()
+                                    month_dir = os.path.join(temp_path, table, f"month={month}")
+                                    os.makedirs(month_dir, exist_ok=True)
+                                    writer = pq.ParquetWriter(os.path.join(month_dir, "part-0.parquet"), schema, compression=COMPRESSION)
+                                    writer_month = month
+                                writer.write_batch(rows_to_batch(pa, schema, list(month_rows)))
+
+                        written += len(rows)
+                        if progress:
+                            progress(written, total)
+                        if cancelled and cancelled():
+                            result.close()
+                            shutil.rmtree(temp_path)
+                            logger.info(f"Parquet export to {path} cancelled.")
+                            return False
+                finally:
+                    if writer:
+                        writer.close()
+
+        os.makedirs(temp_path, exist_ok=True)
+        os.replace(temp_path, path)
+        logger.info(f"Exported {written} rows to {path}.")
+        return True
+    except Exception:
+        shutil.rmtree(temp_path, ignore_errors=True)
+        raise
+
+def import_parquet(path, progress=None, cancelled=None):
+    """
+    Bulk-loads a directory written by export_parquet into the database, also into one which already has data.
+
+    Applications and session types are matched by name, exported ids are only used to map activities and sessions
+    to them, new rows get ids of this database. Activities and sessions which already exist (same application or
+    session type and start) are skipped, so importing an export again changes nothing. Open activities and sessions
+    (no end, the tracker was running when exporting) are skipped too, only the live tracker may have an open row.
+    Every chunk is committed on its own, so the tracker can write between them. Texts are interned and the rollups
+    rebuilt at the end.
+
+    :param path: Directory written by export_parquet.
+    :param progress: Called with (rows imported, total rows) after every chunk, if given.
+    :param cancelled: Called after every chunk, the import stops if it returns True, if given.
+    :return: True if everything has been imported, False if cancelled.
+    """
+    pa, _ = import_pyarrow()
+    import pyarrow.dataset as ds
+
+    datasets = {}
+    for table, _, _, partition_column in table_specs(pa):
+        table_path = os.path.join(path, table if partition_column else f"{table}.parquet")
+        if os.path.exists(table_path):
+            datasets[table] = ds.dataset(table_path, format="parquet", partitioning="hive")
+    if not datasets:
+        raise FileNotFoundError(f"No Time Insight Parquet export found in {path}")
+
+    total = sum(dataset.count_rows() for dataset in datasets.values())
+    imported = 0
+
+    #exported id -> id in this database
+    application_ids = import_by_name(datasets.get("application"), Application, ["name", "desc", "path", "enrollment_date"])
+    session_type_ids = import_by_name(datasets.get("user_session_type"), UserSessionType, ["name"])
+    imported += sum(datasets[table].count_rows() for table in ("application", "user_session_type") if table in datasets)
+    if progress:
+        progress(imported, total)
+
+    completed = True
+    for table, model, reference, ids in (
+        ("application_activity", ApplicationActivity, "application_id", application_ids),
+        ("user_session", UserSession, "user_session_type_id", session_type_ids)
+    ):
+        if table not in datasets:
+            continue
+        columns = [name for name in datasets[table].schema.names if name not in ("id", "month")]    #month is the partition key
+        for batch in datasets[table].to_batches(columns=columns, batch_size=CHUNK_SIZE):
+            rows = batch.to_pylist()
+            for row in rows:
+                row[reference] = ids.get(row[reference])
+                if table == "application_activity":
+                    row["window_name"] = row["window_name"] or ""   #interned below
+            with bulk_engine.begin() as connection:
+                rows = new_intervals(connection, model, reference, rows)
+                if rows:
+                    connection.execute(model.__table__.insert(), rows)
+
+            imported += batch.num_rows
+            if progress:
+                progress(imported, total)
+            if cancelled and cancelled():
+                completed = False
+                break
+        if not completed:
+            break
+
+    #imported activities have texts instead of interned ids, rollups have to include the imported history
+    with bulk_engine.begin() as connection:
+        intern_activity_texts(connection)
+    window_titles.clear()
+    additional_infos.clear()
+    with bulk_engine.begin() as connection:
+        rebuild_daily_app_usage(connection)
+        rebuild_hourly_active_usage(connection)
+    data_version.bump(history=True)
+
+    logger.info(f"Imported {imported} rows from {path}" + ("." if completed else ", cancelled."))
+    return completed
+
+def import_by_name(dataset, model, columns):
+    """
+    Inserts exported rows of a table with unique names (application, user_session_type) which this database does not have.
+
+    :param dataset: Exported table, or None.
+    :param model: Model of the table.
+    :param columns: Columns to import, including "name".
+    :return: Dict exported id -> id in this database.
+    """
+    if dataset is None:
+        return {}
+
+    rows = dataset.to_table(columns=["id"] + columns).to_pylist()
+    with bulk_engine.begin() as connection:
+        local_ids = dict(connection.execute(select(model.name, model.id)).all())
+        missing = [{column: row[column] for column in columns} for row in rows if row["name"] not in local_ids]
+        if missing:
+            connection.execute(model.__table__.insert(), missing)
+            local_ids = dict(connection.execute(select(model.name, model.id)).all())
+    return {row["id"]: local_ids[row["name"]] for row in rows}
+
+def new_intervals(connection, model, reference, rows):
+    """
+    Drops rows whose interval is already in the database, compared by reference column and start, and rows
+    which have not ended.
+
+    :param connection: SQLAlchemy connection inside a transaction.
+    :param model: ApplicationActivity or UserSession.
+    :param reference: Name of the application or session type column.
+    :param rows: List of dicts with the reference column and session_start.
+    :return: Rows to insert.
+    """
+    rows = [row for row in rows if row["session_end"] is not None]     #the tracker would take them for its own rows
+    starts = [row["session_start"] for row in rows if row["session_start"] is not None]
+    if not starts:
+        return rows
+
+    #one search of the session_start index for the whole chunk
+    existing = set(connection.execute(
+        select(getattr(model, reference), model.session_start)
+            .where(model.session_start >= min(starts), model.session_start <= max(starts))
+    ).all())
+    return [row for row in rows if (row[reference], to_naive(row["session_start"])) not in existing]
+
+def to_naive(value):
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
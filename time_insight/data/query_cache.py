@@ -0,0 +1,131 @@
+import copy
+import time
+import threading
+import functools
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from time_insight.data.data_version import data_version
+
+from time_insight.logging.logger import data_logger as logger
+
+PAST_MARGIN = timedelta(minutes=10)     #writes reach the database up to the write-behind interval late
+PRESENT_TTL = 60    #seconds, running activities and sessions are counted up to now, so these results age without writes
+
+class QueryCache:
+    """
+    LRU of get_data results keyed by (query kind, range, filters).
+
+    Results of ranges overlapping now are valid until the tracker writes again (data version changes)
+    or for PRESENT_TTL seconds.
+    Ranges which ended before now stay valid until older data is rewritten (history version changes).
+    """
+    def __init__(self, maxsize=64, max_rows=500000):
+        """
+        :param maxsize: Maximum number of cached results.
+        :param max_rows: Maximum number of rows of all cached results together.
+        """
+        self.maxsize = maxsize
+        self.max_rows = max_rows
+        self.entries = OrderedDict()    #key -> (result, rows, version or None for past ranges, history version, monotonic time stored)
+        self.rows = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :return: Cached result, or None if there is no valid one.
+        """
+        version, history = data_version.read()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            result, rows, entry_version, entry_history, stored = entry
+            present = entry_version is not None
+            if entry_history != history or (present and (entry_version != version or time.monotonic() - stored > PRESENT_TTL)):
+                self.remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return result
+
+    def put(self, key, result, range_end, version):
+        """
+        :param key: Cache key.
+        :param result: Query result, DataFrame or list.
+        :param range_end: End of the queried range (naive), decides if the range is in the past.
+        :param version: Tuple (version, history version) read before the query ran.
+        """
+        rows = len(result)
+        if rows > self.max_rows:
+            return
+
+        now = min(datetime.now(), datetime.now(timezone.utc).replace(tzinfo=None))   #ranges are local dates, compared to utc times
+        past = range_end is not None and range_end <= now - PAST_MARGIN
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+            self.entries[key] = (result, rows, None if past else version[0], version[1], time.monotonic())
+            self.rows += rows
+            while len(self.entries) > self.maxsize or self.rows > self.max_rows:
+                self.remove(next(iter(self.entries)))
+
+    def remove(self, key):
+        self.rows -= self.entries.pop(key)[1]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.rows = 0
+
+query_cache = QueryCache()
+
+def cache_key_part(value):
+    if hasattr(value, "year") and callable(value.year):     #QDate
+        return (value.year(), value.month(), value.day())
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+def range_end_of(end_date):
+    if hasattr(end_date, "year") and callable(end_date.year):
+        return datetime(end_date.year(), end_date.month(), end_date.day()) + timedelta(days=1)
+    if isinstance(end_date, date):
+        return datetime(end_date.year, end_date.month, end_date.day) + timedelta(days=1)
+    return None
+
+def cached_query(kind):
+    """
+    Caches the results of a get_data function taking (start_date, end_date, ...).
+
+    Callers get a copy, so they can change the returned DataFrame or rows of a list. Empty results are not cached,
+    the functions also return them on errors.
+
+    :param kind: Name of the query in the cache key.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(start_date, end_date, *args, **kwargs):
+            try:
+                key = (kind, cache_key_part(start_date), cache_key_part(end_date)) + \
+                    tuple(cache_key_part(arg) for arg in args) + tuple(sorted((k, cache_key_part(v)) for k, v in kwargs.items()))
+                result = query_cache.get(key)
+            except Exception as e:
+                logger.error(f"Error in query_cache.py - cached_query: {e}")
+                return function(start_date, end_date, *args, **kwargs)
+
+            if result is None:
+                version = data_version.read()
+                result = function(start_date, end_date, *args, **kwargs)
+                if result is None or len(result) == 0:
+                    return result
+                query_cache.put(key, result, range_end_of(end_date), version)
+            return copy_result(result)
+        return wrapper
+    return decorator
+
+def copy_result(result):
+    """
+    :return: Copy of a cached result, deep for lists of rows (dicts), DataFrame.copy() is deep already.
+    """
+    if isinstance(result, list):
+        return copy.deepcopy(result)
+    return result.copy()
@@ -0,0 +1,153 @@
+from datetime import timezone
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.sqlite import insert
+from time_insight.data.models import ApplicationActivity, DailyAppUsage, UserSession, HourlyActiveUsage
+from time_insight.data.segmentation import GRANULARITIES, floor_time
+from time_insight.time_converter import make_timezone_aware
+
+from time_insight.logging.logger import data_logger as logger
+
+#Rollups are kept next to the raw tables so long ranges are summed from a few rows per day instead of every activity.
+#They only count closed activities and sessions, the tracker adds each of them in the transaction which stores its end.
+
+def local_segments(start, end, step):
+    """
+    Cuts an interval at local bucket boundaries.
+
+    :param start: Start of the interval (naive UTC or timezone-aware).
+    :param end: End of the interval (naive UTC or timezone-aware).
+    :param step: Bucket name from GRANULARITIES.
+    :return: List of tuples (local start of the segment, seconds).
+    """
+    step = GRANULARITIES[step]
+    position = make_timezone_aware(start).astimezone(timezone.utc)
+    end = make_timezone_aware(end).astimezone(timezone.utc)
+
+    #cut in utc, so segments have real seconds on DST days
+    segments = []
+    while position < end:
+        local = position.astimezone().replace(tzinfo=None)
+        boundary = floor_time(local, step) + step
+        #local times skipped or repeated by a DST change are two instants, the segment ends at the first one after its start
+        candidates = [boundary.replace(fold=fold).astimezone(timezone.utc) for fold in (0, 1)]
+        segment_end = min([candidate for candidate in candidates if candidate > position] + [end])
+        segments.append((local, (segment_end - position).total_seconds()))
+        position = segment_end
+    return segments
+
+def local_day_segments(start, end):
+    """
+    Cuts an interval at local midnights.
+
+    :return: List of tuples (local date, seconds).
+    """
+    return [(segment_start.date(), seconds) for segment_start, seconds in local_segments(start, end, "day")]
+
+def local_hour_segments(start, end):
+    """
+    Cuts an interval at local hours.
+
+    :return: List of tuples (local date, hour, seconds).
+    """
+    return [(segment_start.date(), segment_start.hour, seconds) for segment_start, seconds in local_segments(start, end, "hour")]
+
+def add_activity_usage(session, application_id, start, end):
+    """
+    Adds a closed activity to the daily_app_usage rollup.
+
+    Its seconds are split over the local days it covers, it is counted in activity_count only on the day it started.
+
+    :param session: SQLAlchemy session object used for database interactions.
+    :param application_id: Application.id of the activity.
+    :param start: Start of the activity.
+    :param end: End of the activity.
+    """
+    if application_id is None:
+        return
+
+    for i, (local_date, seconds) in enumerate(local_day_segments(start, end)):
+        statement = insert(DailyAppUsage).values(
+            local_date=local_date,
+            application_id=application_id,
+            seconds=seconds,
+            activity_count=1 if i == 0 else 0
+        )
+        session.execute(statement.on_conflict_do_update(
+            index_elements=["local_date", "application_id"],
+            set_={
+                "seconds": DailyAppUsage.seconds + statement.excluded.seconds,
+                "activity_count": DailyAppUsage.activity_count + statement.excluded.activity_count
+            }
+        ))
+
+def rebuild_daily_app_usage(connection):
+    """
+    Recomputes the daily_app_usage rollup from all closed activities.
+
+    :param connection: SQLAlchemy connection inside a transaction.
+    """
+    usage = {}  #(local date, application id) -> [seconds, activity count]
+    activities = connection.execution_options(yield_per=10000).execute(
+        select(ApplicationActivity.application_id, ApplicationActivity.session_start, ApplicationActivity.session_end).where(
+            ApplicationActivity.application_id.is_not(None),
+            ApplicationActivity.session_start.is_not(None),
+            ApplicationActivity.session_end.is_not(None)
+        )
+    )
+    for application_id, start, end in activities:
+        for i, (local_date, seconds) in enumerate(local_day_segments(start, end)):
+            entry = usage.setdefault((local_date, application_id), [0, 0])
+            entry[0] += seconds
+            if i == 0:  #counted on the day it started
+                entry[1] += 1
+
+    connection.execute(delete(DailyAppUsage))
+    if usage:
+        connection.execute(DailyAppUsage.__table__.insert(), [
+            {"local_date": local_date, "application_id": application_id, "seconds": seconds, "activity_count": count}
+            for (local_date, application_id), (seconds, count) in usage.items()
+        ])
+
+    logger.info(f"Rebuilt daily_app_usage: {len(usage)} rows.")
+
+def add_session_usage(session, start, end):
+    """
+    Adds a closed active session to the hourly_active_usage rollup.
+
+    :param session: SQLAlchemy session object used for database interactions.
+    :param start: Start of the user session.
+    :param end: End of the user session.
+    """
+    for local_date, hour, seconds in local_hour_segments(start, end):
+        statement = insert(HourlyActiveUsage).values(local_date=local_date, hour=hour, seconds=seconds)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=["local_date", "hour"],
+            set_={"seconds": HourlyActiveUsage.seconds + statement.excluded.seconds}
+        ))
+
+def rebuild_hourly_active_usage(connection):
+    """
+    Recomputes the hourly_active_usage rollup from all closed active sessions.
+
+    :param connection: SQLAlchemy connection inside a transaction.
+    """
+    usage = {}  #(local date, hour) -> seconds
+    user_sessions = connection.execution_options(yield_per=10000).execute(
+        select(UserSession.session_start, UserSession.session_end).where(
+            UserSession.user_session_type_id == 1,  #Active
+            UserSession.session_start.is_not(None),
+            UserSession.session_end.is_not(None)
+        )
+    )
+    for start, end in user_sessions:
+        for local_date, hour, seconds in local_hour_segments(start, end):
+            usage[(local_date, hour)] = usage.get((local_date, hour), 0) + seconds
+
+    connection.execute(delete(HourlyActiveUsage))
+    if usage:
+        connection.execute(HourlyActiveUsage.__table__.insert(), [
+            {"local_date": local_date, "hour": hour, "seconds": seconds}
+            for (local_date, hour), seconds in usage.items()
+        ])
+
+    logger.info(f"Rebuilt hourly_active_usage: {len(usage)} rows.")
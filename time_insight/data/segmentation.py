@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+#granularities intervals can be cut at
+GRANULARITIES = {
+    "30min": timedelta(minutes=30),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1)
+}
+
+def floor_time(dt, step):
+    """
+    Rounds a datetime down to the start of its bucket.
+
+    Buckets are aligned to midnight of the day the datetime falls in.
+
+    :param dt: The datetime to round.
+    :param step: Bucket length as timedelta, at most one day.
+    :return: Start of the bucket.
+    """
+    midnight = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight + ((dt - midnight) // step) * step
+
+def split_interval(start, end, step):
+    """
+    Cuts an interval at bucket boundaries.
+
+    :param start: Start of the interval.
+    :param end: End of the interval.
+    :param step: Bucket length as timedelta, or a name from GRANULARITIES.
+    :return: List of tuples (segment start, segment end), empty if the interval is empty.
+    """
+    if isinstance(step, str):
+        step = GRANULARITIES[step]
+
+    segments = []
+    segment_start = start
+    while segment_start < end:
+        segment_end = min(floor_time(segment_start, step) + step, end)
+        segments.append((segment_start, segment_end))
+        segment_start = segment_end
+    return segments
+
+def segment(rows, step, range_start=None, range_end=None, now=None, start_key="Start Time", end_key="End Time", duration_key="Duration"):
+    """
+    Cuts rows with an interval into per-bucket rows.
+
+    Meant for rows of overlap_filter/clipped_interval queries (see data/intervals.py), every returned row is a copy
+    of the source row with the start, end and duration of one segment, so summing the durations grouped by start
+    gives the time spent in every bucket.
+
+    :param rows: Iterable of dicts with start and end datetimes.
+    :param step: Bucket length as timedelta, or a name from GRANULARITIES.
+    :param range_start: Segments are clipped to start at this time, if given.
+    :param range_end: Segments are clipped to end at this time, if given.
+    :param now: End used for rows which have not ended yet, rows without an end are skipped if not given.
+    :param start_key: Key of the interval start.
+    :param end_key: Key of the interval end.
+    :param duration_key: Key the segment duration in seconds is stored under.
+    :return: List of dicts.
+    """
+    segments = []
+    for row in rows:
+        start = row[start_key]
+        end = row[end_key] if row[end_key] is not None else now
+        if start is None or end is None:
+            continue
+        if range_start is not None and start < range_start:
+            start = range_start
+        if range_end is not None and end > range_end:
+            end = range_end
+
+        for segment_start, segment_end in split_interval(start, end, step):
+            segments.append({
+                **row,
+                start_key: segment_start,
+                end_key: segment_end,
+                duration_key: (segment_end - segment_start).total_seconds()
+            })
+    return segments
@@ -1,16 +1,108 @@
 import os
 import sys
+import time
+import queue
+import atexit
 import logging
 import logging.config
-from time_insight.config import BASE_DIR
+import logging.handlers
+from time_insight.config import BASE_DIR, LOG_PATH
 
-if getattr(sys, 'frozen', False):
-    #builded version
-    config_path = os.path.join(sys._MEIPASS, 'time_insight', 'logging', 'logging.conf')
-else:
+LOG_CONFIG_ENV = "TIME_INSIGHT_LOG_CONFIG"  #environment variable with the path to a custom logging config
+
+def get_default_config_path():
+    if getattr(sys, 'frozen', False):
+        #builded version
+        return os.path.join(sys._MEIPASS, 'time_insight', 'logging', 'logging.conf')
     #not builded version
-    config_path = os.path.join(BASE_DIR, 'time_insight', 'logging', 'logging.conf')
+    return os.path.join(BASE_DIR, 'time_insight', 'logging', 'logging.conf')
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most one record per key every interval seconds.
+
+    Only records logged with extra={"rate_limit_key": key} are limited, the next record let through
+    tells how many were dropped in the meantime.
+    """
+    def __init__(self, interval=60):
+        super().__init__()
+        self.interval = interval
+        self.last_emit = {}     #key -> monotonic time of the last record let through
+        self.suppressed = {}    #key -> number of records dropped since
+
+    def filter(self, record):
+        key = getattr(record, "rate_limit_key", None)
+        if key is None:
+            return True
+
+        now = time.monotonic()
+        last_emit = self.last_emit.get(key)
+        if last_emit is not None and now - last_emit < self.interval:
+            self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            return False
+
+        self.last_emit[key] = now
+        suppressed = self.suppressed.pop(key, 0)
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+listener = None
+
+def configure_logging(config_path=None, log_path=LOG_PATH):
+    """
+    Loads the logging config and moves the handlers of the root logger behind a queue.
+
+    Logging calls only put the record into the queue, the handlers (console, rotating file) are run by a
+    listener thread, so the tracker thread never waits for I/O. Loggers of the app have no handlers of their
+    own, they set levels and propagate to the root logger.
+
+    :param config_path: Path to a logging.config.fileConfig file, TIME_INSIGHT_LOG_CONFIG or the bundled one if not given.
+    :param log_path: File of the rotating file handler, every process needs its own, two processes can not rotate one file.
+    """
+    global listener
+
+    if listener is not None:
+        listener.stop()
+
+    config_path = config_path or os.environ.get(LOG_CONFIG_ENV) or get_default_config_path()
+    #repr() is a python literal for the handler args, % is escaped for the config interpolation
+    defaults = {"log_path": repr(log_path).replace("%", "%%")}
+    logging.config.fileConfig(config_path, defaults=defaults, disable_existing_loggers=False)
+
+    root = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+
+    listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [queue_handler]
+    listener.start()
+
+def stop_logging():
+    """
+    Writes out the queued records and stops the listener thread.
+    """
+    global listener
+
+    if listener is not None:
+        listener.stop()
+        listener = None
+
+def get_logger(subsystem):
+    """
+    Returns the logger of a subsystem ("tracker", "data", "ui"), its level can be set in the logging config.
+
+    :param subsystem: Name of the subsystem.
+    """
+    return logger.getChild(subsystem)
+
+configure_logging()
+atexit.register(stop_logging)   #registered first, so it runs after the exit hooks which still log
 
-logging.config.fileConfig(config_path)
+logger = logging.getLogger('debugLogger')
 
-logger = logging.getLogger('debugLogger')
\ No newline at end of file
+#subsystem loggers
+tracker_logger = get_logger("tracker")
+data_logger = get_logger("data")
+ui_logger = get_logger("ui")
@@ -1,19 +1,36 @@
 import sys
 import threading
-from PyQt5.QtWidgets import QApplication
-from time_insight.ui.main_window import MainWindow
 from time_insight.data.database import init_db
-from time_insight.tracker.tracker import init_tracker
 
+from time_insight.settings import get_setting, DEFAULT_SETTINGS
 from time_insight.logging.logger import logger
 
 def main():
+    if "--tracker-service" in sys.argv:
+        #builded app started as the tracker process, ui libs are never imported
+        from time_insight.tracker.service import run_service
+        run_service()
+        return
+
+    from PyQt5.QtWidgets import QApplication
+    from time_insight.ui.main_window import MainWindow
+
     logger.info("Starting application...")
 
     init_db()
 
-    tracker_thread = threading.Thread(target=init_tracker, daemon=True)
-    tracker_thread.start()
+    if get_setting("tracker_mode", DEFAULT_SETTINGS["tracker_mode"]) == "process":
+        #tracker runs in its own process, which outlives the GUI
+        from time_insight.tracker.ipc import ensure_tracker_process, tracker_client
+        ensure_tracker_process()
+
+        status = tracker_client.status()
+        if status and status.get("paused_until_restart"):
+            tracker_client.resume()     #paused until next app start
+    else:
+        from time_insight.tracker.tracker import init_tracker
+        tracker_thread = threading.Thread(target=init_tracker, daemon=True)
+        tracker_thread.start()
 
     app = QApplication(sys.argv)
 
@@ -23,4 +40,4 @@ def main():
     app.exec()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
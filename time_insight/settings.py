@@ -15,6 +15,21 @@ DEFAULT_SETTINGS = {
     "autostart": True,
     "sosal": False,
     "window_checking_interval": "1",
+    "window_source": "auto",
+    "write_behind_interval": "10",
+    "adaptive_polling": False,
+    "polling_min_interval": "1",
+    "polling_max_interval": "10",
+    "tracker_mode": "thread",
+    "tracker_ipc_port": 48765,
+    "heartbeat_interval": "60",
+    "timestamp_storage": "text",
+    "sqlite_journal_mode": "wal",
+    "sqlite_synchronous": "normal",
+    "sqlite_busy_timeout": "5000",
+    "sqlite_mmap_size": "268435456",
+    "sqlite_cache_size": "-16000",
+    "sqlite_temp_store": "memory",
     "daily_report" : False,
     "last_daily_report" : "1997.1.1",
     "weekly_report" : False,
@@ -1,6 +1,8 @@
-from datetime import datetime
+from datetime import datetime, timezone
 import time
 
+from time_insight.logging.logger import logger
+
 def datetime_from_utc_to_local(utc_datetime):
     """
     This function converts UTC datetime to local datetime
@@ -10,4 +12,19 @@ def datetime_from_utc_to_local(utc_datetime):
     """
     now_timestamp = time.time()
     offset = datetime.fromtimestamp(now_timestamp) - datetime.utcfromtimestamp(now_timestamp)
-    return utc_datetime + offset
\ No newline at end of file
+    return utc_datetime + offset
+
+def make_timezone_aware(dt):
+    """
+    Makes a datetime object timezone-aware, setting it to UTC if it's naive.
+
+    :param dt: The datetime object to make timezone-aware.
+    :return: A timezone-aware datetime object (in UTC).
+    """
+    try:
+        if dt.tzinfo is None:                           #if there is no info about timezone
+            return dt.replace(tzinfo=timezone.utc)      #set to utc
+        return dt
+    except Exception as e:
+        logger.error(f"Error in time_converter.py - make_timezone_aware: {e}")
+        return dt
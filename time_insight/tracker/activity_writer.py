@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import threading
+import uuid
+from datetime import datetime
+from sqlalchemy.orm import Session
+from time_insight.data.models import ApplicationActivity
+from time_insight.data.interning import window_titles, additional_infos
+from time_insight.data.rollups import add_activity_usage
+from time_insight.config import JOURNAL_PATH
+from time_insight.time_converter import make_timezone_aware
+
+from time_insight.settings import get_setting, DEFAULT_SETTINGS
+from time_insight.logging.logger import tracker_logger as logger
+
+class ActivityRecord:
+    """
+    Activity recorded by the tracker which may not be stored in the database yet.
+    """
+    def __init__(self, application_id, window_name, additional_info, session_start, session_end=None, row_id=None, key=None):
+        self.key = key or uuid.uuid4().hex     #identifies the record in the journal before it gets a row id
+        self.application_id = application_id
+        self.window_name = window_name
+        self.additional_info = additional_info
+        self.session_start = session_start
+        self.session_end = session_end
+        self.row_id = row_id
+
+class ActivityWriter:
+    """
+    Write-behind queue between the tracker and the database.
+
+    Opened and closed activities are buffered and written in one transaction every few seconds
+    instead of committing on every window switch. Every buffered change is also appended to a small
+    journal file, which is replayed on the next start if the process gets killed before a flush.
+    """
+    def __init__(self, engine, journal_path=JOURNAL_PATH, flush_interval=None):
+        self.engine = engine
+        self.journal_path = journal_path
+        if flush_interval is None:
+            flush_interval = get_setting("write_behind_interval", DEFAULT_SETTINGS["write_behind_interval"])
+        self.flush_interval = int(flush_interval)
+
+        self.lock = threading.RLock()
+        self.pending = {}       #key -> ActivityRecord with changes not stored in db yet
+        self.last_flush = time.monotonic()
+        self.journal = None
+
+    def open(self, record):
+        """
+        Buffers a new activity.
+
+        :param record: ActivityRecord object.
+        """
+        with self.lock:
+            self.pending[record.key] = record
+            self.write_journal({
+                "op": "open",
+                "key": record.key,
+                "application_id": record.application_id,
+                "window_name": record.window_name,
+                "additional_info": record.additional_info,
+                "session_start": record.session_start.isoformat(),
+                "row_id": record.row_id
+            })
+
+    def close(self, record, end_time):
+        """
+        Buffers the end of an activity.
+
+        :param record: ActivityRecord object.
+        :param end_time: The timestamp indicating the end of the activity (timezone-aware).
+        """
+        with self.lock:
+            record.session_end = end_time
+            self.pending[record.key] = record
+            self.write_journal({
+                "op": "close",
+                "key": record.key,
+                "session_end": end_time.isoformat(),
+                "row_id": record.row_id
+            })
+
+    def flush_due(self):
+        return time.monotonic() - self.last_flush >= self.flush_interval
+
+    def flush(self):
+        """
+        Writes all buffered activities to the database in a single transaction and clears the journal.
+        """
+        with self.lock:
+            self.last_flush = time.monotonic()
+            if not self.pending:
+                return
+
+            records = list(self.pending.values())
+            with Session(self.engine) as session:
+                try:
+                    activities = [self.store(session, record) for record in records]
+                    session.commit()
+                except Exception as e:
+                    session.rollback()
+                    window_titles.clear()       #may hold ids of rolled back rows
+                    additional_infos.clear()
+                    logger.error(f"Error in activity_writer.py - flush: {e}")
+                    return
+
+                for record, activity in zip(records, activities):
+                    if activity is not None:
+                        record.row_id = activity.id
+
+            self.pending.clear()
+            self.clear_journal()
+
+            logger.debug(f"Flushed {len(records)} buffered activities.")
+
+    def store(self, session, record):
+        """
+        Adds the record changes to the session.
+
+        :param session: SQLAlchemy session object used for database interactions.
+        :param record: ActivityRecord object.
+        :return: ApplicationActivity object, or None if the stored row no longer exists.
+        """
+        if record.row_id is not None:
+            activity = session.get(ApplicationActivity, record.row_id)
+            if activity is None:
+                return None
+        else:
+            activity = ApplicationActivity(
+                application_id=record.application_id,
+                window_name="",     #texts are stored once in window_title/additional_info
+                window_title_id=window_titles.resolve(session, record.window_name),
+                additional_info_id=additional_infos.resolve(session, record.additional_info),
+                session_start=record.session_start
+            )
+            session.add(activity)
+
+        if record.session_end is not None and activity.session_end is None:
+            activity.session_end = record.session_end
+            activity.duration = round((make_timezone_aware(activity.session_end) -
+                                       make_timezone_aware(activity.session_start)).total_seconds(), 3)
+            add_activity_usage(session, activity.application_id, activity.session_start, activity.session_end)
+        session.flush()     #assigns id to new rows
+        return activity
+
+    def replay(self):
+        """
+        Stores activities left in the journal by a process which was killed before it could flush them.
+        """
+        with self.lock:
+            if not os.path.exists(self.journal_path):
+                return
+
+            records = {}
+            try:
+                with open(self.journal_path, 'r', encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            break   #last line may be cut by the kill
+                        self.replay_entry(records, entry)
+            except Exception as e:
+                logger.error(f"Error in activity_writer.py - replay: {e}")
+                return
+
+            if not records:
+                self.clear_journal()
+                return
+
+            with Session(self.engine) as session:
+                #journal could have been written just before a flush committed, do not store rows twice
+                for record in records.values():
+                    if record.row_id is None:
+                        existing = session.query(ApplicationActivity.id).filter_by(
+                            application_id=record.application_id,
+                            session_start=record.session_start
+                        ).first()
+                        if existing:
+                            record.row_id = existing.id
+
+            self.pending.update(records)
+            logger.info(f"Replaying {len(records)} activities from the journal.")
+        self.flush()
+
+    def replay_entry(self, records, entry):
+        key = entry["key"]
+        if entry["op"] == "open":
+            records[key] = ActivityRecord(
+                application_id=entry["application_id"],
+                window_name=entry["window_name"],
+                additional_info=entry["additional_info"],
+                session_start=datetime.fromisoformat(entry["session_start"]),
+                row_id=entry["row_id"],
+                key=key
+            )
+        elif entry["op"] == "close":
+            record = records.get(key)
+            if record is None:
+                if entry["row_id"] is None:
+                    return  #open entry has been lost
+                record = records[key] = ActivityRecord(None, None, None, None, row_id=entry["row_id"], key=key)
+            record.session_end = datetime.fromisoformat(entry["session_end"])
+
+    def write_journal(self, entry):
+        try:
+            if self.journal is None:
+                self.journal = open(self.journal_path, 'a', encoding="utf-8")
+            self.journal.write(json.dumps(entry) + "\n")
+            self.journal.flush()    #hand over to the os, survives the process being killed
+        except Exception as e:
+            logger.error(f"Error in activity_writer.py - write_journal: {e}")
+
+    def clear_journal(self):
+        try:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            open(self.journal_path, 'w').close()
+        except Exception as e:
+            logger.error(f"Error in activity_writer.py - clear_journal: {e}")
@@ -0,0 +1,81 @@
+from sqlalchemy.exc import IntegrityError
+from time_insight.data.models import Application
+from time_insight.tracker.stats import stats
+
+from time_insight.logging.logger import tracker_logger as logger
+
+class ApplicationRegistry:
+    """
+    In-memory map of known executables to their Application.id.
+
+    Loaded once when the tracker starts, after that resolving the foreground app is a dict lookup.
+    New executables are inserted into the database the first time they appear.
+    """
+    def __init__(self):
+        self.ids_by_name = {}
+        self.ids_by_path = {}
+
+    def load(self, session):
+        """
+        Loads all known applications from the database.
+
+        :param session: SQLAlchemy session object used for database interactions.
+        """
+        self.ids_by_name.clear()
+        self.ids_by_path.clear()
+        for app_id, name, path in session.query(Application.id, Application.name, Application.path):
+            self.ids_by_name[name] = app_id
+            if path:
+                self.ids_by_path[path] = app_id
+
+        logger.info(f"Application registry loaded: {len(self.ids_by_name)} applications.")
+
+    def lookup(self, process_name, process_path):
+        """
+        Returns the Application.id of a known process without touching the database.
+
+        :param process_name: Name of the process executable.
+        :param process_path: Full path to the process executable.
+        :return: Application.id, or None if the application is not known yet.
+        """
+        app_id = self.ids_by_path.get(process_path)
+        if app_id is None:
+            app_id = self.ids_by_name.get(process_name)
+        return app_id
+
+    def resolve(self, session, process_name, process_path, enrollment_date):
+        """
+        Returns the Application.id for the given process, creating the application record if needed.
+
+        :param session: SQLAlchemy session object used for database interactions.
+        :param process_name: Name of the process executable.
+        :param process_path: Full path to the process executable.
+        :param enrollment_date: The timestamp used if a new application record is created (timezone-aware).
+        :return: Application.id of the process.
+        """
+        app_id = self.lookup(process_name, process_path)
+        if app_id is not None:
+            return app_id
+
+        application = Application(
+            name=process_name,
+            desc="",
+            path=process_path,
+            enrollment_date=enrollment_date
+        )
+        session.add(application)
+        with stats.measure("application_commit"):
+            try:
+                session.commit()
+                logger.info(f"New application created: {process_name} {process_path}.")
+            except IntegrityError:
+                #created by another process in the meantime (unique index on application.name)
+                session.rollback()
+                application = session.query(Application).filter_by(name=process_name).one()
+
+        self.ids_by_name[process_name] = application.id
+        if process_path:
+            self.ids_by_path[process_path] = application.id
+        return application.id
+
+registry = ApplicationRegistry()
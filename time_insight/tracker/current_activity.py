@@ -0,0 +1,74 @@
+from time_insight.data.models import ApplicationActivity
+from time_insight.tracker.activity_writer import ActivityRecord
+
+class CurrentActivity:
+    """
+    State of the activity the tracker is currently recording.
+
+    Lets the tracker check "same window, skip" without querying the database on every tick.
+    The record may not be stored in the database yet, see ActivityWriter.
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.record = None
+
+    @property
+    def is_open(self):
+        return self.record is not None and self.record.session_end is None
+
+    @property
+    def window_name(self):
+        return self.record.window_name if self.record else None
+
+    @property
+    def application_id(self):
+        return self.record.application_id if self.record else None
+
+    @property
+    def session_start(self):
+        return self.record.session_start if self.record else None
+
+    @property
+    def row_id(self):
+        return self.record.row_id if self.record else None
+
+    def matches(self, window_name, application_id):
+        """
+        Checks if the given window is the one currently recorded.
+
+        :param window_name: Title of the active window.
+        :param application_id: Application.id of the active window process.
+        :return: True if the window has not changed.
+        """
+        return self.is_open and self.window_name == window_name and self.application_id == application_id
+
+    def start(self, record):
+        """
+        Sets the given activity as the current one.
+
+        :param record: ActivityRecord object.
+        """
+        self.record = record
+
+    def load(self, session):
+        """
+        Loads the last activity from the database if it has not been ended yet.
+
+        :param session: SQLAlchemy session object used for database interactions.
+        """
+        self.clear()
+        #found by its missing end, imported history gets ids above the live rows
+        last_activity = session.query(ApplicationActivity).filter(ApplicationActivity.session_end.is_(None)) \
+            .order_by(ApplicationActivity.session_start.desc(), ApplicationActivity.id.desc()).first()
+        if last_activity:
+            self.start(ActivityRecord(
+                application_id=last_activity.application_id,
+                window_name=last_activity.window_text,
+                additional_info=last_activity.additional_info_text,
+                session_start=last_activity.session_start,
+                row_id=last_activity.id
+            ))
+
+current_activity = CurrentActivity()
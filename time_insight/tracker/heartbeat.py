@@ -0,0 +1,63 @@
+import os
+import mmap
+import struct
+from datetime import datetime, timezone
+from time_insight.config import HEARTBEAT_PATH
+
+from time_insight.logging.logger import tracker_logger as logger
+
+HEARTBEAT_FORMAT = "<d"     #last alive time as unix timestamp
+HEARTBEAT_SIZE = struct.calcsize(HEARTBEAT_FORMAT)
+
+class Heartbeat:
+    """
+    Last time the tracker was known to be alive, kept in a tiny memory-mapped file.
+
+    Updating it is a write to memory, no database commit and no syscall. After a crash or power loss
+    the dangling session is closed at this time instead of at the next start.
+    """
+    def __init__(self, path=HEARTBEAT_PATH):
+        self.path = path
+        self.map = None
+
+    def open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) != HEARTBEAT_SIZE:
+            with open(self.path, 'wb') as f:
+                f.write(b"\0" * HEARTBEAT_SIZE)
+        with open(self.path, 'r+b') as f:
+            self.map = mmap.mmap(f.fileno(), HEARTBEAT_SIZE)
+
+    def beat(self, when=None):
+        """
+        Stores the last alive time.
+
+        :param when: Timezone-aware timestamp, now if not given.
+        """
+        try:
+            if self.map is None:
+                self.open()
+            timestamp = when.timestamp() if when else datetime.now(timezone.utc).timestamp()
+            struct.pack_into(HEARTBEAT_FORMAT, self.map, 0, timestamp)
+        except Exception as e:
+            logger.error(f"Error in heartbeat.py - beat: {e}")
+
+    def read(self):
+        """
+        :return: Last alive time (timezone-aware UTC), or None if the tracker has never written it.
+        """
+        try:
+            if self.map is not None:
+                timestamp, = struct.unpack_from(HEARTBEAT_FORMAT, self.map, 0)
+            else:
+                with open(self.path, 'rb') as f:
+                    timestamp, = struct.unpack(HEARTBEAT_FORMAT, f.read(HEARTBEAT_SIZE))
+        except (OSError, struct.error):
+            return None
+        return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp > 0 else None
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+heartbeat = Heartbeat()
@@ -0,0 +1,148 @@
+import os
+import sys
+import subprocess
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client, deliver_challenge, answer_challenge
+from time_insight.config import TRACKER_KEY_PATH
+
+from time_insight.settings import get_setting, DEFAULT_SETTINGS
+from time_insight.logging.logger import tracker_logger as logger
+
+def get_address():
+    return ("127.0.0.1", int(get_setting("tracker_ipc_port", DEFAULT_SETTINGS["tracker_ipc_port"])))
+
+def get_authkey():
+    """
+    Returns the key shared by the tracker process and the GUI, creates it on first use.
+    """
+    if not os.path.exists(TRACKER_KEY_PATH):
+        fd = os.open(TRACKER_KEY_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(os.urandom(32))
+    with open(TRACKER_KEY_PATH, 'rb') as f:
+        return f.read()
+
+RECEIVE_TIMEOUT = 5    #seconds a connected client has to send its command
+
+class TrackerServer:
+    """
+    Local IPC endpoint of the tracker process.
+
+    Receives commands as dicts ({"cmd": "pause", "minutes": 30}) and answers with a dict.
+    Every connection is handled in its own thread, so a client which stalls does not block the others,
+    the commands themselves run one at a time.
+    """
+    def __init__(self, handlers):
+        """
+        :param handlers: Dict of command name -> function taking the command dict and returning the response dict.
+        """
+        self.handlers = handlers
+        self.authkey = get_authkey()
+        self.listener = Listener(get_address())     #authenticated in the connection thread, see handle
+        self.lock = threading.Lock()    #serializes the commands
+
+    def start(self):
+        threading.Thread(target=self.serve, daemon=True, name="TrackerIPC").start()
+        logger.info(f"Tracker IPC listening on {self.listener.address}.")
+
+    def serve(self):
+        while True:
+            try:
+                connection = self.listener.accept()
+            except OSError as e:     #dropped connection, keep serving
+                logger.warning(f"Tracker IPC connection refused: {e}")
+                continue
+            threading.Thread(target=self.handle, args=(connection,), daemon=True, name="TrackerIPCConnection").start()
+
+    def handle(self, connection):
+        """
+        Authenticates the client and answers its command.
+
+        :param connection: Accepted multiprocessing Connection.
+        """
+        with connection:
+            try:
+                deliver_challenge(connection, self.authkey)
+                answer_challenge(connection, self.authkey)
+                if not connection.poll(RECEIVE_TIMEOUT):
+                    logger.warning("Tracker IPC client sent no command, connection closed.")
+                    return
+                command = connection.recv()
+                handler = self.handlers.get(command.get("cmd"))
+                if handler is None:
+                    connection.send({"ok": False, "error": f"Unknown command: {command.get('cmd')}"})
+                    return
+                with self.lock:
+                    response = handler(command) or {}
+                connection.send({"ok": True, **response})
+            except (OSError, EOFError, AuthenticationError) as e:     #dropped connection or wrong key
+                logger.warning(f"Tracker IPC connection refused: {e}")
+            except Exception as e:
+                logger.error(f"Error in ipc.py - handle: {e}")
+
+class TrackerClient:
+    """
+    Talks to the tracker process from the GUI.
+    """
+    def send(self, command):
+        """
+        Sends a command to the tracker process.
+
+        :param command: Dict with at least the "cmd" key.
+        :return: Response dict, or None if the tracker process is not reachable.
+        """
+        try:
+            with Client(get_address(), authkey=get_authkey()) as connection:
+                connection.send(command)
+                return connection.recv()
+        except (OSError, EOFError, AuthenticationError) as e:   #not running, or the key file changed since it started
+            logger.warning(f"Tracker process not reachable: {e}")
+            return None
+
+    def is_running(self):
+        return self.send({"cmd": "status"}) is not None
+
+    def status(self):
+        return self.send({"cmd": "status"})
+
+    def pause(self, minutes=None):
+        return self.send({"cmd": "pause", "minutes": minutes})
+
+    def resume(self):
+        return self.send({"cmd": "resume"})
+
+    def stats(self, dump=False, path=None):
+        """
+        Returns the latency statistics of the tracker process.
+
+        :param dump: If True, the tracker process also writes them to a JSON file.
+        :param path: File written by dump, STATS_PATH if not given.
+        """
+        return self.send({"cmd": "stats", "dump": dump, "path": path})
+
+tracker_client = TrackerClient()
+
+def spawn_tracker_process():
+    """
+    Starts the tracker process detached from the GUI, so it keeps running when the GUI exits.
+    """
+    if getattr(sys, 'frozen', False):   #builded app has no python interpreter to run the module with
+        command = [sys.executable, "--tracker-service"]
+    else:
+        command = [sys.executable, "-m", "time_insight.tracker.service"]
+
+    if sys.platform == "win32":
+        options = {"creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        options = {"start_new_session": True}
+
+    subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True, **options)
+    logger.info(f"Tracker process started: {' '.join(command)}")
+
+def ensure_tracker_process():
+    """
+    Starts the tracker process unless one is already running.
+    """
+    if not tracker_client.is_running():
+        spawn_tracker_process()
@@ -0,0 +1,39 @@
+class AdaptivePolling:
+    """
+    Decides how long the tracker sleeps between two checks of the active window.
+
+    While the active window stays the same the interval grows from min_interval up to max_interval,
+    after a window change it snaps back to min_interval.
+    """
+    def __init__(self, min_interval, max_interval, stable_ticks=5, backoff=1.5):
+        """
+        :param min_interval: Interval in seconds used while the user is switching windows.
+        :param max_interval: Upper bound of the interval in seconds.
+        :param stable_ticks: Number of ticks without a change before the interval starts growing.
+        :param backoff: Factor the interval is multiplied by on every further tick without a change.
+        """
+        self.min_interval = float(min_interval)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.stable_ticks = stable_ticks
+        self.backoff = backoff
+        self.reset()
+
+    def reset(self):
+        self.unchanged_ticks = 0
+        self.current_interval = self.min_interval
+
+    def next_interval(self, changed):
+        """
+        Returns the interval to sleep before the next tick.
+
+        :param changed: True if the active window changed on this tick.
+        :return: Interval in seconds.
+        """
+        if changed:
+            self.reset()
+            return self.current_interval
+
+        self.unchanged_ticks += 1
+        if self.unchanged_ticks > self.stable_ticks:
+            self.current_interval = min(self.current_interval * self.backoff, self.max_interval)
+        return self.current_interval
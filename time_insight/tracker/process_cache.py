@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+class ProcessCache:
+    """
+    Bounded LRU cache of PID -> (image path, process start time).
+
+    The start time is stored together with the path, so a reused PID is detected
+    by comparing start times instead of trusting the PID alone.
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def get(self, pid, start_time=None):
+        """
+        Returns the cached image path of the process.
+
+        :param pid: The ID of the process.
+        :param start_time: Start time of the process, if given the cached entry must have the same one.
+        :return: The cached path, or None if the process is not cached or the PID has been reused.
+        """
+        entry = self.entries.get(pid)
+        if entry is None:
+            return None
+
+        path, cached_start_time = entry
+        if start_time is not None and start_time != cached_start_time:
+            del self.entries[pid]   #pid reused by another process
+            return None
+
+        self.entries.move_to_end(pid)
+        return path
+
+    def put(self, pid, start_time, path):
+        """
+        Stores the image path of the process, evicting the least recently used entry if the cache is full.
+
+        :param pid: The ID of the process.
+        :param start_time: Start time of the process.
+        :param path: The full path to the process executable file.
+        """
+        self.entries[pid] = (path, start_time)
+        self.entries.move_to_end(pid)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
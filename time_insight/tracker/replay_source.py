@@ -0,0 +1,99 @@
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+from time_insight.tracker.window_source import WindowSource, WindowSample
+
+class ReplayWindowSource(WindowSource):
+    """
+    Feeds a recorded or synthetic stream of active windows to the tracker.
+
+    Used to test and benchmark the tracker without a desktop session. The tracker waits
+    for the time between two samples divided by speed, speed=None does not wait at all.
+    """
+    def __init__(self, samples, speed=None):
+        """
+        :param samples: Iterable of WindowSample (or tuples title, process name, process path, pid, timestamp).
+        :param speed: Replay speed multiplier, None to replay as fast as possible.
+        """
+        self.samples = iter(samples)
+        self.speed = speed
+        self.current = None
+        self.next = self.read_next()
+        self.exhausted = self.next is None
+
+    def read_next(self):
+        sample = next(self.samples, None)
+        return WindowSample(*sample) if sample is not None else None
+
+    def get_active_window(self):
+        if self.next is None:
+            self.exhausted = True
+            return None
+
+        self.current = self.next
+        self.next = self.read_next()
+        self.exhausted = self.next is None
+        return self.current
+
+    def wait(self, stop_event, seconds):
+        if self.speed is None or self.current is None or self.next is None:
+            return stop_event.is_set()
+        gap = (self.next.timestamp - self.current.timestamp).total_seconds()
+        return stop_event.wait(max(gap, 0) / self.speed)
+
+    def now(self):
+        return self.current.timestamp if self.current else super().now()
+
+def load_samples(path):
+    """
+    Reads recorded samples from a JSON lines file.
+
+    Every line is an object with title, process_name, process_path, pid and timestamp (ISO format).
+
+    :param path: Path to the file.
+    :return: Generator of WindowSample.
+    """
+    with open(path, 'r', encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            yield WindowSample(
+                entry["title"],
+                entry["process_name"],
+                entry["process_path"],
+                entry["pid"],
+                datetime.fromisoformat(entry["timestamp"])
+            )
+
+def synthetic_samples(count, applications=20, titles_per_application=50, switch_probability=0.2, step=1.0, start=None, seed=0):
+    """
+    Generates a synthetic stream of active windows.
+
+    :param count: Number of samples.
+    :param applications: Number of distinct applications.
+    :param titles_per_application: Number of distinct window titles per application.
+    :param switch_probability: Probability that the active window changes between two samples.
+    :param step: Seconds between two samples.
+    :param start: Timestamp of the first sample (timezone-aware), now if not given.
+    :param seed: Seed of the random generator, streams with the same seed are identical.
+    :return: Generator of WindowSample.
+    """
+    rng = random.Random(seed)
+    timestamp = start or datetime.now(timezone.utc)
+    app, title = 0, 0
+    for _ in range(count):
+        if rng.random() < switch_probability:
+            app = rng.randrange(applications)
+            title = rng.randrange(titles_per_application)
+
+        process_name = f"app{app}.exe"
+        yield WindowSample(
+            f"{process_name} - window {title}",
+            process_name,
+            f"C:\\Program Files\\App{app}\\{process_name}",
+            1000 + app,
+            timestamp
+        )
+        timestamp += timedelta(seconds=step)
@@ -0,0 +1,76 @@
+import os
+import signal
+import threading
+
+from time_insight.config import STATS_PATH, TRACKER_LOG_PATH
+from time_insight.data.database import init_db
+from time_insight.tracker.tracker import init_tracker, stop_tracker_for_minutes, resume_tracker, controller, activity_lock
+from time_insight.tracker.current_activity import current_activity
+from time_insight.tracker.ipc import TrackerServer
+from time_insight.tracker.stats import stats
+
+from time_insight.logging.logger import tracker_logger as logger, configure_logging
+
+#the tracker process must not import Qt, pandas or plotly, it keeps running while the GUI is closed
+
+def handle_status(command):
+    with activity_lock:
+        session_start = current_activity.session_start
+        return {
+            "running": not controller.paused,
+            "paused_until_restart": controller.paused and controller.resume_at is None,
+            "pid": os.getpid(),
+            "window_name": current_activity.window_name,
+            "application_id": current_activity.application_id,
+            "session_start": session_start.isoformat() if session_start else None
+        }
+
+def handle_pause(command):
+    stop_tracker_for_minutes(command.get("minutes"))
+    return {"running": False}
+
+def handle_resume(command):
+    resume_tracker()
+    return {"running": True}
+
+def handle_stats(command):
+    if command.get("dump"):
+        stats.dump_json(command.get("path") or STATS_PATH)
+    return {"stats": stats.snapshot()}
+
+def run_service():
+    """
+    Runs the tracker as a standalone process controlled over local IPC.
+
+    Exits right away if another tracker process is already listening.
+    """
+    configure_logging(log_path=TRACKER_LOG_PATH)    #the GUI process writes the default log file
+    logger.info("Starting tracker service...")
+
+    init_db()
+
+    try:
+        server = TrackerServer({
+            "status": handle_status,
+            "pause": handle_pause,
+            "resume": handle_resume,
+            "stats": handle_stats
+        })
+    except OSError as e:
+        logger.warning(f"Tracker service is already running: {e}")
+        return
+
+    server.start()
+    init_tracker()
+
+    #wait until terminated, on_end is called by atexit on the way out
+    shutdown_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: shutdown_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: shutdown_event.set())
+    while not shutdown_event.wait(1):
+        pass
+
+    logger.info("Tracker service stopped.")
+
+if __name__ == '__main__':
+    run_service()
@@ -0,0 +1,133 @@
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+class LatencyHistogram:
+    """
+    Latencies of the most recent measurements of one tracker phase.
+
+    Keeps a sliding window of the last samples, percentiles are computed only when a snapshot is taken.
+    """
+    def __init__(self, window=1024):
+        """
+        :param window: Number of most recent samples the percentiles are computed from.
+        """
+        self.samples = deque(maxlen=window)
+        self.count = 0          #all samples since start
+        self.max = 0.0          #slowest sample since start
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def snapshot(self):
+        """
+        :return: Dict with the sample counts and p50/p90/p99/max of the window in milliseconds.
+        """
+        samples = sorted(self.samples)
+        if not samples:
+            return {"count": self.count, "window": 0}
+
+        def percentile(p):
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 3)
+
+        return {
+            "count": self.count,
+            "window": len(samples),
+            "p50_ms": percentile(0.50),
+            "p90_ms": percentile(0.90),
+            "p99_ms": percentile(0.99),
+            "window_max_ms": round(samples[-1] * 1000, 3),
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+class TrackerStats:
+    """
+    In-process latency statistics of the tracker.
+
+    Phases measured by the tracker:
+        tick               - work of one tick without the wait
+        window_query       - reading the active window from the window source (includes process_lookup)
+        process_lookup     - resolving the executable of a process not found in the cache
+        db_read            - reading applications and the current activity from the database
+        application_commit - inserting an application seen for the first time
+        activity_commit    - writing activities (write-behind flush, closing the last activity)
+        session_commit     - writing user sessions
+        tick_drift         - how much later than requested a tick started
+    """
+    def __init__(self, window=1024, late_tolerance=0.25):
+        """
+        :param window: Number of most recent samples kept per phase.
+        :param late_tolerance: Fraction of the interval a tick can come after it is due without being counted late.
+        """
+        self.window = window
+        self.late_tolerance = late_tolerance
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.ticks = 0
+            self.late_ticks = 0
+            self.missed_ticks = 0
+            self.last_tick = None       #monotonic time of the previous tick
+            self.started = time.time()
+
+    def record(self, phase, seconds):
+        with self.lock:
+            histogram = self.histograms.get(phase)
+            if histogram is None:
+                histogram = self.histograms[phase] = LatencyHistogram(self.window)
+            histogram.add(seconds)
+
+    @contextmanager
+    def measure(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def tick(self, expected_interval):
+        """
+        Registers the start of a tracker tick.
+
+        :param expected_interval: Seconds the tracker waited for since the previous tick, None for the first tick.
+        """
+        now = time.monotonic()
+        last_tick, self.last_tick = self.last_tick, now
+        self.ticks += 1
+        if last_tick is None or not expected_interval:
+            return
+
+        gap = now - last_tick
+        self.record("tick_drift", max(gap - expected_interval, 0.0))
+        if gap > expected_interval * (1 + self.late_tolerance):
+            self.late_ticks += 1
+            self.missed_ticks += max(int(gap // expected_interval) - 1, 0)   #whole intervals without a tick
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "uptime_s": round(time.time() - self.started, 3),
+                "ticks": self.ticks,
+                "late_ticks": self.late_ticks,
+                "missed_ticks": self.missed_ticks,
+                "phases": {phase: histogram.snapshot() for phase, histogram in self.histograms.items()}
+            }
+
+    def dump_json(self, path):
+        """
+        Writes the current snapshot to a JSON file.
+
+        :param path: Path to the file.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=4)
+
+stats = TrackerStats()
@@ -1,153 +1,225 @@
-import win32con #type: ignore
-import ctypes 
-import ctypes.wintypes
 import threading
 import time
 import atexit
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from datetime import datetime, timezone
-from time_insight.data.database import engine
-from time_insight.data.models import Application, ApplicationActivity, UserSession, UserSessionType
-from apscheduler.schedulers.background import BackgroundScheduler  #scheduler for every half an hour event
-
-from time_insight.settings import get_setting
-from time_insight.logging.logger import logger
-
-#init system libs
-user32 = ctypes.windll.user32       #functions to work with window
-kernel32 = ctypes.windll.kernel32   #get access to processes & other system info
+from time_insight.data.database import writer_engine
+from time_insight.data.models import ApplicationActivity, UserSession, UserSessionType
+from time_insight.data.data_version import data_version
+from time_insight.data.interning import window_titles, additional_infos
+from time_insight.data.rollups import add_activity_usage, add_session_usage
+from time_insight.tracker.app_registry import registry
+from time_insight.tracker.current_activity import current_activity
+from time_insight.tracker.activity_writer import ActivityRecord, ActivityWriter
+from time_insight.tracker.window_source import create_window_source
+from time_insight.tracker.polling import AdaptivePolling
+from time_insight.tracker.stats import stats
+from time_insight.tracker.heartbeat import heartbeat
+from time_insight.time_converter import make_timezone_aware
+from apscheduler.schedulers.background import BackgroundScheduler  #scheduler for the heartbeat
+
+from time_insight.settings import get_setting, DEFAULT_SETTINGS
+from time_insight.logging.logger import tracker_logger as logger
 
 interval = int(get_setting("window_checking_interval"))
 
+#adaptive polling backs off while the active window stays the same
+adaptive_polling = get_setting("adaptive_polling", DEFAULT_SETTINGS["adaptive_polling"])
+polling = AdaptivePolling(
+    get_setting("polling_min_interval", DEFAULT_SETTINGS["polling_min_interval"]),
+    get_setting("polling_max_interval", DEFAULT_SETTINGS["polling_max_interval"])
+)
+
 stop_event = threading.Event()      #stop tracker global event
 
-def get_active_window_info():
-    """
-    Retrieves the information about the currently active window.
+activity_lock = threading.Lock()    #guards current activity transitions shared with on_end and scheduled tasks
+activity_writer = ActivityWriter(writer_engine)    #write-behind queue for activities
+scheduler = BackgroundScheduler()       #single scheduler of the periodic tasks
 
-    :return: A tuple containing the window title, process name, and process path.
-             Returns (None, None, None) if the active window information cannot be retrieved.
+def record_active_window(engine, event_type="Active", source=None, writer=None):
     """
-    try:
-        hwnd = user32.GetForegroundWindow()     #get active window
-        if not hwnd:                           
-            return None, None, None, None
-
-        length = user32.GetWindowTextLengthW(hwnd)          #get lenght of the title
-        title = ctypes.create_unicode_buffer(length + 1)    #create buffer for window title 
-        user32.GetWindowTextW(hwnd, title, length + 1)      #extract title text
-        
-        processID = ctypes.wintypes.DWORD()
-        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(processID))      #get id of the window process
-
-        #get process path
-        processID_value = processID.value
-        process_path = get_process_filename(processID.value) if processID.value else "Unknown"
-        process_name = process_path.split("\\")[-1] if process_path != "Unknown" else "Unknown"
-
-        logger.info(f"Active window: {process_name}, PID: {processID}.")
+    Continuously tracks the active window and logs its information to the database.
 
-        return title.value, process_name, process_path, processID_value
-    except Exception as e:
-        logger.error(f"Error in tracker.py - get_active_window_info: {e}")
-        return None, None, None, None
+    Runs in an infinite loop, periodically checking for the active window.
 
-def get_process_filename(processID):
+    :param engine: The SQLAlchemy engine used to interact with the database.
+    :param event_type: The type of event being logged (default is "Active").
+    :param source: WindowSource the active window is read from, platform backend if not given.
+    :param writer: ActivityWriter buffering the activities, the global one if not given.
     """
-    Retrieves full file path of a process by given PID.
+    writer = writer or activity_writer
 
-    :param processID: The ID of the process.
-    :return: The full path to the process executable file, or None if the process cannot be accessed.
-    """
-    process_flag = win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ    #flags to access the process
-    h_process = kernel32.OpenProcess(process_flag, 0, processID)                    #opens the process
+    try:
+        source = source or create_window_source()
+        with stats.measure("db_read"), Session(engine) as session:
+            registry.load(session)  #load known apps once
+            current_activity.load(session)  #load activity which hasnt ended yet
+
+        wait_interval = None
+        while not stop_event.is_set() and not source.exhausted:
+            stats.tick(wait_interval)
+            tick_start = time.perf_counter()
+            changed = False
+            with stats.measure("window_query"):
+                sample = source.get_active_window()     #get active window info
+            if sample and sample.title and sample.process_name and sample.process_path:     #check for the data
+                title, process_name, process_path, processID, current_time = sample
+                
+                #get app id from registry, new app record is created on first appearance
+                application_id = registry.lookup(process_name, process_path)
+                if application_id is None:
+                    with Session(engine) as session:    #short session, the writer connection is shared with the scheduler
+                        application_id = registry.resolve(session, process_name, process_path, current_time)
+
+                with activity_lock:
+                    #if current activity hasnt ended yet and has the same window -> nothing to record
+                    if not current_activity.matches(title, application_id):
+                        #close previous activity if hasnt yet been completed
+                        if current_activity.is_open:
+                            writer.close(current_activity.record, current_time)
+
+                        #create new activity, stored on the next flush
+                        new_activity = ActivityRecord(
+                            application_id=application_id,
+                            window_name=title,
+                            additional_info=f"{event_type}, PID: {processID}",
+                            session_start=current_time
+                        )
+                        writer.open(new_activity)
+                        current_activity.start(new_activity)
+                        changed = True
 
-    if not h_process:
-        logger.warning(f"Failed to open process with ID {processID}.")
-        return None
+                        logger.info(f"New activity created for application: {process_name}, window: {title}, PID: {processID}",
+                                    extra={"rate_limit_key": "new_activity"})
 
-    try:
-        filename_buffer_size = ctypes.wintypes.DWORD(4096)                      #set buffer size
-        filename = ctypes.create_unicode_buffer(filename_buffer_size.value)     #create buffer 
-        kernel32.QueryFullProcessImageNameW(h_process, 0, ctypes.byref(filename), ctypes.byref(filename_buffer_size))      #get process path
-        return filename.value
-    finally:
-        kernel32.CloseHandle(h_process)     #always close process handle
-
-def make_timezone_aware(dt):
-    """
-    Makes a datetime object timezone-aware, setting it to UTC if it's naive.
+            if writer.flush_due():
+                with stats.measure("activity_commit"):
+                    writer.flush()      #write buffered activities in one transaction
 
-    :param dt: The datetime object to make timezone-aware.
-    :return: A timezone-aware datetime object (in UTC).
-    """
-    try:
-        if dt.tzinfo is None:                           #if there is no info about timezone
-            return dt.replace(tzinfo=timezone.utc)      #set to utc
-        return dt
+            heartbeat.beat()    #memory write only, no commit
+            stats.record("tick", time.perf_counter() - tick_start)
+
+            wait_interval = polling.next_interval(changed) if adaptive_polling else interval
+            source.wait(stop_event, wait_interval)
     except Exception as e:
-        logger.error(f"Error in tracker.py - make_timezone_aware: {e}")
-        return dt
+        logger.error(f"Error in tracker.py - record_active_window: {e}")
 
-def record_active_window(engine, event_type="Active"):
+class TrackerController:
     """
-    Continuously tracks the active window and logs its information to the database.
+    Owns the tracker thread and the scheduler for the lifetime of the process.
 
-    Runs in an infinite loop, periodically checking for the active window.
-
-    :param engine: The SQLAlchemy engine used to interact with the database.
-    :param event_type: The type of event being logged (default is "Active").
+    The recorder thread and the scheduler are started once. Pausing stops polling and ends the current
+    session, the same thread then sleeps until it is resumed, manually or when the pause runs out.
     """
-    with Session(engine) as session:    #open session to work with db
-        try:
-            while not stop_event.is_set():                 
-                title, process_name, process_path, processID = get_active_window_info()  #get active window info
-                if title and process_name and process_path:     #check for the data
-                    current_time = datetime.now(timezone.utc)   #curr time in utc
-                    
-                    #check if there is an app record in db
-                    application = session.query(Application).filter_by(name=process_name).first()
-                    if not application:
-                        #create new app record
-                        application = Application(
-                            name=process_name,
-                            desc="",
-                            path=process_path,
-                            enrollment_date=current_time
-                        )
-                        session.add(application)
-                        session.commit()
-
-                        logger.info(f"New application created: {process_name} {process_path}.")
-
-                    #check last activity
-                    #if last activity hasnt ended yet and has the same title -> skip
-                    last_activity = session.query(ApplicationActivity).order_by(desc(ApplicationActivity.session_start)).first()
-                    if last_activity and last_activity.window_name == title and last_activity.session_end is None:
-                        time.sleep(interval)
-                        continue
-                    
-                    #close previous activity if hasnt yet been completed
-                    if last_activity and last_activity.session_end is None:
-                        update_last_activity(session, current_time)
-
-                    #create new activity
-                    new_activity = ApplicationActivity(
-                        application_id=application.id,
-                        window_name=title,
-                        additional_info=f"{event_type}, PID: {processID}", 
-                        session_start=current_time
-                    )
-                    session.add(new_activity)
-                    session.commit()
-
-                    logger.info(f"New activity created for application: {process_name}, window: {title}, PID: {processID}")
-
-                time.sleep(interval)
-        except Exception as e:
-            logger.error(f"Error in tracker.py - record_active_window: {e}")
-            session.rollback()
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+        self.started = False
+        self.paused = False
+        self.cancelled = False
+        self.resume_at = None               #monotonic time the pause ends at, None to pause until resumed
+        self.resume_event = threading.Event()   #wakes the paused recorder thread
+        self.idle = threading.Event()       #set while the recorder thread is not polling
+        self.idle.set()
+
+    def start(self):
+        """
+        Starts the tracker, does nothing if it is already running.
+        """
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+
+            stop_event.clear()
+            on_start()                  #action on start
+            atexit.register(self.cancel)    #register action on end
+
+            #start a thread for main tracker
+            self.thread = threading.Thread(target=self.run, daemon=True, name="ActiveWindowRecorder")
+            self.thread.start()
+
+            schedule_heartbeat()        #schedule periodic heartbeat
+
+    def run(self):
+        while not self.cancelled:
+            self.idle.clear()
+            record_active_window(writer_engine)
+            self.idle.set()
+
+            if not self.paused and not self.cancelled:
+                #recorder failed, try again later instead of leaving the tracker dead
+                logger.warning("Tracker recorder stopped unexpectedly, restarting in 10 seconds.")
+                stop_event.wait(10)
+
+            while self.paused and not self.cancelled:
+                if self.resume_at is None:
+                    timeout = None
+                else:
+                    timeout = min(max(self.resume_at - time.monotonic(), 0), threading.TIMEOUT_MAX)
+                if self.resume_event.wait(timeout):
+                    self.resume_event.clear()   #resumed or pause changed, check again
+                else:
+                    self.resume()   #pause ran out
+
+    def pause(self, minutes=None):
+        """
+        Stops recording, ends the current activity and session and starts a sleep session.
+
+        :param minutes: Length of the pause, None to pause until resume is called.
+                        Pausing a paused tracker only changes when it resumes.
+        """
+        with self.lock:
+            self.resume_at = time.monotonic() + minutes * 60 if minutes is not None else None
+            if self.paused or not self.started:
+                self.resume_event.set()     #recompute the wake up time
+                return
+
+            self.paused = True
+            self.resume_event.clear()
+            stop_event.set()
+            self.idle.wait(5)   #let the recorder finish its tick, so it does not open an activity after on_end
+            on_end()
+
+        logger.info(f"Tracker stopped for {minutes if minutes is not None else 'unlimited'} minutes.")
+
+    def resume(self):
+        """
+        Starts recording again after a pause.
+        """
+        with self.lock:
+            if not self.paused or self.cancelled:
+                return
+            self.paused = False
+            self.resume_at = None
+
+            #the database may have been restored during the pause, ids of interned texts are stale then,
+            #record_active_window reloads the application registry and the open activity
+            window_titles.clear()
+            additional_infos.clear()
+            on_start()
+            stop_event.clear()
+            self.resume_event.set()
+
+        logger.info("Tracker resumed.")
+
+    def cancel(self):
+        """
+        Stops the tracker for good, called when the process exits.
+        """
+        with self.lock:
+            if self.cancelled or not self.started:
+                return
+            self.cancelled = True
+            stop_event.set()
+            self.resume_event.set()
+            if scheduler.running:
+                scheduler.shutdown(wait=False)
+            if not self.paused:
+                self.idle.wait(5)
+                on_end()
+
+controller = TrackerController()
 
 def init_tracker():
     """
@@ -157,35 +229,43 @@ def init_tracker():
 
     :return: None
     """
-    stop_event.clear()
+    controller.start()
 
-    on_start()                  #action on start
-    atexit.register(on_end)     #register action on end
-    
-    #start a thread for main tracker
-    threading.Thread(target=record_active_window, args=(engine,), daemon=True, name="ActiveWindowRecorder").start()
+def stop_tracker_for_minutes(minutes):
+    """
+    Pauses the tracker.
 
-    schedule_half_hour_tasks()  #schedule half an hour tasks
+    :param minutes: Length of the pause, None to pause until the tracker is resumed.
+    """
+    controller.pause(minutes)
 
-def stop_tracker():
-    stop_event.set()
-    logger.info("Tracker stop signal sent.")
+def resume_tracker():
+    controller.resume()
 
-def stop_tracker_for_minutes(minutes):
-    stop_tracker()
+if __name__ == '__main__':
+    init_tracker()
 
-    def restart():
-        time.sleep(minutes * 60)
-        init_tracker()
-        logger.info(f"Tracker restarted after {minutes} minutes.")
+def get_open_session(session):
+    """
+    Returns the session the tracker has not ended yet.
 
-    on_end()
-    threading.Thread(target=restart, daemon=True).start()
-    logger.info(f"Tracker stopped for {minutes} minutes.")
+    Found by its missing end, not by the highest id, imported history gets ids above the live rows.
 
+    :param session: SQLAlchemy session object used for database interactions.
+    :return: UserSession object, or None.
+    """
+    return session.query(UserSession).filter(UserSession.session_end.is_(None)) \
+        .order_by(UserSession.session_start.desc(), UserSession.id.desc()).first()
 
-if __name__ == '__main__':
-    init_tracker()
+def get_open_activity(session):
+    """
+    Returns the activity the tracker has not ended yet, see get_open_session.
+
+    :param session: SQLAlchemy session object used for database interactions.
+    :return: ApplicationActivity object, or None.
+    """
+    return session.query(ApplicationActivity).filter(ApplicationActivity.session_end.is_(None)) \
+        .order_by(ApplicationActivity.session_start.desc(), ApplicationActivity.id.desc()).first()
 
 def update_last_session(session, end_time):
     """
@@ -194,12 +274,15 @@ def update_last_session(session, end_time):
     :param session: SQLAlchemy session object used for database interactions.
     :param end_time: The timestamp indicating the end of the session (timezone-aware).
     """
-    last_session = session.query(UserSession).order_by(UserSession.id.desc()).first()   #get last session
-    if last_session and last_session.session_end is None:   #end last session if still active
-        last_session.session_end = end_time     
+    last_session = get_open_session(session)
+    if last_session:   #end last session if still active
+        last_session.session_end = max(end_time, make_timezone_aware(last_session.session_start))
         last_session.duration = round((make_timezone_aware(last_session.session_end) -
                                        make_timezone_aware(last_session.session_start)).total_seconds(), 3)
-        session.commit()    #save changes
+        if last_session.user_session_type_id == 1:  #only active time is rolled up
+            add_session_usage(session, last_session.session_start, last_session.session_end)
+        with stats.measure("session_commit"):
+            session.commit()    #save changes
 
         logger.info("Last session ended.")
 
@@ -210,15 +293,30 @@ def update_last_activity(session, end_time):
     :param session: SQLAlchemy session object used for database interactions.
     :param end_time: The timestamp indicating the end of the activity (timezone-aware).
     """
-    last_activity = session.query(ApplicationActivity).order_by(ApplicationActivity.id.desc()).first()  #get last activity
-    if last_activity and last_activity.session_end is None: #end last activity if still active
-        last_activity.session_end = end_time
+    last_activity = get_open_activity(session)
+    if last_activity: #end last activity if still active
+        last_activity.session_end = max(end_time, make_timezone_aware(last_activity.session_start))
         last_activity.duration = round((make_timezone_aware(last_activity.session_end) -
                                         make_timezone_aware(last_activity.session_start)).total_seconds(), 3)
-        session.commit()    #save changes
+        add_activity_usage(session, last_activity.application_id, last_activity.session_start, last_activity.session_end)
+        with stats.measure("activity_commit"):
+            session.commit()    #save changes
 
         logger.info("Last activity ended.")
 
+def close_current_activity(end_time):
+    """
+    Ends the activity the tracker is currently recording and writes all buffered activities to the database.
+
+    :param end_time: The timestamp indicating the end of the activity (timezone-aware).
+    """
+    with activity_lock:
+        if current_activity.is_open:
+            activity_writer.close(current_activity.record, end_time)
+        current_activity.clear()
+    with stats.measure("activity_commit"):
+        activity_writer.flush()
+
 def add_user_session(session, session_type_id, start_time):
     """
     Adds a new user session to the database.
@@ -232,7 +330,8 @@ def add_user_session(session, session_type_id, start_time):
         session_start=start_time
     )
     session.add(new_session)
-    session.commit()
+    with stats.measure("session_commit"):
+        session.commit()
 
     logger.info("New user session added.")
 
@@ -242,11 +341,25 @@ def on_start():
     ends the last active session if it is still ongoing, and adds a new session of 'Active' type.
     """
     logger.info("Application started. Ending last session and adding a new active.")
-    with Session(engine) as session:
+    activity_writer.replay()    #store activities buffered by a killed process
+    with Session(writer_engine) as session:
         try:
             current_time = datetime.now(timezone.utc)   #curr time
+
+            #active session still open -> previous run has not ended properly (crash, power loss)
+            last_session = get_open_session(session)
+            last_alive = heartbeat.read()
+            if (last_session and last_session.user_session_type_id == 1
+                    and last_alive and last_alive < current_time):
+                logger.info(f"Previous run ended unexpectedly, closing its session at last heartbeat {last_alive}.")
+                update_last_activity(session, last_alive)   #end dangling activity
+                update_last_session(session, last_alive)    #end dangling session
+                add_user_session(session, session_type_id=2, start_time=last_alive)   #downtime is sleep
+                data_version.bump(history=True)     #past ranges have changed
+
             update_last_session(session, current_time)  #end last session
             add_user_session(session, session_type_id=1, start_time=current_time)   #add new active session
+            heartbeat.beat(current_time)
         except Exception as e:
             logger.error(f"Error in tracker.py - on_end end: {e}")
             session.rollback()
@@ -257,9 +370,10 @@ def on_end():
     calculates their durations, and adds a new session of 'Sleep' type.
     """ 
     logger.info("Application ended. Ending last session and activity, adding a new sleep session.")
-    with Session(engine) as session:
+    with Session(writer_engine) as session:
         try:
             current_time = datetime.now(timezone.utc)   #curr time
+            close_current_activity(current_time)        #end buffered activity and flush
             update_last_activity(session, current_time) #end last activity
             update_last_session(session, current_time)  #end last session
             add_user_session(session, session_type_id=2, start_time=current_time)   #add new sleep session
@@ -267,38 +381,31 @@ def on_end():
             logger.error(f"Error in tracker.py - on_end end: {e}")
             session.rollback()
 
-def schedule_half_hour_tasks():
+def schedule_heartbeat():
     """
-    Schedules a task to end active sessions every half hour.
+    Schedules the heartbeat task.
 
-    This function initializes a background scheduler that runs the end_active_sessions function
+    Sessions and activities are stored unsplit, they are cut into local days and hours by the rollups (see data/rollups.py)
+    or into buckets when queried (see data/segmentation.py).
     """
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(end_active_sessions, 'cron', minute='0,30')    #run every half an hour
+    heartbeat_interval = int(get_setting("heartbeat_interval", DEFAULT_SETTINGS["heartbeat_interval"]))
+    scheduler.add_job(heartbeat_task, 'interval', seconds=heartbeat_interval)
     scheduler.start()
 
-def end_active_sessions():
+def heartbeat_task():
     """
-    Ends the last active activity and session, updates their durations, and starts a new Active session.
-
-    This function is scheduled to run every half an hour to ensure that sessions are properly ended and new sessions are started.
+    Periodic task of the tracker, updates the last alive time and writes out activities
+    still waiting in the write-behind queue.
     """
-    try:
-        with Session(engine) as session:
-            current_time = datetime.now(timezone.utc)
-
-            logger.info(f"Executing half-hour sessions killer task at: {current_time}.")
-
-            update_last_activity(session, current_time)
-            update_last_session(session, current_time)
-            add_user_session(session, session_type_id=1, start_time=current_time)
-
-            session.commit()
-            logger.info("Half-hour sessions killer task completed successfully.")
+    if controller.paused:
+        return
 
+    heartbeat.beat()
+    try:
+        with stats.measure("activity_commit"):
+            activity_writer.flush()
     except Exception as e:
-        logger.error(f"Error during half-hour sessions killer task: {e}")
-
+        logger.error(f"Error in tracker.py - heartbeat_task: {e}")
 
 def set_interval(var):
     global interval 
@@ -0,0 +1,105 @@
+import win32con #type: ignore
+import ctypes
+import ctypes.wintypes
+
+from time_insight.tracker.window_source import WindowSource, WindowSample
+from time_insight.tracker.process_cache import ProcessCache
+from time_insight.tracker.stats import stats
+
+from time_insight.logging.logger import tracker_logger as logger
+
+#init system libs
+user32 = ctypes.windll.user32       #functions to work with window
+kernel32 = ctypes.windll.kernel32   #get access to processes & other system info
+
+class Win32WindowSource(WindowSource):
+    """
+    Reads the active window through the Win32 API.
+    """
+    def __init__(self):
+        self.process_cache = ProcessCache()     #pid -> (process path, process creation time)
+        self.last_foreground = (None, None)     #(hwnd, pid) of the previous tick
+
+        #buffers reused on every tick
+        self.title_buffer = ctypes.create_unicode_buffer(512)
+        self.process_id_buffer = ctypes.wintypes.DWORD()
+        self.filename_buffer = ctypes.create_unicode_buffer(4096)
+        self.filename_buffer_size = ctypes.wintypes.DWORD()
+        self.creation_time = ctypes.wintypes.FILETIME()
+        self.exit_time = ctypes.wintypes.FILETIME()
+        self.kernel_time = ctypes.wintypes.FILETIME()
+        self.user_time = ctypes.wintypes.FILETIME()
+
+    def get_active_window(self):
+        """
+        Retrieves the information about the currently active window.
+
+        :return: WindowSample with the window title, process name, process path and process id.
+                 Returns None if the active window information cannot be retrieved.
+        """
+        try:
+            hwnd = user32.GetForegroundWindow()     #get active window
+            if not hwnd:
+                return None
+
+            length = user32.GetWindowTextLengthW(hwnd)          #get lenght of the title
+            if length + 1 > len(self.title_buffer):
+                self.title_buffer = ctypes.create_unicode_buffer(length + 1)    #grow buffer for window title
+            user32.GetWindowTextW(hwnd, self.title_buffer, len(self.title_buffer))  #extract title text
+
+            user32.GetWindowThreadProcessId(hwnd, ctypes.byref(self.process_id_buffer))     #get id of the window process
+
+            #get process path
+            processID_value = self.process_id_buffer.value
+            process_path = None
+            if (hwnd, processID_value) == self.last_foreground:
+                #same window as on the previous tick, its process is still alive so the pid can not be reused
+                process_path = self.process_cache.get(processID_value)
+            if process_path is None:
+                process_path = self.get_process_filename(processID_value) if processID_value else "Unknown"
+            self.last_foreground = (hwnd, processID_value)
+            process_name = process_path.split("\\")[-1] if process_path != "Unknown" else "Unknown"
+
+            logger.debug(f"Active window: {process_name}, PID: {processID_value}.", extra={"rate_limit_key": "active_window"})    #every tick
+
+            return WindowSample(self.title_buffer.value, process_name, process_path, processID_value, self.now())
+        except Exception as e:
+            logger.error(f"Error in win32_source.py - get_active_window: {e}")
+            return None
+
+    def get_process_filename(self, processID):
+        """
+        Retrieves full file path of a process by given PID.
+
+        Paths are cached per PID together with the process creation time, so a reused PID is not
+        mistaken for the cached process and the image name is only queried once per process.
+
+        :param processID: The ID of the process.
+        :return: The full path to the process executable file, or None if the process cannot be accessed.
+        """
+        process_flag = win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ    #flags to access the process
+        h_process = kernel32.OpenProcess(process_flag, 0, processID)                    #opens the process
+
+        if not h_process:
+            logger.warning(f"Failed to open process with ID {processID}.")
+            return None
+
+        try:
+            #creation time tells apart processes which got the same pid
+            kernel32.GetProcessTimes(h_process, ctypes.byref(self.creation_time), ctypes.byref(self.exit_time),
+                                     ctypes.byref(self.kernel_time), ctypes.byref(self.user_time))
+            start_time = (self.creation_time.dwHighDateTime << 32) | self.creation_time.dwLowDateTime
+
+            process_path = self.process_cache.get(processID, start_time)
+            if process_path is not None:
+                return process_path
+
+            with stats.measure("process_lookup"):
+                self.filename_buffer_size.value = len(self.filename_buffer)     #reset buffer size, it is overwritten by the call
+                kernel32.QueryFullProcessImageNameW(h_process, 0, self.filename_buffer, ctypes.byref(self.filename_buffer_size))      #get process path
+                process_path = self.filename_buffer.value
+
+            self.process_cache.put(processID, start_time, process_path)
+            return process_path
+        finally:
+            kernel32.CloseHandle(h_process)     #always close process handle
@@ -0,0 +1,64 @@
+import sys
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from time_insight.settings import get_setting, DEFAULT_SETTINGS
+from time_insight.logging.logger import tracker_logger as logger
+
+#one observation of the active window
+WindowSample = namedtuple("WindowSample", ["title", "process_name", "process_path", "pid", "timestamp"])
+
+class WindowSource:
+    """
+    Backend the tracker reads the active window from.
+
+    record_active_window only talks to this interface, so the tracker does not depend on the platform it runs on.
+    """
+    exhausted = False   #set by finite sources (replay) when there is nothing more to read
+
+    def get_active_window(self):
+        """
+        Retrieves the information about the currently active window.
+
+        :return: WindowSample, or None if the active window information cannot be retrieved.
+        """
+        raise NotImplementedError
+
+    def wait(self, stop_event, seconds):
+        """
+        Waits before the next tick.
+
+        :param stop_event: threading.Event which interrupts the wait when set.
+        :param seconds: Requested interval in seconds.
+        :return: True if the stop event has been set.
+        """
+        return stop_event.wait(seconds)
+
+    def now(self):
+        return datetime.now(timezone.utc)
+
+def create_window_source(name=None):
+    """
+    Creates the window source backend.
+
+    :param name: Name of the backend ("win32", "x11", "auto"), read from settings if not given.
+    :return: WindowSource object.
+    """
+    if name is None:
+        name = get_setting("window_source", DEFAULT_SETTINGS["window_source"])
+
+    if name == "auto":
+        if sys.platform == "win32":
+            name = "win32"
+        elif sys.platform.startswith("linux"):
+            name = "x11"
+
+    if name == "win32":
+        from time_insight.tracker.win32_source import Win32WindowSource     #imports windows only libs
+        return Win32WindowSource()
+    if name == "x11":
+        from time_insight.tracker.x11_source import X11WindowSource     #loads libX11
+        return X11WindowSource()
+
+    logger.error(f"No window source available for platform {sys.platform} (window_source: {name}).")
+    raise RuntimeError(f"Unsupported window source: {name}")
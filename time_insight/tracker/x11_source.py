@@ -0,0 +1,242 @@
+import os
+import ctypes
+import ctypes.util
+
+from time_insight.tracker.window_source import WindowSource, WindowSample
+from time_insight.tracker.process_cache import ProcessCache
+from time_insight.tracker.stats import stats
+
+from time_insight.logging.logger import tracker_logger as logger
+
+#init system libs
+libX11 = ctypes.cdll.LoadLibrary(ctypes.util.find_library("X11") or "libX11.so.6")
+
+Window = ctypes.c_ulong
+Atom = ctypes.c_ulong
+XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+
+libX11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+libX11.XOpenDisplay.restype = ctypes.c_void_p
+libX11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+libX11.XDefaultRootWindow.restype = Window
+libX11.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+libX11.XInternAtom.restype = Atom
+libX11.XGetWindowProperty.argtypes = [
+    ctypes.c_void_p, Window, Atom, ctypes.c_long, ctypes.c_long, ctypes.c_int, Atom,
+    ctypes.POINTER(Atom), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_ulong),
+    ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.POINTER(ctypes.c_ubyte))
+]
+libX11.XGetWindowProperty.restype = ctypes.c_int
+libX11.XFree.argtypes = [ctypes.c_void_p]
+libX11.XSelectInput.argtypes = [ctypes.c_void_p, Window, ctypes.c_long]
+libX11.XPending.argtypes = [ctypes.c_void_p]
+libX11.XPending.restype = ctypes.c_int
+libX11.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+libX11.XSetErrorHandler.argtypes = [XErrorHandler]
+libX11.XSetErrorHandler.restype = ctypes.c_void_p
+
+ANY_PROPERTY_TYPE = 0
+XA_CARDINAL = 6
+XA_WINDOW = 33
+XA_WM_NAME = 39
+PROPERTY_CHANGE_MASK = 1 << 22
+PROPERTY_NOTIFY = 28
+
+#fields of XPropertyEvent in the XEvent buffer of longs (type, serial, send_event, display, window, atom, ...)
+EVENT_TYPE = 0
+EVENT_WINDOW = 4
+EVENT_ATOM = 5
+
+@XErrorHandler
+def ignore_x_errors(display, event):
+    #windows can be destroyed between two requests, default handler would exit the process
+    return 0
+
+class X11WindowSource(WindowSource):
+    """
+    Reads the active window through X11 properties and the executable through /proc.
+
+    A steady-state tick reads only _NET_ACTIVE_WINDOW of the root window. The title of the active
+    window is read again only when the X server reports that it changed. The process is resolved
+    only when the active window changes and is cached per PID, validated by the process start time.
+    """
+    def __init__(self, display_name=None):
+        self.display = libX11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self.display:
+            raise RuntimeError("Cannot open X display.")
+        libX11.XSetErrorHandler(ignore_x_errors)
+
+        self.root = libX11.XDefaultRootWindow(self.display)
+        self.net_active_window = self.intern_atom("_NET_ACTIVE_WINDOW")
+        self.net_wm_name = self.intern_atom("_NET_WM_NAME")
+        self.net_wm_pid = self.intern_atom("_NET_WM_PID")
+        self.utf8_string = self.intern_atom("UTF8_STRING")
+
+        self.process_cache = ProcessCache()     #pid -> (process path, process start time)
+
+        self.active_window = None
+        self.title = None
+        self.process = (None, None, None)       #(process name, process path, pid) of the active window
+
+        #buffers reused on every tick
+        self.actual_type = Atom()
+        self.actual_format = ctypes.c_int()
+        self.nitems = ctypes.c_ulong()
+        self.bytes_after = ctypes.c_ulong()
+        self.prop = ctypes.POINTER(ctypes.c_ubyte)()
+        self.event = (ctypes.c_long * 24)()     #XEvent union
+
+    def intern_atom(self, name):
+        return libX11.XInternAtom(self.display, name.encode(), 0)
+
+    def get_property(self, window, atom, property_type, length=1024):
+        """
+        Reads a window property.
+
+        :return: Tuple (data pointer, number of items, format), or None if the property cannot be read.
+                 The data pointer has to be released by XFree.
+        """
+        status = libX11.XGetWindowProperty(
+            self.display, window, atom, 0, length, 0, property_type,
+            ctypes.byref(self.actual_type), ctypes.byref(self.actual_format),
+            ctypes.byref(self.nitems), ctypes.byref(self.bytes_after), ctypes.byref(self.prop)
+        )
+        if status != 0 or not self.prop:
+            return None
+        if self.nitems.value == 0:
+            libX11.XFree(self.prop)
+            return None
+        return self.prop, self.nitems.value, self.actual_format.value
+
+    def get_cardinal(self, window, atom, property_type):
+        result = self.get_property(window, atom, property_type, 1)
+        if result is None:
+            return None
+        prop, _, _ = result
+        try:
+            return ctypes.cast(prop, ctypes.POINTER(ctypes.c_ulong))[0]   #format 32 items are returned as longs
+        finally:
+            libX11.XFree(prop)
+
+    def get_title(self, window):
+        result = self.get_property(window, self.net_wm_name, self.utf8_string)
+        if result is None:
+            result = self.get_property(window, XA_WM_NAME, ANY_PROPERTY_TYPE)
+        if result is None:
+            return ""
+        prop, nitems, _ = result
+        try:
+            return ctypes.string_at(prop, nitems).decode("utf-8", errors="replace")
+        finally:
+            libX11.XFree(prop)
+
+    def title_changed(self):
+        """
+        Drains pending X events, returns True if the title of the active window changed.
+
+        Events of previously active windows can still be queued, they are dropped.
+        """
+        changed = False
+        while libX11.XPending(self.display):
+            libX11.XNextEvent(self.display, self.event)
+            if (ctypes.c_int(self.event[EVENT_TYPE]).value == PROPERTY_NOTIFY
+                    and self.event[EVENT_WINDOW] == self.active_window
+                    and self.event[EVENT_ATOM] in (self.net_wm_name, XA_WM_NAME)):
+                changed = True
+        return changed
+
+    def get_active_window(self):
+        """
+        Retrieves the information about the currently active window.
+
+        :return: WindowSample with the window title, process name, process path and process id.
+                 Returns None if the active window information cannot be retrieved.
+        """
+        try:
+            window = self.get_cardinal(self.root, self.net_active_window, XA_WINDOW)
+            if not window:
+                if self.active_window:
+                    libX11.XSelectInput(self.display, self.active_window, 0)
+                self.active_window = None
+                return None
+
+            if window != self.active_window:
+                if self.active_window:
+                    libX11.XSelectInput(self.display, self.active_window, 0)    #stop title updates of background windows
+                libX11.XSelectInput(self.display, window, PROPERTY_CHANGE_MASK)   #get notified about title changes
+                self.title_changed()    #drop events of the previous window
+                self.active_window = window
+                self.title = self.get_title(window)
+                self.process = self.get_window_process(window)
+
+                logger.debug(f"Active window: {self.process[0]}, PID: {self.process[2]}.", extra={"rate_limit_key": "active_window"})
+            elif self.title_changed():
+                self.title = self.get_title(window)
+
+            process_name, process_path, pid = self.process
+            return WindowSample(self.title, process_name, process_path, pid, self.now())
+        except Exception as e:
+            logger.error(f"Error in x11_source.py - get_active_window: {e}")
+            return None
+
+    def get_window_process(self, window):
+        """
+        Resolves the process owning the window.
+
+        :param window: X11 window id.
+        :return: Tuple (process name, process path, pid).
+        """
+        pid = self.get_cardinal(window, self.net_wm_pid, XA_CARDINAL) or 0
+        if not pid:
+            return "Unknown", "Unknown", pid
+
+        process_path = self.get_process_filename(pid)
+        if process_path is None:
+            return "Unknown", "Unknown", pid
+        return os.path.basename(process_path), process_path, pid
+
+    def get_process_filename(self, pid):
+        """
+        Retrieves full file path of a process by given PID.
+
+        :param pid: The ID of the process.
+        :return: The full path to the process executable file, or None if the process cannot be accessed.
+        """
+        start_time = get_process_start_time(pid)
+        if start_time is None:
+            return None
+
+        process_path = self.process_cache.get(pid, start_time)
+        if process_path is not None:
+            return process_path
+
+        with stats.measure("process_lookup"):
+            try:
+                process_path = os.readlink(f"/proc/{pid}/exe")
+            except OSError:
+                #exe link of processes of other users is not readable, fall back to the process name
+                try:
+                    with open(f"/proc/{pid}/comm", 'r') as f:
+                        process_path = f.read().strip()
+                except OSError:
+                    logger.warning(f"Failed to read process with ID {pid}.")
+                    return None
+
+        self.process_cache.put(pid, start_time, process_path)
+        return process_path
+
+def get_process_start_time(pid):
+    """
+    Reads the start time of a process, in clock ticks after system boot.
+
+    :param pid: The ID of the process.
+    :return: Start time, or None if the process does not exist.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as f:
+            stat = f.read()
+    except OSError:
+        return None
+    #process name can contain spaces and brackets, fields are counted after its closing bracket
+    fields = stat[stat.rindex(")") + 2:].split()
+    return int(fields[19])  #field 22 of /proc/<pid>/stat
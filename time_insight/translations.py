@@ -22,7 +22,13 @@ translations = {
         "export_programs_data": "Export Programs Data",
         "export_sessions_data": "Export Sessions Data",
         "export_database": "Export Database",
+        "exporting": "Exporting...",
         "import_database": "Import Database",
+        "export_parquet": "Export History (Parquet)",
+        "import_parquet": "Import History (Parquet)",
+        "dump_tracker_stats": "Save Tracker Statistics",
+        "parquet_unavailable": "Requires the optional pyarrow package (pip install pyarrow).",
+        "importing": "Importing...",
         "daily_report": "Daily Report",
         "weekly_report": "Weekly Report",
         "monthly_report": "Monthly Report",
@@ -34,6 +40,7 @@ translations = {
         "exit": "Exit",
         "tracker_stopped": "Tracker stopped",
         "tracker_running": "Tracker running",
+        "turn_on_tracker": "Turn on tracker",
         "main": "Main",
         "stats": "Stats",
         "today_button_text": "Today",
@@ -90,7 +97,13 @@ translations = {
         "export_programs_data": "Exportovat data o programech",
         "export_sessions_data": "Exportovat data o relacích",
         "export_database": "Exportovat databázi",
+        "exporting": "Exportování...",
         "import_database": "Importovat databázi",
+        "export_parquet": "Exportovat historii (Parquet)",
+        "import_parquet": "Importovat historii (Parquet)",
+        "dump_tracker_stats": "Uložit statistiky sledování",
+        "parquet_unavailable": "Vyžaduje volitelný balíček pyarrow (pip install pyarrow).",
+        "importing": "Importování...",
         "daily_report": "Denní zpráva",
         "weekly_report": "Týdenní zpráva",
         "monthly_report": "Měsíční zpráva",
@@ -102,6 +115,7 @@ translations = {
         "exit": "Uzavřít",
         "tracker_stopped": "Sledování je zastaveno",
         "tracker_running": "Sledování je spuštěno",
+        "turn_on_tracker": "Zapnout sledování",
         "main": "Hlavní stránka ",
         "stats": "Statistika",
         "today_button_text": "Dnes",
@@ -1,14 +1,16 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from PyQt5.QtCore import QDate
 from PyQt5.QtWidgets import (
             QWidget, QVBoxLayout, QLabel, QScrollArea, QTableWidget, QTableWidgetItem, QHeaderView
 )
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from time_insight.data.database import engine
+from time_insight.data.database import reader_engine
 from time_insight.data.models import ApplicationActivity, Application
+from time_insight.data.intervals import overlap_filter, clipped_interval
+from time_insight.data.interning import join_activity_texts, activity_window_name, activity_additional_info
 
 from time_insight.time_converter import datetime_from_utc_to_local
-from time_insight.logging.logger import logger
 
 from time_insight.ui.language_manager import language_manager 
 from time_insight.translations import t
@@ -67,8 +69,8 @@ class ActivitiesWidget(QWidget):
             if activities:
                 #convert UTC datetimes to local timezone
                 for activity in activities:
-                    activity.session_start = datetime_from_utc_to_local(activity.session_start)
-                    activity.session_end = datetime_from_utc_to_local(activity.session_end)
+                    activity["session_start"] = datetime_from_utc_to_local(activity["session_start"])
+                    activity["session_end"] = datetime_from_utc_to_local(activity["session_end"])
                 
                 #draw table
                 self.draw_table(activities)
@@ -99,11 +101,11 @@ class ActivitiesWidget(QWidget):
         for row_idx, activity in enumerate(activities):
             #table.setItem(row_idx, 0, QTableWidgetItem(str(activity.id)))
             #table.setItem(row_idx, 1, QTableWidgetItem(str(activity.application_id)))
-            table.setItem(row_idx, 0, QTableWidgetItem(activity.window_name))
-            table.setItem(row_idx, 1, QTableWidgetItem(activity.additional_info))
-            table.setItem(row_idx, 2, QTableWidgetItem(str(activity.session_start)))
-            table.setItem(row_idx, 3, QTableWidgetItem(str(activity.session_end)))
-            table.setItem(row_idx, 4, QTableWidgetItem(str(activity.duration)))
+            table.setItem(row_idx, 0, QTableWidgetItem(activity["window_name"]))
+            table.setItem(row_idx, 1, QTableWidgetItem(activity["additional_info"]))
+            table.setItem(row_idx, 2, QTableWidgetItem(str(activity["session_start"])))
+            table.setItem(row_idx, 3, QTableWidgetItem(str(activity["session_end"])))
+            table.setItem(row_idx, 4, QTableWidgetItem(str(activity["duration"])))
 
         #auto resize columns
         table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
@@ -112,26 +114,37 @@ class ActivitiesWidget(QWidget):
         self.layout.addWidget(table)
 
     def get_activities_from_database(self, target_date, program_filter=None):
+        """
+        :return: List of dicts with window_name, additional_info, session_start, session_end (naive UTC) and duration
+                 of the activities of the day, the parts inside the day, the running one up to now.
+        """
         #convert QDate to py datetime
         if isinstance(target_date, QDate):
             target_date = target_date.toPyDate()
 
-        #get start and end of the day
-        start_of_day = datetime(target_date.year, target_date.month, target_date.day, 0, 0, 0)
-        end_of_day = datetime(target_date.year, target_date.month, target_date.day, 23, 59, 59)
+        #get start of the day and of the next one
+        range_start = datetime(target_date.year, target_date.month, target_date.day, 0, 0, 0)
+        range_end = range_start + timedelta(days=1)
+        clipped_start, clipped_end = clipped_interval(ApplicationActivity, range_start, range_end)
 
         try:
-            with Session(engine) as session:
-                activities = session.query(ApplicationActivity).join(Application).filter(
-                    ApplicationActivity.session_start >= start_of_day,
-                    ApplicationActivity.session_end <= end_of_day
-                )
-                
-                #filter programs
-                if program_filter:
-                    activities = activities.filter(Application.name.in_(program_filter))
-
-                return activities.all()
+            query = join_activity_texts(select(
+                activity_window_name.label("window_name"),
+                activity_additional_info.label("additional_info"),
+                clipped_start.label("session_start"),
+                clipped_end.label("session_end")
+            ).join(Application, Application.id == ApplicationActivity.application_id)) \
+                .where(overlap_filter(ApplicationActivity, range_start, range_end))
+
+            #filter programs
+            if program_filter:
+                query = query.where(Application.name.in_(program_filter))
+
+            with Session(reader_engine) as session:
+                return [
+                    {**row._asdict(), "duration": round((row.session_end - row.session_start).total_seconds(), 3)}
+                    for row in session.execute(query)
+                ]
         except Exception as e:
             raise RuntimeError(f"Error accessing database: {str(e)}")
 
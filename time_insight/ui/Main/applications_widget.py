@@ -4,11 +4,11 @@ from PyQt5.QtWidgets import (
             QWidget, QVBoxLayout, QLabel, QScrollArea,  QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox
 )
 from sqlalchemy.orm import Session
-from time_insight.data.database import engine
+from time_insight.data.database import reader_engine
 from time_insight.data.models import ApplicationActivity, Application
+from time_insight.data.intervals import overlap_filter, clipped_interval
 
 from time_insight.settings import get_setting
-from time_insight.logging.logger import logger
 
 from time_insight.ui.language_manager import language_manager 
 from time_insight.translations import t
@@ -69,7 +69,7 @@ class ApplicationsWidget(QWidget):
             #get activities 
             activities = self.get_activities_from_database(target_date)
             
-            with Session(engine) as session:
+            with Session(reader_engine) as session:
                 #get all apps
                 applications = {app.id: app for app in session.query(Application).all()}
 
@@ -143,22 +143,24 @@ class ApplicationsWidget(QWidget):
         Get application activities from database for the given date.
 
         :param target_date: QDate object representing the target date.
-        :return: List of ApplicationActivity objects.
+        :return: List of rows with application_id, session_start and session_end, clipped to the day.
         """
         #convert QDate to py datetime
         if isinstance(target_date, QDate):
             target_date = target_date.toPyDate()
 
-        #get start and end of the day
-        start_of_day = datetime(target_date.year, target_date.month, target_date.day, 0, 0, 0)
-        end_of_day = datetime(target_date.year, target_date.month, target_date.day, 23, 59, 59)
+        #get start of the day and of the next one
+        range_start = datetime(target_date.year, target_date.month, target_date.day, 0, 0, 0)
+        range_end = range_start + timedelta(days=1)
+        clipped_start, clipped_end = clipped_interval(ApplicationActivity, range_start, range_end)
 
         try:
-            with Session(engine) as session:
-                activities = session.query(ApplicationActivity).filter(
-                    ApplicationActivity.session_start >= start_of_day,
-                    ApplicationActivity.session_end <= end_of_day
-                ).all()
+            with Session(reader_engine) as session:
+                activities = session.query(
+                    ApplicationActivity.application_id,
+                    clipped_start.label("session_start"),
+                    clipped_end.label("session_end")
+                ).filter(overlap_filter(ApplicationActivity, range_start, range_end)).all()
                 return activities
         except Exception as e:
             raise RuntimeError(f"Error accessing database: {str(e)}")
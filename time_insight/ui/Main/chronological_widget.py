@@ -6,11 +6,11 @@ from PyQt5.QtWebEngineWidgets import QWebEngineView
 import plotly.express as px
 import pandas as pd
 
-from time_insight.data.get_data import get_computer_usage_data, get_programs_data
+from time_insight.data.get_data import get_computer_usage_frame, get_programs_frame
 from time_insight.time_converter import datetime_from_utc_to_local
 
 from time_insight.settings import get_setting
-from time_insight.logging.logger import logger
+from time_insight.logging.logger import ui_logger as logger
 
 import random
 
@@ -35,8 +35,8 @@ class ChronologicalGraphWidget(QGraphicsView):
 
     def draw_timeline_graph(self, target_date, program_filter=None):
         
-        df_activities = pd.DataFrame(get_programs_data(target_date, target_date, 50))
-        df_user_sessions = pd.DataFrame(get_computer_usage_data(target_date, target_date))
+        df_activities = get_programs_frame(target_date, target_date)
+        df_user_sessions = get_computer_usage_frame(target_date, target_date)
 
         if df_activities.empty or df_user_sessions.empty:
             self.web_view.setHtml("")
@@ -46,9 +46,6 @@ class ChronologicalGraphWidget(QGraphicsView):
             df_activities = df_activities[df_activities['Name'].isin(program_filter)]
 
         #activities
-        df_activities["Start Time"] = pd.to_datetime(df_activities["Start Time"])
-        df_activities["End Time"] = pd.to_datetime(df_activities["End Time"])
-        
         #convert utc time to local
         df_activities["Start Time"] = df_activities["Start Time"].apply(datetime_from_utc_to_local)
         df_activities["End Time"] = df_activities["End Time"].apply(datetime_from_utc_to_local)
@@ -58,16 +55,13 @@ class ChronologicalGraphWidget(QGraphicsView):
         df_activities["Category"] = "Activities"
 
         df_activities["Tooltip"] = (
-            t("program_name") + ": " + df_activities["Name"] + "<br>" +
-            t("window_name") + ": " + df_activities["Window Name"] + "<br>" +
+            t("program_name") + ": " + df_activities["Name"].astype(str) + "<br>" +
+            t("window_name") + ": " + df_activities["Window Name"].astype(str) + "<br>" +
             t("time_interval") + ": " + df_activities["Start Time"].dt.strftime("%H:%M:%S") + " - " + df_activities["End Time"].dt.strftime("%H:%M:%S") + "<br>" +
             t("duration") + ": " + df_activities["Duration"].astype(str)
         )
 
         #user sessions
-        df_user_sessions["Start Time"] = pd.to_datetime(df_user_sessions["Start Time"])
-        df_user_sessions["End Time"] = pd.to_datetime(df_user_sessions["End Time"])
-
         #convert utc time to local
         df_user_sessions["Start Time"] = df_user_sessions["Start Time"].apply(datetime_from_utc_to_local)
         df_user_sessions["End Time"] = df_user_sessions["End Time"].apply(datetime_from_utc_to_local)
@@ -80,7 +74,7 @@ class ChronologicalGraphWidget(QGraphicsView):
         df_user_sessions["Category"] = "User Sessions"
 
         df_user_sessions["Tooltip"] = (
-            df_user_sessions["Session type name"] + " " + t("session") + "<br>" +
+            df_user_sessions["Session type name"].astype(str) + " " + t("session") + "<br>" +
             t("time_interval") + ": " + df_user_sessions["Start Time"].dt.strftime("%H:%M:%S") + " - " + df_user_sessions["End Time"].dt.strftime("%H:%M:%S") + "<br>" +
             t("duration") + ": " + df_user_sessions["Duration"].astype(str)
         )
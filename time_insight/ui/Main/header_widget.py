@@ -3,7 +3,6 @@ from PyQt5.QtWidgets import (
             QWidget, QHBoxLayout, QLabel, QLabel, QPushButton, QCalendarWidget, QDateEdit
 )
 
-from time_insight.logging.logger import logger
 
 from time_insight.ui.language_manager import language_manager 
 from time_insight.translations import t
@@ -8,7 +8,6 @@ from time_insight.ui.Main.applications_widget import ApplicationsWidget
 from time_insight.ui.Main.header_widget import HeaderWidget
 from time_insight.ui.Main.chronological_widget import ChronologicalGraphWidget
 
-from time_insight.logging.logger import logger
 
 from time_insight.ui.language_manager import language_manager 
 from time_insight.translations import t
@@ -9,11 +9,11 @@ import plotly.express as px      #type: ignore
 import pandas as pd             #type: ignore
 import random
 
-from time_insight.data.get_data import get_activity_data, get_computer_usage_data, get_programs_data
+from time_insight.data.get_data import get_hourly_active_usage
 from time_insight.time_converter import datetime_from_utc_to_local
 
 from time_insight.settings import get_setting
-from time_insight.logging.logger import logger
+from time_insight.logging.logger import ui_logger as logger
 from datetime import datetime, timedelta
 from collections import defaultdict
 
@@ -87,72 +87,37 @@ class ReportsScreen(QWidget):
                 
 
             case "Weekly":
-                weekly_data = defaultdict(float)
-                daily_counts = defaultdict(int)
-                last_day_data = []
-                weekly_totals = []
+                days_of_week = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
+                #one query for the last 10 weeks, the weeks are cut from it
+                first_date, _ = self.get_date_range(report_type, offset=9)
+                _, last_date = self.get_date_range(report_type, offset=0)
+                daily_hours = self.get_daily_hours(first_date, last_date)
+
+                weekly_totals = []
                 for i in range(10):
                     start_date, end_date = self.get_date_range(report_type, offset=i)
-                    data = get_computer_usage_data(start_date, end_date)
-
-                    if not data:
-                        weekly_totals.append(0)
-                        continue
-
-                    df = pd.DataFrame(data)
-                    df["Start Time"] = pd.to_datetime(df["Start Time"])
-                    df["End Time"] = pd.to_datetime(df["End Time"])
-                    df = df[df["Session type name"] == "Active"]
-
-                    week_total = 0
-                    for _, row in df.iterrows():
-                        start = row["Start Time"]
-                        end = row["End Time"]
-
-                        duration = (end - start).total_seconds() / 3600
-                        weekday = start.weekday()
-
-                        weekly_data[weekday] += duration
-                        daily_counts[weekday] += 1
-                        week_total += duration
-                    
-                    weekly_totals.append(week_total)
-
-                avg_weekly_data = []
-                days_of_week = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-                for i in range(7):
-                    avg_duration = weekly_data[i] / daily_counts[i] if daily_counts[i] > 0 else 0
-                    avg_weekly_data.append({
-                        "Day of Week": days_of_week[i],
-                        "Average Active Hours": avg_duration
-                    })
-
-                avg_df = pd.DataFrame(avg_weekly_data)
+                    weekly_totals.append(self.days_between(daily_hours, start_date, end_date).sum())
+
+                #average of the days with any activity
+                avg_weekly_hours = daily_hours.groupby(daily_hours.index.weekday).mean().reindex(range(7), fill_value=0)
+                avg_df = pd.DataFrame({
+                    "Day of Week": days_of_week,
+                    "Average Active Hours": avg_weekly_hours.values
+                })
                 self.draw_weekly_chart(avg_df, "bottom")
 
                 start_date, end_date = self.get_date_range(report_type, offset=value)
-                data = get_computer_usage_data(start_date, end_date)
+                week_hours = self.days_between(daily_hours, start_date, end_date)
 
-                if not data:
+                if week_hours.empty:
                     return
 
-                df = pd.DataFrame(data)
-                df["Start Time"] = pd.to_datetime(df["Start Time"])
-                df["End Time"] = pd.to_datetime(df["End Time"])
-                df = df[df["Session type name"] == "Active"]
-
-                last_day_data = []
-                for i in range(7):
-                    day_data = df[df["Start Time"].dt.weekday == i]
-                    daily_duration_hours = day_data["Duration"].sum() / 3600
-
-                    last_day_data.append({
-                        "Day of Week": days_of_week[i],
-                        "Active Hours": daily_duration_hours
-                    })
-
-                last_day_df = pd.DataFrame(last_day_data)
+                week_hours = week_hours.groupby(week_hours.index.weekday).sum().reindex(range(7), fill_value=0)
+                last_day_df = pd.DataFrame({
+                    "Day of Week": days_of_week,
+                    "Active Hours": week_hours.values
+                })
                 self.draw_weekly_chart(last_day_df, "top")
 
                 curr_week_hours = weekly_totals[value]
@@ -176,80 +141,40 @@ class ReportsScreen(QWidget):
                 #self.info_label.setText(f"{curr_week_hours}, {avg_week_hours}, {avg_week_hours-curr_week_hours}")
 
             case "Monthly":
-                hourly_data_avg = defaultdict(float)
-                daily_counts = defaultdict(int)
-
-                for i in range(1):
-                    start_date, end_date = self.get_date_range(report_type, offset=value)
+                days_of_month = range(1, 32)
 
-                    data = get_computer_usage_data(start_date, end_date)
+                #one query for the last 6 months, the months are cut from it
+                first_date, _ = self.get_date_range(report_type, offset=5)
+                _, last_date = self.get_date_range(report_type, offset=0)
+                daily_hours = self.get_daily_hours(first_date, last_date)
 
-                    if not data:
-                        continue
-
-                    df = pd.DataFrame(data)
-                    df["Start Time"] = pd.to_datetime(df["Start Time"])
-                    df = df[df["Session type name"] == "Active"]
-
-                    for day in range(1, 32):
-                        if day > df["Start Time"].dt.days_in_month.max():
-                            break
-                        day_data = df[df["Start Time"].dt.day == day]
-                        daily_duration_hours = day_data["Duration"].sum() / 3600
-
-                        hourly_data_avg[day] += daily_duration_hours
-                        daily_counts[day] += 1
-
-                avg_monthly_data = []
-                for day in range(1, 32):
-                    avg_hourly_duration = hourly_data_avg[day] / daily_counts[day] if daily_counts[day] > 0 else 0
-                    avg_monthly_data.append({
-                        "Day of Month": day,
-                        "Active Hours": avg_hourly_duration
-                    })
-                
-                avg_monthly_df = pd.DataFrame(avg_monthly_data)
+                start_date, end_date = self.get_date_range(report_type, offset=value)
+                month_hours = self.days_between(daily_hours, start_date, end_date)
+                month_hours = month_hours.groupby(month_hours.index.day).sum().reindex(days_of_month, fill_value=0)
+                monthly_df = pd.DataFrame({
+                    "Day of Month": days_of_month,
+                    "Active Hours": month_hours.values
+                })
 
-                self.draw_monthly_chart(avg_monthly_df, "top")
+                self.draw_monthly_chart(monthly_df, "top")
 
-                curr_month_hours = sum(day["Active Hours"] for day in avg_monthly_data)
+                curr_month_hours = month_hours.sum()
 
                 past_month_totals = []
-                hourly_data_avg = defaultdict(float)
-                daily_counts = defaultdict(int)
-
                 for i in range(6):
                     start_date, end_date = self.get_date_range(report_type, offset=i)
-                    data = get_computer_usage_data(start_date, end_date)
-
-                    if not data:
-                        continue
+                    past_month_totals.append(self.days_between(daily_hours, start_date, end_date).sum())
 
-                    df = pd.DataFrame(data)
-                    df["Start Time"] = pd.to_datetime(df["Start Time"])
-                    df = df[df["Session type name"] == "Active"]
-
-                    for day in range(1, 32):
-                        if day > df["Start Time"].dt.days_in_month.max():
-                            break
-                        day_data = df[df["Start Time"].dt.day == day]
-                        daily_duration_hours = day_data["Duration"].sum() / 3600
-                        hourly_data_avg[day] += daily_duration_hours
-                        daily_counts[day] += 1
-
-                avg_monthly_data = []
-                for day in range(1, 32):
-                    avg_hourly_duration = hourly_data_avg[day] / daily_counts[day] if daily_counts[day] > 0 else 0
-                    avg_monthly_data.append({
-                        "Day of Month": day,
-                        "Active Hours": avg_hourly_duration
-                    })
-
-                avg_monthly_df = pd.DataFrame(avg_monthly_data)
+                #average of the days with any activity
+                avg_monthly_hours = daily_hours.groupby(daily_hours.index.day).mean().reindex(days_of_month, fill_value=0)
+                avg_monthly_df = pd.DataFrame({
+                    "Day of Month": days_of_month,
+                    "Active Hours": avg_monthly_hours.values
+                })
 
                 self.draw_monthly_chart(avg_monthly_df, "bottom")
 
-                avg_month_hours = sum(past_month_totals) / max(len(past_month_totals), 1)
+                avg_month_hours = sum(past_month_totals[1:]) / max(len(past_month_totals) - 1, 1)
                 diff = round(curr_month_hours - avg_month_hours, 1)
 
                 if value == 0:
@@ -401,6 +326,24 @@ class ReportsScreen(QWidget):
 
         return f"rgb({r}, {g}, {b})"
     
+    def get_daily_hours(self, start_date, end_date):
+        """
+        Active hours of every day with any activity, read from the hourly rollup in one query.
+
+        :param start_date: QDate, first day
+        :param end_date: QDate, last day
+        :return: pd.Series of hours indexed by date
+        """
+        data = get_hourly_active_usage(start_date, end_date)
+        if not data:
+            return pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+
+        df = pd.DataFrame(data)
+        return df.groupby(pd.to_datetime(df["Date"]))["Duration"].sum() / 3600
+
+    def days_between(self, daily_hours, start_date, end_date):
+        return daily_hours[(daily_hours.index >= pd.Timestamp(start_date.toPyDate())) & (daily_hours.index <= pd.Timestamp(end_date.toPyDate()))]
+
     def get_date_range(self, report_type, offset=0):
         today = QDate.currentDate()
 
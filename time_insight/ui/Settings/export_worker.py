@@ -0,0 +1,36 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from time_insight.logging.logger import ui_logger as logger
+
+class ExportWorker(QThread):
+    """
+    Runs an export or import in the background, so the window stays responsive on large databases.
+    """
+    progress = pyqtSignal(int, int)     #rows done, total rows
+    done = pyqtSignal(bool, str)        #completed (False if cancelled or failed), destination or source
+
+    def __init__(self, task, path):
+        """
+        :param task: Function called as task(path, progress=, cancelled=), returning True if completed,
+                     e.g. export_csv with its query bound (data/export.py) or export_parquet (data/parquet_io.py).
+        :param path: Destination or source passed to the task.
+        """
+        super().__init__()
+        self.task = task
+        self.path = path
+        self.cancel_requested = False
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def run(self):
+        try:
+            completed = self.task(
+                self.path,
+                progress=self.progress.emit,
+                cancelled=lambda: self.cancel_requested
+            )
+        except Exception as e:
+            logger.error(f"Error in export_worker.py - run: {e}")
+            completed = False
+        self.done.emit(completed, self.path)
@@ -1,22 +1,26 @@
 from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtWidgets import (
     QWidget, QPushButton, QVBoxLayout, QHBoxLayout, QLabel,
-    QStackedWidget, QSlider, QComboBox, QRadioButton, QCheckBox, QLineEdit, QSizePolicy, QFileDialog, QColorDialog
+    QStackedWidget, QSlider, QComboBox, QRadioButton, QCheckBox, QLineEdit, QSizePolicy, QFileDialog, QColorDialog,
+    QProgressDialog
 )
 from PyQt5.QtCore import Qt
-from time_insight.tracker.tracker import set_interval
+from time_insight.tracker.tracker import set_interval, stop_tracker_for_minutes, resume_tracker, controller
+from time_insight.tracker.ipc import tracker_client
+from time_insight.tracker.stats import stats
 
-from sqlalchemy.orm import Session
-from time_insight.data.database import engine
-from time_insight.data.models import ApplicationActivity, Application, UserSession, UserSessionType
-import pandas as pd
+from time_insight.data.export import programs_export_query, sessions_export_query, export_csv
+from time_insight.data.database import backup_database, restore_database
+from time_insight.data.parquet_io import parquet_available, export_parquet, import_parquet
+from time_insight.ui.Settings.export_worker import ExportWorker
 
-from time_insight.settings import get_setting, set_setting
-from time_insight.logging.logger import logger
+from time_insight.config import STATS_PATH
+from time_insight.settings import get_setting, set_setting, DEFAULT_SETTINGS
+from time_insight.logging.logger import ui_logger as logger
 
-import shutil
 import os
-from time_insight.config import DB_PATH, DATA_DIR
+from functools import partial
+from datetime import datetime
 
 from time_insight.ui.language_manager import language_manager 
 from time_insight.translations import t
@@ -107,6 +111,10 @@ class SettingsScreen(QWidget):
         self.export_sessions_data_button.setText(t("export_sessions_data"))
         self.export_database_button.setText(t("export_database"))
         self.import_database_button.setText(t("import_database"))
+        self.export_parquet_button.setText(t("export_parquet"))
+        self.import_parquet_button.setText(t("import_parquet"))
+        self.dump_tracker_stats_button.setText(t("dump_tracker_stats"))
+        self.set_parquet_tooltips()
         
         self.daily_checkbox.setText(t("daily_report"))
         self.weekly_checkbox.setText(t("weekly_report"))
@@ -174,6 +182,17 @@ class SettingsScreen(QWidget):
             self.import_database_button = QPushButton(t("import_database"))
             self.import_database_button.clicked.connect(self.import_database)
             layout.addWidget(self.import_database_button)
+            self.export_parquet_button = QPushButton(t("export_parquet"))
+            self.export_parquet_button.clicked.connect(self.export_parquet_data)
+            layout.addWidget(self.export_parquet_button)
+            self.import_parquet_button = QPushButton(t("import_parquet"))
+            self.import_parquet_button.clicked.connect(self.import_parquet_data)
+            layout.addWidget(self.import_parquet_button)
+            self.dump_tracker_stats_button = QPushButton(t("dump_tracker_stats"))
+            self.dump_tracker_stats_button.clicked.connect(self.dump_tracker_stats)
+            layout.addWidget(self.dump_tracker_stats_button)
+            self.set_export_buttons_enabled(True)
+            self.set_parquet_tooltips()
         elif section == t("reports"):
             layout.addWidget(QLabel("Enable reports"))
             self.daily_checkbox = QCheckBox(t("daily_report"))
@@ -253,59 +272,85 @@ class SettingsScreen(QWidget):
             set_setting("monthly_report", monthly)
 
     def export_programs_data(self):
-        logger.info("Starting export...")
-        with Session(engine) as session:
-            activities = session.query(
-                ApplicationActivity.id.label("Activity ID"),
-                ApplicationActivity.application_id.label("Application ID"),
-                ApplicationActivity.window_name.label("Window Name"),
-                ApplicationActivity.additional_info.label("Additional Info"),
-                ApplicationActivity.session_start.label("Start Time"),
-                ApplicationActivity.session_end.label("End Time"),
-                ApplicationActivity.duration.label("Duration"),
-                Application.name.label("Program Name"),
-                Application.desc.label("Program Description"),
-                Application.enrollment_date.label("Enrollment Date"),
-                Application.path.label("Program Path")
-            ).join(
-                Application, Application.id == ApplicationActivity.application_id
-            ).all()
-
-        df = pd.DataFrame(activities)
-
         dest, _ = QFileDialog.getSaveFileName(self, "Save Programs Data", "", "CSV Files (*.csv)")
         if dest:
-            df.to_csv(dest, index=False, encoding="utf-8")
-            logger.info(f"Programs data exported to {dest}")
+            self.start_export(partial(export_csv, programs_export_query()), dest)
 
     def export_sessions_data(self):
-        logger.info("Starting export...")
-        with Session(engine) as session:
-            user_sessions = session.query(UserSession, UserSessionType.name).join(
-                UserSessionType, UserSession.user_session_type_id == UserSessionType.id
-            ).all()
+        dest, _ = QFileDialog.getSaveFileName(self, "Save Sessions Data", "", "CSV Files (*.csv)")
+        if dest:
+            self.start_export(partial(export_csv, sessions_export_query()), dest)
 
-        df = pd.DataFrame(user_sessions)
+    def export_parquet_data(self):
+        folder = QFileDialog.getExistingDirectory(self, "Export Parquet Data")
+        if folder:
+            dest = os.path.join(folder, f"time_insight_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            self.start_export(export_parquet, dest)
 
-        dest, _ = QFileDialog.getSaveFileName(self, "Save Sessions Data", "", "CSV Files (*.csv)")
+    def import_parquet_data(self):
+        src = QFileDialog.getExistingDirectory(self, "Import Parquet Data")
+        if src:
+            self.start_export(import_parquet, src, t("importing"))
+
+    def dump_tracker_stats(self):
+        dest, _ = QFileDialog.getSaveFileName(self, "Save Tracker Statistics", STATS_PATH, "JSON Files (*.json)")
         if dest:
-            df.to_csv(dest, index=False, encoding="utf-8")
-            logger.info(f"Sessions data exported to {dest}")
+            self.start_export(dump_tracker_stats, dest)
+
+    def start_export(self, task, path, label=None):
+        """
+        Runs an export or import in a background thread, with a progress dialog that can cancel it.
+
+        :param task: Function called as task(path, progress=, cancelled=), see ExportWorker.
+        :param path: Destination or source of the task.
+        :param label: Text of the progress dialog, t("exporting") if not given.
+        """
+        logger.info("Starting export...")
+        self.export_progress = QProgressDialog(label or t("exporting"), t("cancel"), 0, 100, self)
+        self.export_progress.setWindowModality(Qt.WindowModal)
+        self.export_progress.setMinimumDuration(500)    #do not flash for small exports
+
+        self.export_worker = ExportWorker(task, path)
+        self.export_worker.progress.connect(self.on_export_progress)
+        self.export_worker.done.connect(self.on_export_done)
+        self.export_progress.canceled.connect(self.export_worker.cancel)
+        self.set_export_buttons_enabled(False)
+        self.export_worker.start()
+
+    def on_export_progress(self, written, total):
+        self.export_progress.setValue(int(written * 100 / total) if total else 100)
+
+    def on_export_done(self, completed, dest):
+        self.export_progress.reset()
+        self.set_export_buttons_enabled(True)
+        if completed:
+            logger.info(f"Export or import of {dest} completed")
+
+    def set_export_buttons_enabled(self, enabled):
+        self.export_programs_data_button.setEnabled(enabled)
+        self.export_sessions_data_button.setEnabled(enabled)
+        #pyarrow is optional, see data/parquet_io.py
+        self.export_parquet_button.setEnabled(enabled and parquet_available())
+        self.import_parquet_button.setEnabled(enabled and parquet_available())
+        self.dump_tracker_stats_button.setEnabled(enabled)
+
+    def set_parquet_tooltips(self):
+        tooltip = "" if parquet_available() else t("parquet_unavailable")
+        self.export_parquet_button.setToolTip(tooltip)
+        self.import_parquet_button.setToolTip(tooltip)
 
     def export_database(self):
         logger.info("Starting export...")
         dest, _ = QFileDialog.getSaveFileName(self, "Save Database", "", "Database Files (*.db)")
         if dest:
-            shutil.copy(DB_PATH, dest)
+            backup_database(dest)
             logger.info(f"Database exported to {dest}")
 
     def import_database(self):
         logger.info("Starting import...")
         src, _ = QFileDialog.getOpenFileName(self, "Import Database", "", "Database Files (*.db)")
         if src:
-            dest = os.path.join(DATA_DIR, 'time_insight.db')
-            shutil.copy(src, DB_PATH)
-            logger.info(f"Database imported from {src}")
+            self.start_export(restore_database_paused, src, t("importing"))
 
     def on_theme_changed(self, text):
         if text == "Custom":
@@ -320,4 +365,50 @@ class SettingsScreen(QWidget):
                 self.highlight_hex_color = highlight_color.name()
             text_color = QColorDialog.getColor(title="Choose text color")
             if text_color.isValid():
-                self.text_hex_color = text_color.name()
\ No newline at end of file
+                self.text_hex_color = text_color.name()
+
+def restore_database_paused(src, progress=None, cancelled=None):
+    """
+    Restores the database file with the tracker paused, see restore_database. Runs as a task of ExportWorker.
+
+    The tracker keeps application ids, interned text ids and the row of the open activity in memory, pausing
+    writes out its buffered activities and resuming loads them again from the restored database.
+
+    :param src: Database file to restore.
+    :return: True, the restore can not be cancelled.
+    """
+    if get_setting("tracker_mode", DEFAULT_SETTINGS["tracker_mode"]) == "process":
+        status = tracker_client.status()
+        running = bool(status and status["running"])
+        pause, resume = tracker_client.pause, tracker_client.resume
+    else:
+        running = controller.started and not controller.paused
+        pause, resume = stop_tracker_for_minutes, resume_tracker
+
+    if running:
+        pause(None)
+    try:
+        restore_database(src)
+        logger.info(f"Database imported from {src}")
+    finally:
+        if running:
+            resume()
+    return True
+
+def dump_tracker_stats(dest, progress=None, cancelled=None):
+    """
+    Writes the latency statistics of the tracker to a JSON file, see tracker/stats.py. Runs as a task of ExportWorker.
+
+    In process mode the statistics live in the tracker process, so it is asked to write the file itself.
+
+    :param dest: JSON file to write.
+    :return: True if written, False if the tracker process did not answer.
+    """
+    if get_setting("tracker_mode", DEFAULT_SETTINGS["tracker_mode"]) == "process":
+        if tracker_client.stats(dump=True, path=dest) is None:
+            logger.warning("Tracker process did not answer, statistics not written")
+            return False
+    else:
+        stats.dump_json(dest)
+    logger.info(f"Tracker statistics written to {dest}")
+    return True
@@ -7,7 +7,7 @@ from PyQt5.QtWidgets import (
 )
 
 from time_insight.settings import get_setting
-from time_insight.logging.logger import logger
+from time_insight.logging.logger import ui_logger as logger
 
 from time_insight.ui.language_manager import language_manager 
 from time_insight.translations import t
@@ -7,7 +7,7 @@ from PyQt5.QtWidgets import (
 from time_insight.ui.Stats.bottom_widget import BottomWidget
 from time_insight.ui.Stats.top_widget import TopWidget
 
-from time_insight.logging.logger import logger
+from time_insight.logging.logger import ui_logger as logger
 
 from time_insight.ui.language_manager import language_manager 
 from time_insight.translations import t
@@ -6,10 +6,10 @@ from time_insight.ui.Stats.bottom_widget import BottomWidget
 import random
 import pandas as pd             #type: ignore
 
-from time_insight.data.get_data import get_activity_data, get_computer_usage_data, get_programs_data
+from time_insight.data.get_data import get_activity_frame, get_hourly_active_usage, get_programs_frame, get_programs_usage_frame
 from time_insight.time_converter import datetime_from_utc_to_local
 
-from time_insight.logging.logger import logger
+from time_insight.logging.logger import ui_logger as logger
 
 from time_insight.ui.language_manager import language_manager 
 from time_insight.translations import t
@@ -122,16 +122,18 @@ class TopWidget(QWidget):
 
         match stats_type:
             case "Programs": 
-                data = get_programs_data(start_date, end_date, 50)
+                #totals of longer ranges come from the daily rollup instead of every activity
+                if start_date == end_date:
+                    df = get_programs_frame(start_date, end_date)
+                else:
+                    df = get_programs_usage_frame(start_date, end_date)
 
-                if not data:
+                if df.empty:
                     logger.warning("Programs data is empty.")
                     return
                 
-                #convert data to df
-                df = pd.DataFrame(data)
                 #group by program and sum duration
-                df = df.groupby(["Name", "Description", "Path", "Enrollment Date"], as_index=False)["Duration"].sum()
+                df = df.groupby(["Name", "Description", "Path", "Enrollment Date"], as_index=False, observed=True)["Duration"].sum()
 
                 #convert to local time
                 df["Enrollment Date"] = df["Enrollment Date"].apply(datetime_from_utc_to_local)
@@ -154,17 +156,15 @@ class TopWidget(QWidget):
                 self.bottom_widget.draw_programs_chart(df)
 
             case "Activity":
-                data = get_activity_data(start_date, end_date, 50)
+                df = get_activity_frame(start_date, end_date)
 
-                if not data:
+                if df.empty:
                     logger.warning("Activity data is empty.")
                     return
 
-                #convert data to df
-                df = pd.DataFrame(data)
                 #group by activity and sum duration
                 df = df.groupby(
-                ["Window Name", "Program Name", "Enrollment Date", "Program Path", "Start Time", "End Time"],as_index=False).agg({"Duration": "sum"})
+                ["Window Name", "Program Name", "Enrollment Date", "Program Path", "Start Time", "End Time"],as_index=False, observed=True).agg({"Duration": "sum"})
                 
                 #convert to local time
                 df["Enrollment Date"] = df["Enrollment Date"].apply(datetime_from_utc_to_local)
@@ -179,7 +179,7 @@ class TopWidget(QWidget):
                 self.bottom_widget.draw_table(df)
 
             case "Computer usage":
-                data = get_computer_usage_data(start_date, end_date)
+                data = get_hourly_active_usage(start_date, end_date)   #active time per local hour
 
                 if not data:
                     logger.warning("Computer usage data is empty.")
@@ -187,10 +187,9 @@ class TopWidget(QWidget):
                 
                 #convert data to df
                 df = pd.DataFrame(data)
-                df["Start Time"] = pd.to_datetime(df["Start Time"])
-                #filter only active sessions
+                df["Start Time"] = pd.to_datetime(df["Date"])
                 #group by date (day) and sum duration in hours
-                df = df[df["Session type name"]=="Active"].groupby(df["Start Time"].dt.floor('d'))["Duration"].sum() / 3600
+                df = df.groupby(df["Start Time"].dt.floor('d'))["Duration"].sum() / 3600
                 #df.index = df.index.strftime("%d %b %Y")
 
                 #self.bottom_widget.draw_table(data, "ASC")
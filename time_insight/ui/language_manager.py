@@ -1,6 +1,6 @@
 from PyQt5.QtCore import QObject, pyqtSignal
 from time_insight.translations import set_language
-from time_insight.logging.logger import logger
+from time_insight.logging.logger import ui_logger as logger
 
 class LanguageManager(QObject):
     language_changed = pyqtSignal()
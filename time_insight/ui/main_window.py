@@ -1,7 +1,8 @@
 import sys
 import os
 import time
-from PyQt5.QtCore import Qt, QTimer
+import queue
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
 from PyQt5.QtWidgets import (
             QApplication, QWidget, QDesktopWidget, QMainWindow, QVBoxLayout, QSystemTrayIcon, QMenu, QStackedWidget, 
             QPushButton, QAction, QLabel
@@ -17,14 +18,49 @@ from time_insight.ui.Settings.settings_screen import SettingsScreen
 
 from apscheduler.schedulers.background import BackgroundScheduler
 
-from time_insight.settings import get_setting
-from time_insight.logging.logger import logger
+from time_insight.settings import get_setting, DEFAULT_SETTINGS
+from time_insight.logging.logger import ui_logger as logger
 
-from time_insight.tracker.tracker import stop_tracker_for_minutes
+from time_insight.tracker.tracker import stop_tracker_for_minutes, resume_tracker
+from time_insight.tracker.ipc import tracker_client
 
 from time_insight.ui.language_manager import language_manager 
 from time_insight.translations import t
 
+class TrackerStatusWorker(QThread):
+    """
+    Sends commands to the tracker process off the GUI thread, connecting to it can block
+    and a pause waits until the tracker has ended its session.
+    """
+    status_received = pyqtSignal(object)   #response dict with "running", or None if the tracker process is not reachable
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.commands = queue.Queue()
+        self.finished.connect(self.start_pending)
+
+    def send(self, command):
+        """
+        Queues a command for the tracker process, commands are sent in order.
+
+        :param command: Dict with at least the "cmd" key, see TrackerClient.send.
+        """
+        self.commands.put(command)
+        if not self.isRunning():
+            self.start()
+
+    def start_pending(self):
+        if not self.commands.empty():   #queued while the thread was finishing
+            self.start()
+
+    def run(self):
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            self.status_received.emit(tracker_client.send(command))
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -57,7 +93,7 @@ class MainWindow(QMainWindow):
         quit_action = self.tray_menu.addAction(t("exit"))
         quit_action.triggered.connect(self.close_app)
 
-        if self.tracker_button.styleSheet().find("#ff4444") != -1:
+        if not self.tracker_running:
             self.tracker_button.setToolTip(t("tracker_stopped"))
         else:
             self.tracker_button.setToolTip(t("tracker_running"))
@@ -122,6 +158,7 @@ class MainWindow(QMainWindow):
 
         
         #turn off/on tray tracking button
+        self.tracker_running = True
         self.tracker_button = QPushButton(self)
         self.tracker_button.setToolTip("Tracker is currently running.")
         self.tracker_button.setFixedSize(20, 20)
@@ -131,6 +168,15 @@ class MainWindow(QMainWindow):
         self.tracker_button.clicked.connect(self.on_tracker_button_click)
         self.tracker_button.show()
 
+        #tracker in a separate process can be paused or stopped outside of this window, poll its status
+        self.tracker_process = get_setting("tracker_mode", DEFAULT_SETTINGS["tracker_mode"]) == "process"
+        if self.tracker_process:
+            self.tracker_status_worker = TrackerStatusWorker(self)
+            self.tracker_status_worker.status_received.connect(self.on_tracker_status)
+            self.tracker_status_timer = QTimer(self)
+            self.tracker_status_timer.timeout.connect(self.update_tracker_status)
+            self.tracker_status_timer.start(10000)
+
     def resizeEvent(self, event):
         self.update_tracker_button_position()
         super().resizeEvent(event)
@@ -153,27 +199,62 @@ class MainWindow(QMainWindow):
         action1.triggered.connect(lambda: self.turn_off_tracker(0.1))
         action2.triggered.connect(lambda: self.turn_off_tracker(60))
         action3.triggered.connect(lambda: self.turn_off_tracker(240))
-        action4.triggered.connect(lambda: self.turn_off_tracker(2147483647))
+        action4.triggered.connect(lambda: self.turn_off_tracker(None))
         
         context_menu.addAction(fakeaction)
         context_menu.addAction(action1)
         context_menu.addAction(action2)
         context_menu.addAction(action3)
         context_menu.addAction(action4)
+
+        if not self.tracker_running:
+            resume_action = QAction(t("turn_on_tracker"), self)
+            resume_action.triggered.connect(self.turn_on_tracker)
+            context_menu.addSeparator()
+            context_menu.addAction(resume_action)
         
         context_menu.exec_(self.tracker_button.mapToGlobal(self.tracker_button.rect().topLeft()))
 
     def turn_off_tracker(self, minutes):
-        self.tracker_button.setStyleSheet("border-radius: 10px; background-color: #ff4444; color: white;")
-        self.tracker_button.setToolTip("Tracker is currently stopped.")
-        stop_tracker_for_minutes(minutes)
+        """
+        :param minutes: Length of the pause, None to pause until the next app start.
+        """
+        if self.tracker_process:
+            self.tracker_status_worker.send({"cmd": "pause", "minutes": minutes})   #button is updated by the response
+        else:
+            self.on_tracker_stopped()
+            stop_tracker_for_minutes(minutes)
+
+        if minutes is not None:
+            QTimer.singleShot(int(minutes * 60 * 1000), self.on_tracker_running)
 
-        QTimer.singleShot(int(minutes * 60 * 1000), self.on_tracker_running)
+    def turn_on_tracker(self):
+        if self.tracker_process:
+            self.tracker_status_worker.send({"cmd": "resume"})
+        else:
+            resume_tracker()
+            self.on_tracker_running()
     
     def on_tracker_running(self):
+        self.tracker_running = True
         self.tracker_button.setStyleSheet("border-radius: 10px; background-color: #5CFF5C; color: black;")
         self.tracker_button.setToolTip("Tracker is currently running.")
 
+    def on_tracker_stopped(self):
+        self.tracker_running = False
+        self.tracker_button.setStyleSheet("border-radius: 10px; background-color: #ff4444; color: white;")
+        self.tracker_button.setToolTip("Tracker is currently stopped.")
+
+    def update_tracker_status(self):
+        if not self.tracker_status_worker.isRunning():     #previous request still waiting for the tracker process
+            self.tracker_status_worker.send({"cmd": "status"})
+
+    def on_tracker_status(self, status):
+        if status and status["running"]:
+            self.on_tracker_running()
+        else:
+            self.on_tracker_stopped()
+
     def on_navigation(self, screen_name):
         #navigate to screen
         if screen_name == "main":
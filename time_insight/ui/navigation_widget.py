@@ -3,7 +3,7 @@ from PyQt5.QtWidgets import (
             QWidget, QHBoxLayout, QPushButton
 )
 
-from time_insight.logging.logger import logger
+from time_insight.logging.logger import ui_logger as logger
 
 from time_insight.ui.language_manager import language_manager 
 from time_insight.translations import t